@@ -0,0 +1,286 @@
+"""
+Logging pipeline and moderation audit log.
+
+Handlers never run on the event loop: loggers only put records on a
+queue, and a listener thread formats and writes them. Moderation events
+also go through a queue, and are written in batches both as JSON lines
+to a rotating file and as rows in SQLite. Per-day rollups of counts and
+latency are kept alongside the rows, so `!modstats` reads a handful of
+indexed rows instead of scanning the log. Raw rows are only kept for
+AUDIT_RETENTION_DAYS; the rollups stay.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlitedb import open_db
+
+AUDIT_LOG_PATH = "moderation.jsonl"
+AUDIT_DB_PATH = "moderation.db"
+AUDIT_BATCH_SIZE = 64
+AUDIT_FLUSH_INTERVAL = 1.0   # seconds a partial batch may wait before it is written
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+AUDIT_RETENTION_DAYS = 90    # raw events older than this are pruned once a day
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id         INTEGER PRIMARY KEY,
+    ts         REAL NOT NULL,
+    kind       TEXT NOT NULL,
+    action     TEXT NOT NULL,
+    guild_id   INTEGER,
+    channel_id INTEGER,
+    user_id    INTEGER,
+    words      TEXT,
+    latency_ms REAL
+);
+CREATE INDEX IF NOT EXISTS events_by_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_by_user ON events (user_id, ts);
+CREATE TABLE IF NOT EXISTS daily (
+    day    TEXT NOT NULL,
+    kind   TEXT NOT NULL,
+    action TEXT NOT NULL,
+    count  INTEGER NOT NULL,
+    latency_sum   REAL NOT NULL DEFAULT 0,
+    latency_count INTEGER NOT NULL DEFAULT 0,
+    latency_max   REAL,
+    PRIMARY KEY (day, kind, action)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_users (
+    day     TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (day, user_id)
+) WITHOUT ROWID;
+"""
+# Added to daily after its first release; older databases get them on open
+_DAILY_LATENCY_COLUMNS = (
+    ("latency_sum", "REAL NOT NULL DEFAULT 0"),
+    ("latency_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("latency_max", "REAL"),
+)
+
+
+def _day(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+def configure_logging(path: str = "discord.log", level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """Route the root logger through a queue to a rotating file and the console"""
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s › %(message)s")
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+    )
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Formatting happens on the listener; the queue side only merges args into the message
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+class AuditStore:
+    def __init__(self, path: str, retention_days: float = AUDIT_RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        self._pruned_day: Optional[str] = None
+        # Written from the listener thread, read from executor threads
+        self._conn, self._lock = open_db(path, SCHEMA)
+        with self._lock, self._conn:
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(daily)")}
+            for column, decl in _DAILY_LATENCY_COLUMNS:
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE daily ADD COLUMN {column} {decl}")
+
+    def insert(self, events: Iterable[Dict[str, Any]]):
+        rows = [
+            (e["ts"], e["kind"], e["action"], e.get("guild_id"), e.get("channel_id"), e.get("user_id"),
+             json.dumps(e["words"], ensure_ascii=False) if e.get("words") else None, e.get("latency_ms"))
+            for e in events
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO events (ts, kind, action, guild_id, channel_id, user_id, words, latency_ms) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.executemany(
+                "INSERT INTO daily (day, kind, action, count, latency_sum, latency_count, latency_max) "
+                "VALUES (?, ?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT (day, kind, action) DO UPDATE SET count = count + 1, "
+                "latency_sum = latency_sum + excluded.latency_sum, "
+                "latency_count = latency_count + excluded.latency_count, "
+                "latency_max = MAX(COALESCE(latency_max, excluded.latency_max), "
+                "COALESCE(excluded.latency_max, latency_max))",
+                ((_day(r[0]), r[1], r[2], r[7] or 0.0, int(r[7] is not None), r[7]) for r in rows)
+            )
+            self._conn.executemany(
+                "INSERT INTO daily_users (day, user_id, count) VALUES (?, ?, 1) "
+                "ON CONFLICT (day, user_id) DO UPDATE SET count = count + 1",
+                ((_day(r[0]), r[5]) for r in rows if r[5] is not None)
+            )
+        self.prune()
+
+    def prune(self, now: Optional[float] = None):
+        """Delete raw events past the retention period, at most once a day"""
+        now = time.time() if now is None else now
+        today = _day(now)
+        if today == self._pruned_day:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM events WHERE ts < ?", (now - self.retention_days * 86400,))
+        self._pruned_day = today
+
+    def stats(self, days: int = 7, top: int = 5) -> Dict[str, Any]:
+        """Event counts by kind and action, and the most frequent users, over the last days"""
+        since = _day(time.time() - (days - 1) * 86400)
+        with self._lock:
+            counts = self._conn.execute(
+                "SELECT kind, action, SUM(count) FROM daily WHERE day >= ? "
+                "GROUP BY kind, action ORDER BY 3 DESC", (since,)
+            ).fetchall()
+            users = self._conn.execute(
+                "SELECT user_id, SUM(count) FROM daily_users WHERE day >= ? "
+                "GROUP BY user_id ORDER BY 2 DESC LIMIT ?", (since, top)
+            ).fetchall()
+            latency = self._conn.execute(
+                "SELECT SUM(latency_sum) / SUM(latency_count), MAX(latency_max) FROM daily WHERE day >= ?", (since,)
+            ).fetchone()
+        return {"counts": counts, "users": users, "latency_avg_ms": latency[0], "latency_max_ms": latency[1]}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.audit, ensure_ascii=False, separators=(",", ":"))
+
+
+class BatchedAuditHandler(logging.handlers.RotatingFileHandler):
+    """Buffers audit records and writes each batch with one file write and one transaction"""
+
+    def __init__(self, path: str, store: Optional[AuditStore], batch_size: int = AUDIT_BATCH_SIZE,
+                 max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS):
+        super().__init__(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        self.setFormatter(_JsonFormatter())
+        self.store = store
+        self.batch_size = batch_size
+        self._batch: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord):
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        try:
+            self.acquire()
+            try:
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream.write("".join(self.format(r) + "\n" for r in batch))
+                self.stream.flush()
+                if self.maxBytes and self.stream.tell() >= self.maxBytes:
+                    self.doRollover()
+            finally:
+                self.release()
+            if self.store is not None:
+                self.store.insert(r.audit for r in batch)
+        except Exception:
+            self.handleError(batch[-1])
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+_IDLE = logging.makeLogRecord({"msg": "idle"})
+
+
+class _BatchingListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers whenever the queue goes idle"""
+
+    def __init__(self, q: queue.SimpleQueue, *handlers: logging.Handler, flush_interval: float):
+        super().__init__(q, *handlers)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block: bool):
+        try:
+            return self.queue.get(block, timeout=self.flush_interval)
+        except queue.Empty:
+            # None is the listener's stop sentinel, so idleness needs its own marker
+            return _IDLE
+
+    def handle(self, record: logging.LogRecord):
+        if record is _IDLE:
+            for handler in self.handlers:
+                handler.flush()
+        else:
+            super().handle(record)
+
+
+class _AuditQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Audit records carry no args or exc_info, so skip the copy-and-format
+        return record
+
+
+class AuditLog:
+    """Moderation events, queued on the loop and written in batches off it"""
+
+    def __init__(self, path: str = AUDIT_LOG_PATH, db_path: Optional[str] = AUDIT_DB_PATH,
+                 batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL):
+        self.store = AuditStore(db_path) if db_path else None
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.handler = BatchedAuditHandler(path, self.store, batch_size)
+        self.listener = _BatchingListener(self._queue, self.handler, flush_interval=flush_interval)
+        self.logger = logging.getLogger("bot.audit")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(_AuditQueueHandler(self._queue))
+        self.listener.start()
+
+    def record(self, kind: str, action: str, *, user: Any = None, channel: Any = None,
+               words: Iterable[str] = (), latency_ms: Optional[float] = None, **extra: Any):
+        """Queue one event; user and channel may be discord objects or None"""
+        event = {"ts": time.time(), "kind": kind, "action": action}
+        if user is not None:
+            event.update(user_id=user.id, user=str(user))
+        if channel is not None:
+            event["channel_id"] = channel.id
+            guild = getattr(channel, "guild", None)
+            if guild is not None:
+                event["guild_id"] = guild.id
+        if words:
+            event["words"] = sorted(set(words))
+        if latency_ms is not None:
+            event["latency_ms"] = round(latency_ms, 2)
+        event.update(extra)
+        # Built directly rather than via logger.info(), which walks the stack to find the caller
+        record = self.logger.makeRecord(self.logger.name, logging.INFO, __file__, 0, kind, None, None,
+                                        extra={"audit": event})
+        self.logger.handle(record)
+
+    def stats(self, days: int = 7) -> Dict[str, Any]:
+        if self.store is None:
+            return {"counts": [], "users": [], "latency_avg_ms": None, "latency_max_ms": None}
+        return self.store.stats(days)
+
+    def close(self):
+        self.listener.stop()
+        self.handler.close()
+        if self.store is not None:
+            self.store.close()
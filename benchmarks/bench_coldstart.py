@@ -0,0 +1,71 @@
+"""
+Cold start of the bot process up to the point where it would connect:
+importing main (stores opened, matcher loaded) plus loading its
+extensions, measured in fresh interpreters against throwaway stores.
+Reports wall time, resident memory and which optional dependencies got
+imported along the way.
+
+    python benchmarks/bench_coldstart.py [--runs 7]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPTIONAL = ("duckduckgo_search", "primp", "aiohttp.web", "wiki", "search")
+
+CHILD = r"""
+import asyncio, json, logging, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+if hasattr(main, "load_extensions"):
+    asyncio.run(main.load_extensions())
+loaded = time.perf_counter()
+
+def rss_mib():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "total_ms": (loaded - start) * 1000,
+    "rss_mib": rss_mib(),
+    "loaded": [m for m in {optional!r} if m in sys.modules],
+}}))
+logging.shutdown()
+"""
+
+
+def run_once() -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, BANNED_WORDS_DB="words.db", MODMAIL_DB="modmail.db",
+                   AUDIT_LOG="moderation.jsonl", AUDIT_DB="moderation.db")
+        # First start seeds the word store and its matcher cache; the bot's restarts start warm
+        code = CHILD.format(root=ROOT, optional=OPTIONAL)
+        subprocess.run([sys.executable, "-c", code], cwd=tmp, env=env, capture_output=True, check=True)
+        out = subprocess.run([sys.executable, "-c", code], cwd=tmp, env=env, capture_output=True,
+                             text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+    runs = [run_once() for _ in range(args.runs)]
+    med = {k: statistics.median(r[k] for r in runs) for k in ("import_ms", "total_ms", "rss_mib")}
+    print(f"import main {med['import_ms']:6.0f} ms   +extensions {med['total_ms']:6.0f} ms   "
+          f"RSS {med['rss_mib']:5.1f} MiB   (median of {args.runs})")
+    print(f"optional modules loaded at startup: {', '.join(runs[0]['loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compare banned-word matcher backends on long messages and large word lists.
+
+    python benchmarks/bench_matcher.py
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matcher import MATCHER_BACKENDS, build_matcher  # noqa: E402
+from wordfilter import BannedWords  # noqa: E402
+
+random.seed(1234)
+FILLER = "the quick brown fox jumps over a lazy dog while everyone chats about games".split()
+
+
+def synthetic_words(count: int) -> set:
+    words = set()
+    while len(words) < count:
+        size = random.randint(4, 10)
+        words.add("".join(random.choices(string.ascii_lowercase, k=size)))
+    return words
+
+
+def make_message(length: int, bad: list, bad_every: int = 0) -> str:
+    parts, size, n = [], 0, 0
+    while size < length:
+        n += 1
+        word = random.choice(bad) if bad_every and n % bad_every == 0 else random.choice(FILLER)
+        parts.append(word)
+        size += len(word) + 1
+    return " ".join(parts)
+
+
+def timed(fn, text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run_case(label: str, words: set, lengths=(200, 2000, 20000)):
+    bad = sorted(words)
+    print(f"\n== {label}: {len(words)} words ==")
+    matchers = {}
+    for name in MATCHER_BACKENDS:
+        start = time.perf_counter()
+        matchers[name] = build_matcher(words, name)
+        print(f"  build {name:<6} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    for length in lengths:
+        repeat = max(3, 20000 // length)
+        for kind, every in (("clean", 0), ("dirty", 50)):
+            text = make_message(length, bad, every).lower()
+            results = {name: m.find_all(text) for name, m in matchers.items()}
+            same = len({tuple(m.word for m in r) for r in results.values()}) == 1
+            cells = "  ".join(
+                f"{name}={timed(m.find_all, text, repeat):9.1f}us" for name, m in matchers.items()
+            )
+            print(f"  {kind:<5} {length:>6} chars  {cells}  hits={len(results['aho'])}"
+                  f"{'' if same else '  (results differ)'}")
+
+
+def main():
+    run_case("built-in lists", BannedWords().all_words)
+    for size in (2000, 10000):
+        run_case("synthetic", synthetic_words(size), lengths=(2000, 20000))
+
+
+if __name__ == "__main__":
+    main()
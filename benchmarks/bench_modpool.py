@@ -0,0 +1,115 @@
+"""
+Inline vs process-pool banned-word scans.
+
+First finds where the pool starts paying off: per-message cost of an
+inline scan against a round trip to one warm worker, by message length.
+Then floods long messages through the pool at 1..N workers (N = CPU
+count) and reports throughput and how long the event loop stalls, which
+is what other commands feel while a paste is being scanned.
+
+    python benchmarks/bench_modpool.py [--messages 400] [--length 4000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modpool import ModerationPool  # noqa: E402
+from wordfilter import BannedWords  # noqa: E402
+
+VOCAB = ("anyone up for a match tonight that boss fight was brutal gg well played server lag again "
+         "queue with me after dinner check the pinned rules finally hit diamond").split()
+
+
+def paste(rng: random.Random, length: int) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(VOCAB)
+        words.append(word)
+        size += len(word) + 1
+    words.insert(rng.randrange(len(words)), "chutiya")
+    return " ".join(words)
+
+
+async def lag_probe(samples: List[float], interval: float = 0.002):
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+
+async def round_trip(pool: ModerationPool, text: str, repeat: int) -> float:
+    await pool.scan(text)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await pool.scan(text)
+    return (time.perf_counter() - start) / repeat
+
+
+async def flood(banned: BannedWords, texts: List[str], workers: int) -> dict:
+    pool = ModerationPool(banned, workers=workers, min_length=0)
+    pool.warm_up()
+    await asyncio.gather(*(pool.scan("") for _ in range(workers * 2)))
+    lags: List[float] = []
+    probe = asyncio.get_running_loop().create_task(lag_probe(lags))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    if workers:
+        results = await asyncio.gather(*(pool.scan(t) for t in texts))
+    else:
+        results = []
+        for t in texts:
+            results.append(banned.scan(t))
+            await asyncio.sleep(0)  # what on_message does between messages
+    elapsed = time.perf_counter() - start
+    probe.cancel()
+    pool.close()
+    assert all(r for r in results)
+    lags.sort()
+    return {
+        "msgs_per_s": len(texts) / elapsed,
+        "lag_max_ms": lags[-1] * 1000 if lags else elapsed * 1000,
+        "lag_p99_ms": lags[int(0.99 * (len(lags) - 1))] * 1000 if lags else elapsed * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--length", type=int, default=4000)
+    args = parser.parse_args()
+    rng = random.Random(3)
+    banned = BannedWords()
+
+    print("Break-even (per message):")
+    pool = ModerationPool(banned, workers=1, min_length=0)
+    pool.warm_up()
+    for length in (200, 500, 1000, 2000, 4000, 8000, 16000):
+        text = paste(rng, length)
+        start = time.perf_counter()
+        for _ in range(100):
+            banned.scan(text)
+        inline = (time.perf_counter() - start) / 100
+        pooled = await round_trip(pool, text, 100)
+        print(f"  {length:>6} chars  inline {inline * 1e6:8.0f} us   pooled {pooled * 1e6:8.0f} us")
+    pool.close()
+
+    texts = [paste(rng, args.length) for _ in range(args.messages)]
+    cpus = os.cpu_count() or 1
+    print(f"\nFlood of {args.messages} x {args.length}-char messages ({cpus} CPU(s)):")
+    for workers in [0] + sorted({1, 2, 4, cpus} - {w for w in (2, 4) if w > cpus}):
+        r = await flood(banned, texts, workers)
+        label = "inline" if not workers else f"{workers} worker(s)"
+        print(f"  {label:<12} {r['msgs_per_s']:8.0f} msg/s   loop stall p99 {r['lag_p99_ms']:7.2f} ms"
+              f"   max {r['lag_max_ms']:7.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""
+Moderation throughput with and without obfuscation-aware normalization.
+
+    python benchmarks/bench_normalize.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from normalize import normalize_text  # noqa: E402
+from wordfilter import BannedWords  # noqa: E402
+
+random.seed(42)
+CHAT = [
+    "hey everyone, anyone up for a match tonight?",
+    "bhai kya scene hai aaj ka",
+    "lol that clutch was insane 🔥🔥",
+    "namaste sab log, kaise ho?",
+    "can someone explain how the ranking system works in this season",
+    "aaj office mein bahut kaam tha yaar",
+]
+OBFUSCATED = ["f.u.c.k off", "fuuuuuck this", "ｆｕｃｋ", "sh1t game", "$hit", "а​sshоle", "k y s"]
+
+
+def corpus(size: int, dirty_ratio: float):
+    msgs = []
+    for _ in range(size):
+        text = " ".join(random.choices(CHAT, k=random.randint(1, 4)))
+        if random.random() < dirty_ratio:
+            text += " " + random.choice(OBFUSCATED)
+        msgs.append(text)
+    return msgs
+
+
+def throughput(fn, msgs) -> float:
+    start = time.perf_counter()
+    for m in msgs:
+        fn(m)
+    return len(msgs) / (time.perf_counter() - start)
+
+
+def main():
+    msgs = corpus(20000, 0.1)
+    plain = BannedWords(normalize=False)
+    folded = BannedWords(normalize=True)
+    caught_plain = sum(plain.contains_banned_word(m) for m in msgs)
+    caught_folded = sum(folded.contains_banned_word(m) for m in msgs)
+    print(f"{len(msgs)} messages, ~10% obfuscated")
+    print(f"  normalize_text only      {throughput(normalize_text, msgs):>10,.0f} msg/s")
+    print(f"  scan without normalize   {throughput(plain.scan, msgs):>10,.0f} msg/s  flagged {caught_plain}")
+    print(f"  scan with normalize      {throughput(folded.scan, msgs):>10,.0f} msg/s  flagged {caught_folded}")
+    print(f"  contains w/o normalize   {throughput(plain.contains_banned_word, msgs):>10,.0f} msg/s")
+    print(f"  contains with normalize  {throughput(folded.contains_banned_word, msgs):>10,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Moderation notice latency during a chatter flood: sending straight to
+the channel (discord.py serves a bucket first come, first served) vs the
+outbound scheduler.
+
+A fake channel enforces a per-channel message bucket, scaled down in
+time (5 messages per 0.5 s instead of per 5 s). Several channels receive
+chatter at increasing rates plus a steady trickle of moderation warnings.
+The benchmark reports how long a warning takes from being queued to being
+posted, and how many messages hit the API.
+
+    python benchmarks/bench_outbound.py [--seconds 4] [--channels 3]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from outbound import CHATTER, MODERATION, OutboundScheduler  # noqa: E402
+
+LATENCY = 0.04              # seconds per REST round trip
+BUCKET = (5, 0.5)           # messages per seconds, per channel
+WARNINGS_PER_S = 2          # per channel
+CHATTER_RATES = (0, 5, 20, 50)  # per channel per second
+
+
+class FakeChannel:
+    """Posts after LATENCY, waiting in line when the channel's bucket is empty"""
+
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.posted = 0
+        self._lock = asyncio.Lock()
+        self._stamps: List[float] = []
+
+    async def send(self, content=None, **kwargs):
+        limit, per = BUCKET
+        async with self._lock:
+            now = time.perf_counter()
+            self._stamps[:] = [t for t in self._stamps if now - t < per]
+            if len(self._stamps) >= limit:
+                await asyncio.sleep(per - (now - self._stamps[0]))
+            self._stamps.append(time.perf_counter())
+        await asyncio.sleep(LATENCY)
+        self.posted += 1
+        return object()
+
+
+async def timed(send) -> float:
+    start = time.perf_counter()
+    await send
+    return time.perf_counter() - start
+
+
+async def run(mode: str, chatter_rate: int, seconds: float, channels: int) -> dict:
+    rng = random.Random(5)
+    scheduler = OutboundScheduler()
+    chans = [FakeChannel(i) for i in range(channels)]
+    warnings: List[asyncio.Task] = []
+    background: List[asyncio.Future] = []
+    loop = asyncio.get_running_loop()
+
+    def send(channel: FakeChannel, text: str, priority: int, batch: str):
+        if mode == "direct":
+            return loop.create_task(channel.send(text))
+        return scheduler.submit(channel, text, priority=priority, batch=batch)
+
+    # Interleave both kinds of traffic on a 10 ms tick
+    tick = 0.01
+    chatter_per_tick = chatter_rate * tick
+    warn_every = int(1 / (WARNINGS_PER_S * tick))
+    owed = [0.0] * channels
+    for step in range(int(seconds / tick)):
+        for channel in chans:
+            owed[channel.id] += chatter_per_tick
+            while owed[channel.id] >= 1:
+                owed[channel.id] -= 1
+                background.append(send(channel, f"chatter {rng.random()}", CHATTER, "chatter"))
+            if step % warn_every == channel.id:
+                warnings.append(loop.create_task(timed(send(channel, f"warning {step}", MODERATION, "warn"))))
+        await asyncio.sleep(tick)
+
+    latencies = sorted(await asyncio.gather(*warnings))
+    if mode == "direct":
+        # Whatever chatter is still waiting on the bucket would only delay the next run
+        for future in background:
+            future.cancel()
+    else:
+        await asyncio.gather(*background)
+    return {
+        "warn_p50_ms": latencies[len(latencies) // 2] * 1000,
+        "warn_p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+        "warn_max_ms": latencies[-1] * 1000,
+        "posted": sum(c.posted for c in chans),
+        "dropped": sum(scheduler.dropped.values()),
+        "merged": sum(scheduler.merged.values()),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--channels", type=int, default=3)
+    args = parser.parse_args()
+    print(f"{args.channels} channels, {WARNINGS_PER_S} warnings/s each, bucket {BUCKET[0]} per {BUCKET[1]}s, "
+          f"{args.seconds:.0f}s per run")
+    for rate in CHATTER_RATES:
+        for mode in ("direct", "scheduled"):
+            r = await run(mode, rate, args.seconds, args.channels)
+            print(f"  chatter {rate:>3}/s  {mode:<9}  warning p50 {r['warn_p50_ms']:7.0f} ms  "
+                  f"p99 {r['warn_p99_ms']:7.0f} ms  max {r['warn_max_ms']:7.0f} ms   "
+                  f"posted {r['posted']:4}  dropped {r['dropped']:4}  merged {r['merged']:4}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
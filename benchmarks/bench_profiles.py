@@ -0,0 +1,107 @@
+"""
+Per-guild moderation profiles: many guilds, few distinct profiles.
+
+Assigns every guild one of a handful of profiles, and gives a share of
+guilds a word of their own, then scans messages from random guilds
+through ProfileMatchers (the shared index filtered by language, plus a
+small matcher per distinct set of guild words). Reports matchers
+compiled, memory and scan cost, against compiling a private matcher for
+every guild.
+
+    python benchmarks/bench_profiles.py [--guilds 2000] [--messages 20000] [--custom 0.2]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matcher import build_matcher  # noqa: E402
+from profiles import ProfileStore  # noqa: E402
+from wordfilter import BannedWords, ProfileMatchers  # noqa: E402
+from wordstore import WordStore  # noqa: E402
+
+PROFILES = [
+    (None, frozenset()),
+    (frozenset({"english"}), frozenset()),
+    (frozenset({"english", "hindi"}), frozenset()),
+    (frozenset({"english"}), frozenset({"pineapple pizza", "ranked queue"})),
+    (frozenset({"bengali", "hindi"}), frozenset()),
+    (None, frozenset({"spoiler"})),
+]
+TEXTS = ["anyone up for a match tonight", "gg well played", "that boss fight was brutal",
+         "you absolute moron", "pineapple pizza is fine actually", "check the pinned rules"]
+
+
+def rss_mib() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--guilds", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--custom", type=float, default=0.2, help="share of guilds with a word of their own")
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        banned = BannedWords(store=WordStore(os.path.join(tmp, "words.db")))
+        store = ProfileStore(os.path.join(tmp, "profiles.db"))
+        for guild_id in range(args.guilds):
+            languages, words = rng.choice(PROFILES)
+            if languages is not None:
+                await store.set_languages(guild_id, languages)
+            if rng.random() < args.custom:
+                words = words | {f"guildword{guild_id}"}
+            if words:
+                await store.add_words(guild_id, words)
+        matchers = ProfileMatchers(banned)
+
+        gc.collect()
+        before = rss_mib()
+        start = time.perf_counter()
+        for _ in range(args.messages):
+            profile = store.profile(rng.randrange(args.guilds))
+            text = rng.choice(TEXTS)
+            if profile.default_words:
+                banned.scan(text)
+            else:
+                await matchers.scan(text, profile.languages, profile.words)
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        print(f"{args.guilds} guilds, {len(PROFILES)} base profiles, {args.custom:.0%} with their own word, "
+              f"{args.messages} messages")
+        print(f"  shared:     {len(matchers.cache)} guild-word matchers compiled, +{rss_mib() - before:5.1f} MiB, "
+              f"{elapsed / args.messages * 1e6:5.1f} us/msg (profile lookup + scan)")
+
+        # What a private matcher per guild would cost, from a sample of guilds
+        sample = min(args.guilds, 200)
+        gc.collect()
+        before = rss_mib()
+        start = time.perf_counter()
+        private = []
+        for guild_id in range(sample):
+            profile = store.profile(guild_id)
+            words = set(profile.words)
+            for language in (banned.word_lists if profile.languages is None else profile.languages):
+                words.update(banned.word_lists.get(language, ()))
+            private.append(build_matcher({banned.normalize(w) for w in words}, banned.backend))
+        per_guild_mib = (rss_mib() - before) / sample
+        per_guild_ms = (time.perf_counter() - start) / sample * 1000
+        print(f"  per guild:  {args.guilds} matchers, ~{per_guild_mib * args.guilds:5.1f} MiB, "
+              f"~{per_guild_ms * args.guilds / 1000:4.1f} s of compiling (extrapolated from {sample})")
+        store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
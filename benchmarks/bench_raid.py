@@ -0,0 +1,62 @@
+"""
+Raid detector cost per message: normal chat vs a flood of near-duplicate
+copies from many fresh accounts, and how fast raid mode kicks in.
+
+    python benchmarks/bench_raid.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from raid import RaidDetector  # noqa: E402
+from wordfilter import BannedWords  # noqa: E402
+
+random.seed(11)
+COMMON = ("hey guys whats up with the match tonight lets go bro kya scene hai aaj "
+          "anyone playing ranked later need two more for squad gg well played").split()
+# Common words plus a long tail, roughly like real chat
+VOCAB = COMMON * 40 + ["".join(random.choices("abcdefghijklmnopqrstuvwxyz", k=random.randint(3, 9)))
+                       for _ in range(3000)]
+RAID = "FREE NITRO giveaway join discord.gg/scam now before it ends everyone"
+
+
+def chat(n):
+    return [(random.randrange(5000), " ".join(random.choices(VOCAB, k=random.randint(3, 14)))) for _ in range(n)]
+
+
+def flood(n):
+    variants = ["", " pls", " !!!", " @everyone", " hurry"]
+    return [(100000 + i, RAID + random.choice(variants) + f" {random.randrange(10**6)}") for i in range(n)]
+
+
+def run(label, events):
+    detector = RaidDetector()
+    words = BannedWords()
+    rejected, first = 0, None
+    start = time.perf_counter()
+    for i, (uid, text) in enumerate(events):
+        # Flood accounts are the new ones
+        hit = detector.observe(1, uid, text, 1, i, new_member=uid >= 100000, now=i * 0.005)
+        if hit:
+            rejected += 1
+            first = i if first is None else first
+        else:
+            words.scan(text)  # what a message pays when it is not rejected
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<14} {len(events) / elapsed:>9,.0f} msg/s   rejected {rejected:>6}"
+          f"   raid mode after {first if first is not None else '-'} msgs")
+
+
+def main():
+    run("normal chat", chat(20000))
+    run("raid flood", flood(20000))
+    mixed = chat(10000) + flood(10000)
+    random.shuffle(mixed)
+    run("mixed", mixed)
+
+
+if __name__ == "__main__":
+    main()
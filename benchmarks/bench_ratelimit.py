@@ -0,0 +1,85 @@
+"""
+Memory and per-message latency of the spam tracker with 100k simulated
+users, against the previous list-rebuilding approach.
+
+    python benchmarks/bench_ratelimit.py
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ratelimit import SpamTracker  # noqa: E402
+
+USERS = 100_000
+MESSAGES = 400_000
+TIME_FRAME = 5
+LIMIT = 5
+
+
+class FakeMessage:
+    """Roughly what a discord.Message pins in memory: content plus a few fields"""
+
+    def __init__(self, mid: int, created_at: datetime):
+        self.id = mid
+        self.created_at = created_at
+        self.content = "x" * 60
+        self.attachments = []
+        self.embeds = []
+
+
+def legacy(events):
+    times, recent = defaultdict(list), defaultdict(list)
+    epoch = datetime.now(timezone.utc)
+    for uid, mid, t in events:
+        now = epoch + timedelta(seconds=t)
+        times[uid].append(now)
+        times[uid] = [x for x in times[uid] if (now - x).total_seconds() <= TIME_FRAME]
+        recent[uid].append(FakeMessage(mid, now))
+        recent[uid] = [m for m in recent[uid] if (now - m.created_at).total_seconds() <= TIME_FRAME]
+        if len(times[uid]) >= LIMIT:
+            times[uid].clear()
+            recent[uid].clear()
+    return times, recent
+
+
+def tracker(events):
+    spam = SpamTracker(TIME_FRAME, LIMIT)
+    for uid, mid, t in events:
+        if spam.hit(uid, 1, mid, now=t):
+            spam.pop(uid)
+    return spam
+
+
+def run(label, fn, events):
+    tracemalloc.start()
+    start = time.perf_counter()
+    state = fn(events)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<8} {elapsed / len(events) * 1e6:7.2f} us/msg   "
+          f"retained {current / 2**20:7.1f} MiB   peak {peak / 2**20:7.1f} MiB")
+    return state
+
+
+def main():
+    random.seed(7)
+    # 400k messages from 100k users over 10 minutes, plus a few spammers
+    events = sorted(
+        ((random.randrange(USERS), i, random.uniform(0, 600)) for i in range(MESSAGES)),
+        key=lambda e: e[2]
+    )
+    print(f"{MESSAGES} messages from {USERS} users")
+    run("legacy", legacy, events)
+    spam = run("tracker", tracker, events)
+    print(f"  tracker holds {len(spam)} active users at the end")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,534 @@
+"""
+Offline replay of a message corpus through main.on_message (and the
+edit handlers for edit records).
+
+Messages are built from fake Member, Channel, Guild and Message objects
+whose REST methods are stubbed (optionally with a simulated delay), so
+no Discord connection is needed. Wikipedia and DuckDuckGo lookups are
+answered by canned stubs. The spam and raid detectors run on the
+corpus' own timestamps, so bursts trigger exactly as they would live.
+
+Reports messages/s, p50/p99 per-message latency, peak RSS and a
+per-stage breakdown from the metrics histograms, and compares against a
+saved baseline, along with how often banned-word verdicts came from
+the cache.
+
+    python benchmarks/bench_replay.py                         # synthetic corpus, compare to baseline
+    python benchmarks/bench_replay.py --save-baseline         # record a new baseline
+    python benchmarks/bench_replay.py --corpus messages.jsonl # replay a recorded corpus
+    python benchmarks/bench_replay.py --write-corpus out.jsonl
+
+Corpus lines are JSON objects:
+    {"t": seconds, "user": id, "channel": id, "dm": bool, "mention": bool, "content": str}
+Optional "attachments" lists filenames. An edit record adds "edit": true
+and "cached": bool; it replaces the content of that user's latest guild
+message.
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from itertools import count
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines", "replay.json")
+
+GUILD_ID = 752891683888431124  # main.ALLOWED_GUILD_ID
+BOT_ID = 1
+MODMAIL_CHANNEL_ID = 900
+CHANNELS = [1000 + i for i in range(8)]
+RAIDER_IDS = 50_000  # user ids from here up are freshly created accounts
+
+# Chatter is assembled from per-language vocabularies so that, as in a real
+# guild, different users rarely post the exact same text
+VOCABULARY = {
+    "english": "anyone up for a match tonight that boss fight was brutal gg everyone well played what time "
+               "is the tournament on saturday check pinned rules finally hit diamond rank lag again today "
+               "new patch nerfed my main queue with me after dinner".split(),
+    "spanish": "alguien quiere jugar esta noche buena partida equipo ganamos perdimos otra vez el servidor "
+               "va lento mañana torneo a las ocho".split(),
+    "french": "quelqu'un veut jouer ce soir bien joué tout le monde la mise à jour est sortie on relance "
+              "une partie après le dîner".split(),
+    "hinglish": "kal raat wala match mast tha bhai aaj kaun kaun online hai yaar thoda ruk ja abhi aata hoon "
+                "server phir se down hai".split(),
+    "russian": "кто-нибудь хочет поиграть сегодня вечером хорошая игра команда сервер опять лагает".split(),
+    "chinese": "今晚 有人 一起 玩吗 这局 打得 不错 服务器 又 卡了 明天 比赛".split(),
+    "arabic": "هل يريد أحد اللعب الليلة مباراة رائعة الخادم بطيء مرة أخرى".split(),
+}
+LANGUAGES = sorted(VOCABULARY)
+
+
+def chatter(rng: random.Random, words: int = 0) -> str:
+    vocab = VOCABULARY[rng.choice(LANGUAGES)]
+    return " ".join(rng.choice(vocab) for _ in range(words or rng.randint(3, 12)))
+
+
+FRIENDLY = ["hello there", "good morning everyone", "thanks for the help", "how are you doing today",
+            "what is the capital of france", "who wrote harry potter", "tell me something fun"]
+TOPICS = ["python", "discord", "minecraft", "headset", "keyboard", "valorant", "elden ring", "gpu",
+          "mars", "volcano", "chess", "jazz", "tokyo", "bread", "linux", "speedrun"]
+LINKS = ["https://youtu.be/dQw4w9WgXcQ", "https://github.com/user/repo/issues/12", "https://tenor.com/view/cat-dance-gif",
+         "https://en.wikipedia.org/wiki/Speedrun", "https://grabify.link/ABC123", "https://www.reddit.com/r/gaming/"]
+FILENAMES = ["screenshot_2024.png", "clip-final.mp4", "build notes.txt", "IMG_0042.jpg"]
+OBFUSCATIONS = [lambda w: w, str.upper, lambda w: " ".join(w), lambda w: w.replace("i", "1").replace("o", "0")]
+
+
+def synthetic_corpus(size: int = 20000, seed: int = 7) -> List[dict]:
+    """Mixed-language chatter with banned words, links, attachments, spam bursts, raids, long messages,
+    mentions, DMs and edits"""
+    from wordfilter import BannedWords
+    rng = random.Random(seed)
+    banned = sorted(w for words in BannedWords().word_lists.values() for w in words)
+    users = [10_000 + i for i in range(400)]
+    raiders = [RAIDER_IDS + i for i in range(200)]
+    out: List[dict] = []
+    t = 0.0
+
+    def add(user: int, content: str, channel: Optional[int] = None, dm: bool = False, mention: bool = False,
+            **extra):
+        out.append({"t": round(t, 3), "user": user, "channel": channel or rng.choice(CHANNELS),
+                    "dm": dm, "mention": mention, "content": content, **extra})
+
+    while len(out) < size:
+        t += rng.expovariate(40)  # ~40 messages/s across the guild
+        roll = rng.random()
+        user = rng.choice(users)
+        if roll < 0.58:
+            text = chatter(rng)
+            if rng.random() < 0.05:
+                text = f"{text} {rng.choice(LINKS)}"
+            extra = {"attachments": [rng.choice(FILENAMES)]} if rng.random() < 0.03 else {}
+            add(user, text, **extra)
+        elif roll < 0.60:
+            # Edit of a recent guild message; some sneak a banned word in after the fact
+            recent = [rec for rec in out[-50:] if not rec["dm"] and not rec.get("edit")]
+            if recent:
+                rec = rng.choice(recent)
+                suffix = rng.choice(banned) if rng.random() < 0.3 else chatter(rng, 2)
+                add(rec["user"], f"{rec['content']} {suffix}", rec["channel"], edit=True,
+                    cached=rng.random() < 0.8)
+        elif roll < 0.70:
+            word = rng.choice(OBFUSCATIONS)(rng.choice(banned))
+            add(user, f"{chatter(rng)} {word}")
+        elif roll < 0.78:
+            add(user, chatter(rng, 300)[:1900])
+        elif roll < 0.86:
+            text = rng.choice(FRIENDLY)
+            if rng.random() < 0.7:
+                text = f"{text} {chatter(rng, 3)}"
+            add(user, f"<@{BOT_ID}> {text}", mention=True)
+        elif roll < 0.91:
+            add(user, rng.choice(FRIENDLY) if rng.random() < 0.5 else chatter(rng), dm=True)
+        elif roll < 0.93:
+            add(user, f"{rng.choice(['wiki', 'search'])} {rng.choice(TOPICS)} {rng.choice(TOPICS)}")
+        elif roll < 0.98:
+            # Spam burst: one user, many messages within a couple of seconds
+            channel = rng.choice(CHANNELS)
+            for _ in range(rng.randint(6, 12)):
+                t += rng.uniform(0.05, 0.3)
+                add(user, rng.choice(["buy now!!!", "free nitro", "spam", "LOOK!!", "lol"]), channel)
+        else:
+            # Raid: many accounts posting near-identical copies
+            text = f"join {rng.choice(['my', 'the best', 'our'])} server for free nitro discord.gg/raid{rng.randint(0, 99)}"
+            for raider in rng.sample(raiders, rng.randint(6, 20)):
+                t += rng.uniform(0.01, 0.2)
+                add(raider, f"{text} {rng.randint(0, 9)}")
+    return out[:size]
+
+
+# ---------------------------------------------------------------------------
+# Fakes
+# ---------------------------------------------------------------------------
+_ids = count(10 ** 15)
+
+
+class Http:
+    """Stands in for Discord's REST API: counts calls and optionally sleeps"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls: Dict[str, int] = {}
+
+    async def call(self, route: str):
+        self.calls[route] = self.calls.get(route, 0) + 1
+        await asyncio.sleep(self.delay)
+
+
+class Asset:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+
+class Permissions:
+    def __init__(self, administrator: bool = False):
+        self.administrator = administrator
+
+
+class FakeUser:
+    bot = False
+    display_avatar = Asset()
+
+    def __init__(self, http: Http, user_id: int):
+        self._http = http
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+
+    def __str__(self):
+        return self.name
+
+    async def send(self, *args, **kwargs):
+        await self._http.call("dm")
+        return FakeSent(self._http, None)
+
+
+class FakeMember(FakeUser):
+    nick = None
+
+    def __init__(self, http: Http, user_id: int, guild: "FakeGuild"):
+        import discord
+        super().__init__(http, user_id)
+        self.guild = guild
+        self.guild_permissions = Permissions()
+        age = datetime.timedelta(hours=1) if user_id >= RAIDER_IDS else datetime.timedelta(days=400)
+        self.created_at = self.joined_at = discord.utils.utcnow() - age
+
+    async def edit(self, *, nick=None, reason=None):
+        await self._http.call("edit_member")
+        self.nick = nick
+        self.display_name = nick or self.name
+
+    async def timeout(self, until, reason=None):
+        await self._http.call("timeout")
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSent:
+    def __init__(self, http: Http, channel):
+        self._http = http
+        self.id = next(_ids)
+        self.channel = channel
+
+    async def create_thread(self, name: str):
+        await self._http.call("create_thread")
+        thread = FakeChannel(self._http, next(_ids), self.channel.guild)
+        self.channel.guild.threads[thread.id] = thread
+        return thread
+
+    async def delete(self):
+        await self._http.call("delete")
+
+
+class FakeChannel:
+    def __init__(self, http: Http, channel_id: int, guild: Optional["FakeGuild"], name: str = ""):
+        self._http = http
+        self.id = channel_id
+        self.guild = guild
+        self.name = name or f"channel-{channel_id}"
+
+    def __str__(self):
+        return self.name
+
+    async def send(self, *args, **kwargs):
+        await self._http.call("send")
+        return FakeSent(self._http, self)
+
+    async def delete_messages(self, messages):
+        await self._http.call("bulk_delete")
+
+    def get_partial_message(self, message_id: int):
+        return FakeSent(self._http, self)
+
+    def typing(self):
+        return _Typing()
+
+
+def make_dm_channel(http: Http, channel_id: int):
+    import discord
+
+    class FakeDM(discord.DMChannel):
+        # DMChannel's slots are set directly; isinstance checks in main must pass
+        def __init__(self):
+            self.id = channel_id
+            self._http = http
+
+        async def send(self, *args, **kwargs):
+            await http.call("dm")
+            return FakeSent(http, self)
+
+        def typing(self):
+            return _Typing()
+
+    return FakeDM()
+
+
+class FakeGuild:
+    def __init__(self, http: Http, guild_id: int):
+        self.id = guild_id
+        self.name = "bench-guild"
+        self.threads: Dict[int, FakeChannel] = {}
+        self.channels = {cid: FakeChannel(http, cid, self) for cid in CHANNELS}
+        self.channels[MODMAIL_CHANNEL_ID] = FakeChannel(http, MODMAIL_CHANNEL_ID, self, "mod-mail")
+        self.text_channels = list(self.channels.values())
+
+    def __str__(self):
+        return self.name
+
+    def get_thread(self, thread_id: int):
+        return self.threads.get(thread_id)
+
+
+class FakeAttachment:
+    def __init__(self, filename: str):
+        self.filename = filename
+
+
+class FakeMessage:
+    def __init__(self, http: Http, author, channel, guild, content: str, mention: bool,
+                 attachments: List[str] = ()):
+        self._http = http
+        self.id = next(_ids)
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self.content = content
+        self.mentions_bot = mention
+        self.embeds = []
+        self.attachments = [FakeAttachment(name) for name in attachments]
+
+    async def delete(self):
+        await self._http.call("delete")
+
+    async def reply(self, *args, **kwargs):
+        await self._http.call("send")
+        return FakeSent(self._http, self.channel)
+
+    async def add_reaction(self, emoji):
+        await self._http.call("reaction")
+
+
+class FakeEditPayload:
+    """The parts of discord.RawMessageUpdateEvent main reads, for a message not in the cache"""
+
+    def __init__(self, message: FakeMessage):
+        self.message = message
+        self.cached_message = None
+        self.data = {"id": str(message.id), "content": message.content}
+
+
+class BotUser:
+    id = BOT_ID
+    bot = True
+
+    def mentioned_in(self, message) -> bool:
+        return message.mentions_bot
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+def load_main(workdir: str, http: Http):
+    """Import main against throwaway stores and wire the fakes and upstream stubs into it"""
+    os.chdir(workdir)
+    os.environ.update(BANNED_WORDS_DB="words.db", MODMAIL_DB="modmail.db", PROFILE_DB="profiles.db",
+                      AUDIT_LOG="moderation.jsonl", AUDIT_DB="moderation.db")
+    import main
+    logging.getLogger().setLevel(logging.ERROR)
+
+    guild = FakeGuild(http, GUILD_ID)
+    bot = main.bot
+    bot._connection.user = BotUser()
+    FakeMessage._state = bot._connection  # read by bot.process_commands
+    bot.get_guild = lambda gid: guild if gid == GUILD_ID else None
+    bot.get_channel = lambda cid: guild.channels.get(cid) or guild.threads.get(cid)
+    bot.get_partial_messageable = lambda cid: FakeChannel(http, cid, guild)
+    return main, guild
+
+
+def stub_lookups(main, http: Http):
+    from wiki import WikiResult
+
+    async def wiki_summary(query: str):
+        await http.call("wikipedia")
+        return WikiResult("page", query.title(), f"{query.title()} is a stub article.", "")
+
+    async def web_search(query: str, user_id=None):
+        await http.call("duckduckgo")
+        return f"• [{query}](https://example.com)\nStub result."
+
+    lookup = main.bot.get_cog("Lookup")
+    lookup.wiki.summary = wiki_summary
+    lookup.search_service.search = web_search
+
+
+async def replay(main, guild: FakeGuild, http: Http, corpus: List[dict]) -> Dict[str, float]:
+    await main.load_extensions()
+    stub_lookups(main, http)
+    clock = [0.0]
+    main.spam_trackers.clock = lambda: clock[0]
+    main.raid_detector.clock = lambda: clock[0]
+    members: Dict[int, FakeMember] = {}
+    dms: Dict[int, object] = {}
+    latest: Dict[int, FakeMessage] = {}
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    for rec in corpus:
+        uid = rec["user"]
+        author = members.get(uid)
+        if author is None:
+            author = members[uid] = FakeMember(http, uid, guild)
+        if rec.get("edit"):
+            before = latest.get(uid)
+            if before is None:
+                continue
+            after = FakeMessage(http, author, before.channel, guild, rec["content"], before.mentions_bot,
+                                [a.filename for a in before.attachments])
+            after.id = before.id
+            latest[uid] = after
+            clock[0] = rec["t"]
+            start = time.perf_counter()
+            try:
+                if rec.get("cached", True):
+                    await main.on_message_edit(before, after)
+                else:
+                    await main.on_raw_message_edit(FakeEditPayload(after))
+            except Exception as e:
+                key = f"{type(e).__name__}: {e}"[:120]
+                errors[key] = errors.get(key, 0) + 1
+            latencies.append(time.perf_counter() - start)
+            continue
+        if rec.get("dm"):
+            channel = dms.get(uid)
+            if channel is None:
+                channel = dms[uid] = make_dm_channel(http, uid + 1)
+            message = FakeMessage(http, FakeUser(http, uid), channel, None, rec["content"], True)
+        else:
+            channel = guild.channels.get(rec["channel"]) or guild.channels[CHANNELS[0]]
+            message = FakeMessage(http, author, channel, guild, rec["content"], rec.get("mention", False),
+                                  rec.get("attachments", ()))
+            latest[uid] = message
+        clock[0] = rec["t"]
+        start = time.perf_counter()
+        try:
+            await main.on_message(message)
+        except Exception as e:
+            key = f"{type(e).__name__}: {e}"[:120]
+            errors[key] = errors.get(key, 0) + 1
+        latencies.append(time.perf_counter() - start)
+    # Let background work (bulk deletes, rebuilds) settle before reading counters
+    await asyncio.sleep(0.05)
+    return {"latencies": latencies, "errors": errors}
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def stage_breakdown() -> Dict[str, float]:
+    import metrics
+    return {name: h.sum / h.count * 1e6 for name, h in sorted(metrics.stage_seconds.children.items()) if h.count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--corpus", help="JSONL corpus to replay (default: synthetic)")
+    parser.add_argument("--size", type=int, default=20000, help="synthetic corpus size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--http-delay", type=float, default=0.0, help="simulated REST latency in seconds")
+    parser.add_argument("--write-corpus", help="write the corpus to this path and exit")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = [json.loads(line) for line in f if line.strip()]
+    else:
+        corpus = synthetic_corpus(args.size, args.seed)
+    if args.write_corpus:
+        with open(args.write_corpus, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(rec, ensure_ascii=False) + "\n" for rec in corpus)
+        print(f"Wrote {len(corpus)} messages to {args.write_corpus}")
+        return
+    digest = hashlib.sha256(json.dumps(corpus, sort_keys=True).encode()).hexdigest()[:16]
+
+    http = Http(args.http_delay)
+    with tempfile.TemporaryDirectory() as workdir:
+        main_module, guild = load_main(workdir, http)
+        gc.collect()
+        start = time.perf_counter()
+        result = asyncio.run(replay(main_module, guild, http, corpus))
+        elapsed = time.perf_counter() - start
+        verdicts = main_module.verdict_cache
+        main_module.audit.close()
+
+    ordered = sorted(result["latencies"])
+    report = {
+        "corpus": digest,
+        "messages": len(corpus),
+        "msgs_per_s": round(len(corpus) / elapsed, 1),
+        "p50_us": round(percentile(ordered, 0.50) * 1e6, 1),
+        "p99_us": round(percentile(ordered, 0.99) * 1e6, 1),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "http_calls": dict(sorted(http.calls.items())),
+        "errors": sum(result["errors"].values()),
+        "edits": sum(1 for rec in corpus if rec.get("edit")),
+        "verdict_hits": {"raw": verdicts.raw_hits, "normalized": verdicts.normalized_hits,
+                         "miss": verdicts.misses},
+        "verdict_hit_rate": round(verdicts.hit_rate, 3),
+        "stages_mean_us": {k: round(v, 1) for k, v in stage_breakdown().items()},
+        "python": platform.python_version(),
+    }
+
+    print(f"{report['messages']} messages (corpus {digest}) in {elapsed:.2f}s")
+    print(f"  throughput  {report['msgs_per_s']:>10.0f} msg/s")
+    print(f"  latency     p50 {report['p50_us']:.0f} us, p99 {report['p99_us']:.0f} us, max {report['max_ms']} ms")
+    print(f"  peak RSS    {report['peak_rss_mib']} MiB")
+    print(f"  REST calls  {report['http_calls']}")
+    print(f"  verdicts    {report['verdict_hit_rate']:.1%} cached {report['verdict_hits']} "
+          f"({report['edits']} edits)")
+    print("  stage mean  " + ", ".join(f"{k} {v:.0f} us" for k, v in report["stages_mean_us"].items()))
+    for error, n in sorted(result["errors"].items(), key=lambda kv: -kv[1])[:5]:
+        print(f"  error x{n}: {error}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            base = json.load(f)
+        note = "" if base.get("corpus") == digest else " (different corpus)"
+        print(f"vs baseline{note}:")
+        for key, better in (("msgs_per_s", 1), ("p50_us", -1), ("p99_us", -1), ("peak_rss_mib", -1)):
+            old, new = base[key], report[key]
+            change = (new - old) / old * 100 if old else 0.0
+            verdict = "better" if change * better > 5 else "worse" if change * better < -5 else "same"
+            print(f"  {key:<13} {old:>10} -> {new:<10} {change:+6.1f}% {verdict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Mention-reply routing: the old substring scan vs the compiled IntentRouter,
+with the built-in triggers and with hundreds of extra trigger groups.
+
+    python benchmarks/bench_router.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replies import friendly_triggers, general_knowledge_qa  # noqa: E402
+from router import IntentRouter  # noqa: E402
+
+MESSAGES = [
+    "<@123> hello there, how are you doing today?",
+    "<@123> what is pi?",
+    "<@123> tell me a joke about the world and party people",
+    "<@123> I wonder whether anybody in this server plays chess or checkers",
+    "<@123> " + "lorem ipsum dolor sit amet consectetur " * 20,
+]
+
+
+def legacy(triggers):
+    def route(content):
+        lowered = content.lower()
+        if (answer := general_knowledge_qa.get(lowered.strip().rstrip("?"))):
+            return answer
+        for group, responses in triggers.items():
+            if any(t in lowered for t in group):
+                return responses
+        return None
+    return route
+
+
+def bench(label, fn, repeat=20000):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(MESSAGES[i % len(MESSAGES)])
+    print(f"  {label:<8} {(time.perf_counter() - start) / repeat * 1e6:7.2f} us/msg")
+
+
+def main():
+    random.seed(5)
+    extra = {
+        tuple(f"phrase{g}x{i}" for i in range(4)) + (f"multi word {g} trigger",): [f"reply {g}"]
+        for g in range(500)
+    }
+    for label, triggers in (("built-in", dict(friendly_triggers)), ("+500 groups", {**friendly_triggers, **extra})):
+        print(f"{label}: {sum(len(g) for g in triggers)} triggers")
+        bench("legacy", legacy(triggers))
+        bench("router", IntentRouter(general_knowledge_qa, triggers).route)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Time to mitigate a spam burst against a fake Discord HTTP layer with
+per-route rate-limit buckets: the old sequential per-message deletes vs
+mitigation.mitigate_spam.
+
+    python benchmarks/bench_spam_cleanup.py
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+
+from mitigation import mitigate_spam  # noqa: E402
+
+LATENCY = 0.04  # seconds per REST round trip
+# (requests, per seconds) roughly matching Discord's buckets for each route
+BUCKETS = {
+    "delete_message": (5, 1.0),
+    "bulk_delete": (1, 1.0),
+    "send_message": (5, 5.0),
+    "edit_member": (10, 10.0),
+}
+
+
+class FakeHTTP:
+    """Serves every call after LATENCY, waiting when the route's bucket is empty"""
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self._buckets = {}
+
+    async def request(self, route: str, key: int):
+        limit, per = BUCKETS[route]
+        lock, stamps = self._buckets.setdefault((route, key), (asyncio.Lock(), []))
+        async with lock:
+            now = time.perf_counter()
+            stamps[:] = [t for t in stamps if now - t < per]
+            if len(stamps) >= limit:
+                await asyncio.sleep(per - (now - stamps[0]))
+            stamps.append(time.perf_counter())
+        self.calls[route] += 1
+        await asyncio.sleep(LATENCY)
+
+
+class FakePartialMessage:
+    def __init__(self, http, channel_id, message_id):
+        self.http, self.channel_id, self.id = http, channel_id, message_id
+
+    async def delete(self):
+        await self.http.request("delete_message", self.channel_id)
+
+
+class FakeChannel:
+    def __init__(self, http, channel_id):
+        self.http, self.id = http, channel_id
+
+    def get_partial_message(self, message_id):
+        return FakePartialMessage(self.http, self.id, message_id)
+
+    async def delete_messages(self, messages):
+        messages = list(messages)
+        await self.http.request("bulk_delete" if len(messages) > 1 else "delete_message", self.id)
+
+    async def send(self, content=None, **kwargs):
+        await self.http.request("send_message", self.id)
+
+
+class FakeMember:
+    def __init__(self, http, guild_id, user_id):
+        self.http, self.guild_id, self.id = http, guild_id, user_id
+        self.mention = f"<@{user_id}>"
+
+    async def timeout(self, until, reason=None):
+        await self.http.request("edit_member", self.guild_id)
+
+
+class FakeMessage:
+    def __init__(self, author, channel):
+        self.author, self.channel = author, channel
+
+
+async def legacy(message, refs, channels):
+    """The pre-change path: one awaited delete per message, then notice, then timeout"""
+    for channel_id, message_id in refs:
+        await channels[channel_id].get_partial_message(message_id).delete()
+    await message.channel.send(f"{message.author.mention} stop spamming!")
+    await message.author.timeout(discord.utils.utcnow() + timedelta(seconds=60), reason="Spam")
+
+
+async def new(message, refs, channels):
+    await mitigate_spam(message, refs, 60, resolve_channel=channels.__getitem__)
+
+
+async def burst(handler, spammers: int, per_user: int, channel_count: int):
+    http = FakeHTTP()
+    channels = {cid: FakeChannel(http, cid) for cid in range(channel_count)}
+    jobs = []
+    mid = 0
+    for uid in range(spammers):
+        refs = []
+        for _ in range(per_user):
+            mid += 1
+            refs.append((random.randrange(channel_count), mid))
+        message = FakeMessage(FakeMember(http, 1, uid), channels[refs[-1][0]])
+        jobs.append((message, refs))
+
+    latencies = []
+
+    async def one(message, refs):
+        start = time.perf_counter()
+        await handler(message, refs, channels)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(m, r) for m, r in jobs))
+    total = time.perf_counter() - start
+    latencies.sort()
+    return total, latencies[len(latencies) // 2], latencies[-1], dict(http.calls)
+
+
+async def main():
+    random.seed(3)
+    for spammers, per_user, channel_count in ((1, 5, 1), (1, 5, 3), (10, 5, 2), (30, 8, 3)):
+        print(f"{spammers} spammers x {per_user} msgs over {channel_count} channels")
+        for label, handler in (("legacy", legacy), ("bulk", new)):
+            total, p50, worst, calls = await burst(handler, spammers, per_user, channel_count)
+            print(f"  {label:<6} all done {total:6.2f}s  per-user p50 {p50:6.2f}s max {worst:6.2f}s  calls {calls}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""
+Cold vs warm start of the banned-word filter backed by the SQLite store.
+
+    python benchmarks/bench_startup.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matcher import MATCHER_BACKENDS  # noqa: E402
+from wordfilter import BannedWords  # noqa: E402
+from wordstore import WordStore  # noqa: E402
+
+
+def timed_start(path: str, backend: str) -> str:
+    start = time.perf_counter()
+    words = BannedWords(backend=backend, store=WordStore(path))
+    total = (time.perf_counter() - start) * 1000
+    return f"{total:7.1f} ms total, matcher {words.load_source} in {words.load_ms:6.1f} ms"
+
+
+def main():
+    for extra in (0, 20000):
+        for backend in MATCHER_BACKENDS:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "words.db")
+                store = WordStore(path)
+                seeded = BannedWords(backend=backend, store=store)
+                asyncio.run(seeded.bulk_add([f"custom{i}word" for i in range(extra)], "custom"))
+                with store._conn:
+                    store._conn.execute("DELETE FROM matcher_cache")
+                store.close()
+                print(f"{backend:<6} {len(seeded.all_words):>6} words")
+                print(f"  cold: {timed_start(path, backend)}")
+                print(f"  warm: {timed_start(path, backend)}")
+
+
+if __name__ == "__main__":
+    main()
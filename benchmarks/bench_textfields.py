@@ -0,0 +1,139 @@
+"""
+Moderating every text-bearing field of a message instead of its content.
+
+Scans the same messages three ways through the verdict cache: content
+only, MessageScanner.first_violation (stops at the first hit) and the
+full violations() list. Messages are plain chatter, or chatter with an
+unfurled link embed and an attachment, some carrying a banned word in
+one of the extra fields. Also reports the cost of a domain check with
+and without the per-domain decision cache.
+
+    python benchmarks/bench_textfields.py [--messages 20000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+
+from links import DEFAULT_BLOCKED_DOMAINS, DomainBlocklist  # noqa: E402
+from modpool import ModerationPool  # noqa: E402
+from profiles import DEFAULT_PROFILE  # noqa: E402
+from textfields import MessageScanner  # noqa: E402
+from verdicts import VerdictCache  # noqa: E402
+from wordfilter import BannedWords, ProfileMatchers  # noqa: E402
+from wordstore import WordStore  # noqa: E402
+
+WORDS = ("anyone up for a match tonight that boss fight was brutal gg everyone well played what time "
+         "is the tournament on saturday check pinned rules finally hit diamond rank").split()
+HOSTS = ["youtu.be", "github.com", "tenor.com", "en.wikipedia.org", "www.reddit.com", "cdn.discordapp.com"]
+
+
+class Attachment:
+    def __init__(self, filename: str):
+        self.filename = filename
+
+
+class Author:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.display_name = f"player{user_id}"
+
+
+class Guild:
+    id = 1
+
+
+class Message:
+    guild = Guild()
+
+    def __init__(self, author: Author, content: str, embeds=(), attachments=()):
+        self.author = author
+        self.content = content
+        self.embeds = list(embeds)
+        self.attachments = list(attachments)
+
+
+def make_messages(n: int, banned: list, rng: random.Random) -> list:
+    authors = [Author(i) for i in range(500)]
+    out = []
+    for _ in range(n):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+        if rng.random() < 0.7:
+            out.append(Message(rng.choice(authors), text))
+            continue
+        slug = "-".join(rng.choice(WORDS) for _ in range(3))
+        url = f"https://{rng.choice(HOSTS)}/{slug}"
+        title = " ".join(rng.choice(WORDS) for _ in range(5))
+        if rng.random() < 0.1:
+            title = f"{title} {rng.choice(banned)}"
+        embed = discord.Embed(title=title, description=" ".join(rng.choice(WORDS) for _ in range(20)), url=url)
+        out.append(Message(rng.choice(authors), f"{text} {url}", [embed], [Attachment(f"{slug}.png")]))
+    return out
+
+
+def per_message(elapsed: float, n: int) -> str:
+    return f"{elapsed / n * 1e6:6.1f} us/msg"
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+    rng = random.Random(5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        banned = BannedWords(store=WordStore(os.path.join(tmp, "words.db")))
+        verdicts = VerdictCache(banned, ModerationPool(banned), ProfileMatchers(banned))
+        blocklist = DomainBlocklist(DEFAULT_BLOCKED_DOMAINS)
+        scanner = MessageScanner(blocklist)
+        messages = make_messages(args.messages, sorted(banned.word_lists["english"]), rng)
+
+        async def scan(text: str):
+            return await verdicts.scan(text, DEFAULT_PROFILE)
+
+        async def content_only(message):
+            return await scan(message.content)
+
+        async def every_violation(message):
+            return [v async for v in scanner.violations(message, scan)]
+
+        plain = [m for m in messages if not m.embeds]
+        rich = [m for m in messages if m.embeds]
+        print(f"{len(plain)} plain messages, {len(rich)} with a link embed and attachment")
+        for name, fn in (("content only", content_only),
+                         ("first violation", lambda m: scanner.first_violation(m, scan)),
+                         ("all violations", every_violation)):
+            verdicts.cache.clear()
+            scanner.clean_names.clear()
+            row = []
+            for group in (plain, rich):
+                caught = 0
+                start = time.perf_counter()
+                for message in group:
+                    caught += bool(await fn(message))
+                row.append(f"{per_message(time.perf_counter() - start, len(group))} ({caught:>4} flagged)")
+            print(f"  {name:<16} plain {row[0]}, rich {row[1]}")
+
+        # Unique hosts miss the decision cache and walk their parent domains
+        fresh = [f"u{i}.media.{rng.choice(HOSTS)}" for i in range(args.messages)]
+        start = time.perf_counter()
+        for host in fresh:
+            blocklist.blocked(host)
+        walked = time.perf_counter() - start
+        hosts = [rng.choice(HOSTS) for _ in range(args.messages)]
+        start = time.perf_counter()
+        for host in hosts:
+            blocklist.blocked(host)
+        print(f"  domain check     {(time.perf_counter() - start) / len(hosts) * 1e9:6.0f} ns cached, "
+              f"{walked / len(fresh) * 1e9:6.0f} ns walking parent domains")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+"""
+Legacy Flask keep-alive thread vs the aiohttp server on the bot loop.
+
+Each variant runs in a fresh interpreter that also runs an event loop
+(standing in for the bot) with a lag probe, with discord.py already
+imported as it is in the bot. The parent measures startup
+time, RSS, request throughput on /metrics and the loop lag seen while
+the requests are served.
+
+    python benchmarks/bench_webserver.py
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUESTS = 500
+
+CHILD = r"""
+import asyncio, json, os, sys, time
+sys.path.insert(0, {root!r})
+variant, port = sys.argv[1], int(sys.argv[2])
+import discord  # the bot has this loaded either way; only the web server's cost is measured
+start = time.perf_counter()
+
+def rss_mib():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+base_rss = rss_mib()
+lags = []
+
+async def probe():
+    loop = asyncio.get_running_loop()
+    while True:
+        t = loop.time()
+        await asyncio.sleep(0.005)
+        lags.append(loop.time() - t - 0.005)
+
+async def main():
+    if variant == "flask":
+        import threading
+        from flask import Flask, Response
+        from metrics import registry
+        app = Flask("")
+        app.add_url_rule("/", "home", lambda: "I'm alive!")
+        app.add_url_rule("/metrics", "metrics", lambda: Response(registry.render(), mimetype="text/plain"))
+        import logging
+        logging.getLogger("werkzeug").disabled = True
+        threading.Thread(target=app.run, kwargs={{"host": "127.0.0.1", "port": port}}, daemon=True).start()
+    else:
+        from webserver import WebServer
+
+        class StubBot:
+            latency = 0.05
+            guilds = []
+            shards = {{0: None}}
+            def is_ready(self): return True
+            def is_closed(self): return False
+
+        server = WebServer(StubBot(), "127.0.0.1", port)
+        server.shard_connected(0)
+        await server.start()
+    asyncio.get_running_loop().create_task(probe())
+    print(json.dumps({{"ready_ms": (time.perf_counter() - start) * 1000}}), flush=True)
+    await asyncio.get_running_loop().run_in_executor(None, sys.stdin.readline)
+    lags.sort()
+    print(json.dumps({{
+        "rss_mib": rss_mib(), "rss_delta_mib": rss_mib() - base_rss,
+        "lag_p99_ms": lags[int(0.99 * (len(lags) - 1))] * 1000 if lags else 0.0,
+    }}), flush=True)
+
+asyncio.run(main())
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def read_json(child: subprocess.Popen) -> dict:
+    # Flask prints its banner to stdout, so skip anything that is not ours
+    for line in child.stdout:
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError("child exited early")
+
+
+def run(variant: str) -> dict:
+    port = free_port()
+    launched = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, "-c", CHILD.format(root=ROOT), variant, str(port)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    result = read_json(child)
+    url = f"http://127.0.0.1:{port}"
+    while True:
+        try:
+            urllib.request.urlopen(url + "/", timeout=1).read()
+            break
+        except OSError:
+            time.sleep(0.01)
+    result["first_response_ms"] = (time.perf_counter() - launched) * 1000
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        urllib.request.urlopen(url + "/metrics", timeout=5).read()
+    result["req_per_s"] = REQUESTS / (time.perf_counter() - start)
+    child.stdin.write("\n")
+    child.stdin.flush()
+    result.update(read_json(child))
+    child.wait()
+    return result
+
+
+def main():
+    for variant in ("flask", "aiohttp"):
+        try:
+            r = run(variant)
+        except RuntimeError:
+            print(f"{variant:<8} unavailable (missing dependency?)")
+            continue
+        print(f"{variant:<8} ready {r['ready_ms']:6.1f} ms  first response {r['first_response_ms']:6.1f} ms  "
+              f"RSS {r['rss_mib']:5.1f} MiB (+{r['rss_delta_mib']:4.1f})  "
+              f"{r['req_per_s']:6.0f} req/s  loop lag p99 {r['lag_p99_ms']:5.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+discord.py extensions holding the bot's commands and optional features.
+
+main.py keeps the message pipeline (raid, spam, banned words, mod-mail
+relay, replies) and loads these in setup_hook; `!reload <name>` swaps
+one in without restarting the process. Shared services are attributes
+main.py sets on the bot: home_guild_id, audit, banned_words, domain_blocklist,
+profiles, modmail, intent_router and response_dedup.
+"""
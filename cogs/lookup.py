@@ -0,0 +1,131 @@
+"""
+Wikipedia and web search lookups: "wiki <query>" and "search <query>"
+(or "!search <query>") messages, plus !searchstats.
+
+The lookup clients are created when this extension loads, and
+duckduckgo_search is only imported on the first search.
+"""
+import logging
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+import metrics
+from cache import normalize_query
+from outbound import outbox
+from responses import EmbedCache
+from search import SearchBusy, SearchService
+from wiki import WikiClient
+
+log = logging.getLogger("bot")
+
+
+class Lookup(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.wiki = WikiClient()
+        self.search_service = SearchService()
+        self.embed_cache = EmbedCache()
+
+        metrics.registry.register_caches(
+            {"wiki": self.wiki.cache, "search": self.search_service.cache, "embeds": self.embed_cache}
+        )
+        metrics.registry.gauge("bot_search_pending", "Web searches waiting or running.",
+                               lambda: self.search_service.stats()["pending"])
+        metrics.registry.counter("bot_search_rejected_total", "Web searches turned away by the limits.",
+                                 lambda: self.search_service.rejected)
+
+    async def cog_unload(self):
+        await self.wiki.close()
+        self.search_service.close()
+
+    async def route_message(self, message: discord.Message, timer: metrics.MessageTimer) -> bool:
+        """Answer a wiki or search message; False if the message is neither"""
+        content = message.content.lower()
+        dedup = self.bot.response_dedup
+
+        timer.stage("wiki")
+        if content.startswith("wiki "):
+            query = message.content[5:].strip()
+            await dedup.respond_once(message, ("wiki", normalize_query(query)),
+                                     lambda: self.wiki_search(message, query))
+            return True
+
+        timer.stage("search")
+        if content.startswith(("search ", "!search ")):
+            prefix = "search " if content.startswith("search ") else "!search "
+            query = message.content[len(prefix):].strip()
+            await dedup.respond_once(message, ("search", normalize_query(query)),
+                                     lambda: self.web_search(message, query))
+            return True
+        return False
+
+    async def wiki_search(self, message: discord.Message, query: str) -> Optional[discord.Message]:
+        """Handle Wikipedia search requests"""
+        try:
+            async with message.channel.typing():
+                clean_query = query.strip()
+                if not clean_query:
+                    await outbox.reply(message, "Please specify a search term after 'wiki'")
+                    return None
+
+                result = await self.wiki.summary(clean_query)
+                if result.kind == "page":
+                    embed = self.embed_cache.get(("wiki", result.title, result.summary, result.url), lambda: discord.Embed(
+                        title=f"Wikipedia: {result.title}",
+                        description=result.summary,
+                        color=discord.Color.blue(),
+                        url=result.url or f"https://en.wikipedia.org/wiki/{result.title.replace(' ', '_')}"
+                    ))
+                    return await outbox.reply(message, embed=embed)
+                elif result.kind == "disambiguation":
+                    options = "\n".join(f"• {opt}" for opt in result.options)
+                    return await outbox.reply(message, f"Multiple matches found:\n{options}\n\nPlease be more specific!")
+                else:
+                    return await outbox.reply(message, f"No Wikipedia page found for '{clean_query}'. Try different keywords?")
+
+        except Exception as e:
+            log.error(f"Wikipedia error: {e}")
+            await outbox.reply(message, "Wikipedia search failed. Try again later.")
+            return None
+
+    async def web_search(self, message: discord.Message, query: str) -> Optional[discord.Message]:
+        """Handle DuckDuckGo web searches"""
+        try:
+            async with message.channel.typing():
+                clean_query = query.strip()
+                if not clean_query:
+                    await outbox.reply(message, "Please specify a search term after 'search'")
+                    return None
+
+                try:
+                    results = await self.search_service.search(clean_query, message.author.id)
+                except SearchBusy as e:
+                    await outbox.reply(message, f"⏳ {e}")
+                    return None
+                embed = self.embed_cache.get(("search", clean_query, results), lambda: discord.Embed(
+                    title=f"Search Results: {clean_query}",
+                    description=results,
+                    color=discord.Color.green()
+                ))
+                return await outbox.reply(message, embed=embed)
+        except Exception as e:
+            log.error(f"Web search error: {e}")
+            await outbox.reply(message, "Web search failed. Please try again later.")
+            return None
+
+    @commands.command(name="searchstats")
+    async def search_stats(self, ctx: commands.Context):
+        stats = self.search_service.stats()
+        await ctx.send(
+            "**Search stats:**\n"
+            f" • Requests: {stats['requests']} (cache hit rate {stats['cache_hit_rate']:.0%}, "
+            f"{stats['coalesced']} coalesced, {stats['rejected']} rejected, {stats['errors']} errors)\n"
+            f" • Latency: p50 {stats['latency_p50_ms']:.0f} ms, p95 {stats['latency_p95_ms']:.0f} ms\n"
+            f" • In flight: {stats['pending']} (queued {stats['queue_depth']})"
+        )
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Lookup(bot))
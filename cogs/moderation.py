@@ -0,0 +1,89 @@
+"""
+Moderator commands for the banned-word lists, the blocked link domains
+and the audit log: !addbanned, !removebanned, !importbanned,
+!blockdomain, !unblockdomain and !modstats.
+
+The lists are shared by every guild and the audit log covers all of
+them, so these commands only work in the home guild. Other guilds tune
+their own moderation with !profile.
+"""
+import asyncio
+
+import discord
+from discord.ext import commands
+
+from wordfilter import parse_word_file
+
+
+class Moderation(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        return ctx.guild is not None and ctx.guild.id == self.bot.home_guild_id
+
+    @commands.command(name="modstats")
+    @commands.has_permissions(manage_messages=True)
+    async def moderation_stats(self, ctx: commands.Context, days: int = 7):
+        days = max(1, min(days, 365))
+        # Read on an executor; the audit writer thread may be holding the store
+        stats = await asyncio.get_running_loop().run_in_executor(None, self.bot.audit.stats, days)
+        if not stats["counts"]:
+            await ctx.send(f"📊 No moderation events in the last {days} day(s).")
+            return
+        lines = [f"📊 **Moderation, last {days} day(s)**"]
+        lines += [f"• {kind} / {action}: {count}" for kind, action, count in stats["counts"]]
+        if stats["users"]:
+            lines.append("**Most actioned users:** " + ", ".join(f"<@{uid}> ({count})" for uid, count in stats["users"]))
+        if stats["latency_avg_ms"] is not None:
+            lines.append(f"Response latency: avg {stats['latency_avg_ms']:.0f} ms, max {stats['latency_max_ms']:.0f} ms")
+        await ctx.send("\n".join(lines), allowed_mentions=discord.AllowedMentions.none())
+
+    @commands.command(name="addbanned")
+    @commands.has_permissions(manage_messages=True)
+    async def add_banned_word(self, ctx: commands.Context, language: str, *, words: str):
+        """Add custom banned words"""
+        word_list = [w.strip() for w in words.split(",")]
+        added = await self.bot.banned_words.add_custom_words(word_list, language.lower())
+        await ctx.send(f"✅ Added {added} words to {language} banned list")
+
+    @commands.command(name="removebanned")
+    @commands.has_permissions(manage_messages=True)
+    async def remove_banned_word(self, ctx: commands.Context, language: str, *, words: str):
+        """Remove banned words from a language, or from every list with `all`"""
+        word_list = [w.strip() for w in words.split(",")]
+        lang = language.lower()
+        removed = await self.bot.banned_words.remove_custom_words(word_list, None if lang == "all" else lang)
+        await ctx.send(f"✅ Removed {removed} words from {language} banned list")
+
+    @commands.command(name="importbanned")
+    @commands.has_permissions(manage_messages=True)
+    async def import_banned_words(self, ctx: commands.Context, language: str):
+        """Bulk-add banned words from an attached text file (one per line or comma separated)"""
+        if not ctx.message.attachments:
+            await ctx.send("❌ Attach a text file with the words to import.")
+            return
+        try:
+            text = (await ctx.message.attachments[0].read()).decode("utf-8")
+        except UnicodeDecodeError:
+            await ctx.send("❌ The file must be UTF-8 text.")
+            return
+        added = await self.bot.banned_words.bulk_add(parse_word_file(text), language.lower())
+        await ctx.send(f"✅ Imported {added} new words into {language} banned list")
+
+    @commands.command(name="blockdomain")
+    @commands.has_permissions(manage_messages=True)
+    async def block_domain(self, ctx: commands.Context, *, domains: str):
+        """Delete messages linking to these domains or their subdomains"""
+        added = await self.bot.domain_blocklist.add(domains.replace(",", " ").split())
+        await ctx.send(f"✅ Blocked {added} new domains")
+
+    @commands.command(name="unblockdomain")
+    @commands.has_permissions(manage_messages=True)
+    async def unblock_domain(self, ctx: commands.Context, *, domains: str):
+        removed = await self.bot.domain_blocklist.remove(domains.replace(",", " ").split())
+        await ctx.send(f"✅ Unblocked {removed} domains")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Moderation(bot))
@@ -0,0 +1,85 @@
+"""
+!profile: a guild's own moderation settings.
+
+    !profile                                 show the current settings
+    !profile languages english, hindi        enforce only these lists (or `all`)
+    !profile addwords word, another phrase   words banned in this guild only
+    !profile removewords word, ...
+    !profile spam <messages> <seconds> [timeout seconds]
+    !profile reset                           back to the defaults
+"""
+from typing import Optional
+
+from discord.ext import commands
+
+
+def _split(text: str) -> set:
+    return {w.strip().lower() for w in text.split(",") if w.strip()}
+
+
+class Profile(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        if not ctx.author.guild_permissions.manage_guild:
+            raise commands.MissingPermissions(["manage_guild"])
+        return True
+
+    @commands.group(name="profile", invoke_without_command=True)
+    async def profile(self, ctx: commands.Context):
+        p = self.bot.profiles.profile(ctx.guild.id)
+        languages = ", ".join(sorted(p.languages)) if p.languages is not None else "all"
+        await ctx.send(
+            "**Moderation profile:**\n"
+            f" • Languages: {languages}\n"
+            f" • Guild words: {len(p.words)}\n"
+            f" • Spam: {p.spam_message_limit} messages in {p.spam_time_frame:g}s → {p.timeout_seconds}s timeout"
+        )
+
+    @profile.command(name="languages")
+    async def set_languages(self, ctx: commands.Context, *, languages: str):
+        chosen = _split(languages)
+        if chosen == {"all"}:
+            await self.bot.profiles.set_languages(ctx.guild.id, None)
+            await ctx.send("✅ Enforcing every language list")
+            return
+        known = set(self.bot.banned_words.word_lists)
+        unknown = chosen - known
+        if unknown or not chosen:
+            await ctx.send(f"❌ Unknown language(s): {', '.join(sorted(unknown)) or 'none given'}. "
+                           f"Available: {', '.join(sorted(known))}, or `all`")
+            return
+        await self.bot.profiles.set_languages(ctx.guild.id, chosen)
+        await ctx.send(f"✅ Enforcing {', '.join(sorted(chosen))}")
+
+    @profile.command(name="addwords")
+    async def add_words(self, ctx: commands.Context, *, words: str):
+        added = await self.bot.profiles.add_words(ctx.guild.id, _split(words))
+        await ctx.send(f"✅ Added {added} words to this server's list")
+
+    @profile.command(name="removewords")
+    async def remove_words(self, ctx: commands.Context, *, words: str):
+        removed = await self.bot.profiles.remove_words(ctx.guild.id, _split(words))
+        await ctx.send(f"✅ Removed {removed} words from this server's list")
+
+    @profile.command(name="spam")
+    async def set_spam(self, ctx: commands.Context, messages: int, seconds: float, timeout: Optional[int] = None):
+        if not (2 <= messages <= 50 and 1 <= seconds <= 120):
+            await ctx.send("❌ Use 2-50 messages within 1-120 seconds.")
+            return
+        timeout = self.bot.profiles.profile(ctx.guild.id).timeout_seconds if timeout is None else timeout
+        timeout = max(1, min(timeout, 28 * 24 * 3600))  # Discord caps timeouts at 28 days
+        await self.bot.profiles.set_spam_limits(ctx.guild.id, messages, seconds, timeout)
+        await ctx.send(f"✅ {messages} messages in {seconds:g}s now earn a {timeout}s timeout")
+
+    @profile.command(name="reset")
+    async def reset(self, ctx: commands.Context):
+        await self.bot.profiles.reset(ctx.guild.id)
+        await ctx.send("✅ Moderation profile reset to the defaults")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Profile(bot))
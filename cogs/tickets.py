@@ -0,0 +1,53 @@
+"""
+Moderator commands for mod-mail tickets: !reply and !close.
+
+Tickets belong to the home guild's mod-mail, so these commands only work
+there.
+"""
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+
+class Tickets(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        return ctx.guild is not None and ctx.guild.id == self.bot.home_guild_id
+
+    @commands.command(name="reply")
+    @commands.has_permissions(manage_messages=True)
+    async def reply_to_modmail(self, ctx: commands.Context, message_id: int, *, response: str):
+        store = self.bot.modmail.store
+        ticket = store.ticket_for_message(message_id)
+        if not ticket:
+            await ctx.send("❌ Message ID not found in active mod-mail.")
+            return
+        try:
+            user = self.bot.get_user(ticket.user_id) or await self.bot.fetch_user(ticket.user_id)
+            sent = await user.send(f"📩 **Moderator reply:**\n{response}")
+            await store.record(sent.id, ticket, "out", ctx.author.id, response)
+            await ctx.send(f"✅ Replied to {user.display_name} (ticket #{ticket.id})")
+        except discord.Forbidden:
+            await ctx.send("❌ Cannot DM this user.")
+
+    @commands.command(name="close")
+    @commands.has_permissions(manage_messages=True)
+    async def close_modmail(self, ctx: commands.Context, message_id: Optional[int] = None):
+        store = self.bot.modmail.store
+        # Inside a ticket thread the thread itself identifies the ticket
+        ticket = store.ticket_for_message(message_id or ctx.channel.id)
+        if not ticket:
+            await ctx.send("❌ Message ID not found in active mod-mail.")
+            return
+        if ticket.status == "closed":
+            await ctx.send(f"ℹ️ Ticket #{ticket.id} is already closed.")
+            return
+        await store.close(ticket)
+        await ctx.send(f"✅ Closed ticket #{ticket.id}; the user's next message opens a new one.")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Tickets(bot))
@@ -0,0 +1,30 @@
+"""
+!triggers: lists the phrases the bot answers when tagged or DMed.
+"""
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+from responses import TriggerListing
+
+
+class Triggers(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.listing = TriggerListing(bot.intent_router)
+
+    @commands.command(name="triggers")
+    async def list_triggers(self, ctx: commands.Context):
+        async def send_listing() -> Optional[discord.Message]:
+            sent = None
+            for page in self.listing.pages():
+                sent = await ctx.send(page)
+            return sent
+
+        key = ("triggers", self.bot.intent_router.version)
+        await self.bot.response_dedup.respond_once(ctx.message, key, send_listing)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Triggers(bot))
@@ -0,0 +1,112 @@
+"""
+Links in message text and the blocked-domain list.
+
+The blocklist is an in-memory set of domains, each of which also blocks
+its subdomains. A link's host is checked by walking its parent domains,
+and the verdict is cached per host. Chat links cluster on a few
+hosts, so most checks are one cache lookup. The store owns the list
+once seeded, so domains added or removed by moderators survive
+restarts. Changes apply in memory at once; the store write runs on the
+default executor.
+"""
+import asyncio
+import re
+from typing import Iterable, Iterator, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from cache import TTLCache
+from wordstore import WordStore
+
+DOMAIN_DECISIONS = 4096
+
+# IP loggers, commonly used to harvest addresses from whoever clicks
+DEFAULT_BLOCKED_DOMAINS = frozenset({"grabify.link", "iplogger.org", "iplogger.com", "2no.co"})
+
+URL_RE = re.compile(r"https?://([^\s/?#<>]+)([^\s<>]*)", re.IGNORECASE)
+_SLUG_SEPARATORS = re.compile(r"[\W_]+")
+_PATH_SEPARATORS = re.compile(r"[/?#&=]+")
+# Video, invite and paste IDs, hashes and numeric IDs: a short token with a
+# digit or an inner capital, a long hex string, or a run of digits
+_OPAQUE_ID = re.compile(
+    r"(?=[\w-]*(?:\d|[a-z][A-Z]))[A-Za-z0-9_-]{1,11}|[0-9a-fA-F-]{12,}|\d+"
+)
+
+
+def normalize_domain(domain: str) -> str:
+    host = domain.rsplit("@", 1)[-1]
+    if host.startswith("["):  # IPv6 literal
+        host = host.split("]", 1)[0] + "]"
+    else:
+        host = host.split(":", 1)[0]
+    return host.strip(".").lower()
+
+
+def link_slug(path: str) -> str:
+    """Words of the human-readable segments of a link path, skipping opaque IDs"""
+    words = []
+    for segment in _PATH_SEPARATORS.split(path):
+        segment = unquote(segment)
+        if segment and not _OPAQUE_ID.fullmatch(segment):
+            words.append(_SLUG_SEPARATORS.sub(" ", segment).strip())
+    return " ".join(w for w in words if w)
+
+
+def strip_links(text: str) -> str:
+    """text with its links removed, for scanning apart from their hosts and slugs"""
+    return URL_RE.sub(" ", text) if "://" in text else text
+
+
+def find_links(text: str) -> Iterator[Tuple[str, str]]:
+    """(host, slug words) for every http(s) link in text"""
+    if "://" not in text:
+        return
+    for m in URL_RE.finditer(text):
+        yield normalize_domain(m.group(1)), link_slug(m.group(2))
+
+
+class DomainBlocklist:
+    def __init__(self, domains: Iterable[str] = (), store: Optional[WordStore] = None,
+                 cache_size: int = DOMAIN_DECISIONS):
+        self.store = store
+        self.domains: Set[str] = {normalize_domain(d) for d in domains}
+        if store is not None:
+            self.domains = store.load_domains(self.domains)
+        # host -> blocking entry, or "" when allowed
+        self._decisions = TTLCache(cache_size, ttl=float("inf"))
+
+    def __len__(self) -> int:
+        return len(self.domains)
+
+    def blocked(self, host: str) -> Optional[str]:
+        """The listed domain that blocks host, or None"""
+        decision = self._decisions.get(host)
+        if decision is None:
+            decision = ""
+            labels = host.split(".")
+            for i in range(len(labels) - 1):
+                candidate = ".".join(labels[i:])
+                if candidate in self.domains:
+                    decision = candidate
+                    break
+            self._decisions.set(host, decision)
+        return decision or None
+
+    async def add(self, domains: Iterable[str]) -> int:
+        """Block domains and their subdomains; returns how many were new"""
+        new = {normalize_domain(d) for d in domains if d.strip()} - self.domains
+        if new:
+            self.domains |= new
+            self._decisions.clear()
+            if self.store is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self.store.add_domains, new)
+        return len(new)
+
+    async def remove(self, domains: Iterable[str]) -> int:
+        """Unblock domains; returns how many were listed"""
+        gone = {normalize_domain(d) for d in domains} & self.domains
+        if gone:
+            self.domains -= gone
+            self._decisions.clear()
+            if self.store is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self.store.remove_domains, gone)
+        return len(gone)
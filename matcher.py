@@ -0,0 +1,213 @@
+"""
+Multi-pattern matchers for the banned-words filter.
+
+Every backend implements the same contract: whole-word matches of any
+pattern, optionally followed by one of the common English suffixes in
+``SUFFIXES``, where "word" characters follow Python's ``\\w`` rules.
+Input text is expected to be lower-cased already; spans index into it.
+"""
+import hashlib
+import marshal
+import re
+import sys
+from collections import deque
+from typing import AbstractSet, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+SUFFIXES = ("s", "ing", "ed", "er")
+
+
+class Match(NamedTuple):
+    word: str      # matched text, including any suffix
+    start: int
+    end: int
+    pattern: str   # the banned entry that matched
+
+
+def _is_word_char(ch: str) -> bool:
+    """Same definition of a word character as ``re``'s ``\\w``"""
+    return ch.isalnum() or ch == "_"
+
+
+class Matcher:
+    """Base class for matcher backends"""
+    name = "base"
+
+    def __init__(self, words: Iterable[str]):
+        self.words = frozenset(w.lower() for w in words if w)
+
+    def dump(self) -> bytes:
+        """Serialize to a compact artifact that load() can restore"""
+        return marshal.dumps(tuple(sorted(self.words)))
+
+    @classmethod
+    def load(cls, blob: bytes) -> "Matcher":
+        return cls(marshal.loads(blob))
+
+    def candidates(self, text: str) -> Iterator[Match]:
+        """Yield every match the backend finds, in no particular order"""
+        raise NotImplementedError
+
+    def iter_matches(self, text: str, exclude: AbstractSet[str] = frozenset()) -> Iterator[Match]:
+        """Candidates whose pattern is not in exclude"""
+        if not exclude:
+            return self.candidates(text)
+        return (m for m in self.candidates(text) if m.pattern not in exclude)
+
+    def search(self, text: str, exclude: AbstractSet[str] = frozenset()) -> Optional[Match]:
+        """Return a match if text contains any word (cheapest hit found), or None"""
+        return next(self.iter_matches(text, exclude), None)
+
+    def find_all(self, text: str, exclude: AbstractSet[str] = frozenset()) -> List[Match]:
+        """Return all non-overlapping matches, leftmost-longest first"""
+        return select_longest(self.iter_matches(text, exclude))
+
+
+def select_longest(matches: Iterable[Match]) -> List[Match]:
+    """Reduce possibly overlapping matches to leftmost-longest, non-overlapping ones"""
+    result: List[Match] = []
+    last_end = -1
+    for m in sorted(matches, key=lambda m: (m.start, -m.end)):
+        if m.start >= last_end:
+            result.append(m)
+            last_end = m.end
+    return result
+
+
+class RegexMatcher(Matcher):
+    """The original single ``re`` alternation over every word"""
+    name = "regex"
+
+    def __init__(self, words: Iterable[str]):
+        super().__init__(words)
+        if not self.words:
+            self.pattern = re.compile(r"(?!)")
+            return
+        # Longest first so the alternation prefers the longest phrase
+        ordered = sorted(self.words, key=lambda w: (-len(w), w))
+        self.pattern = re.compile(
+            r'(?<!\w)((' + '|'.join(re.escape(word) for word in ordered) + r')'
+            r'(?:' + '|'.join(SUFFIXES) + r')?)(?!\w)',
+            re.IGNORECASE
+        )
+
+    def candidates(self, text: str) -> Iterator[Match]:
+        for m in self.pattern.finditer(text):
+            yield Match(m.group(1), m.start(1), m.end(1), m.group(2).lower())
+
+
+class AhoCorasickMatcher(Matcher):
+    """
+    Aho-Corasick automaton over all words. One linear pass over the text
+    finds every occurrence regardless of how many words are loaded; the
+    boundary and suffix rules are applied only at candidate hits.
+    """
+    name = "aho"
+
+    def __init__(self, words: Iterable[str]):
+        super().__init__(words)
+        goto: List[Dict[str, int]] = [{}]
+        terminal: List[Optional[str]] = [None]
+        for word in self.words:
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    terminal.append(None)
+                state = nxt
+            terminal[state] = word
+
+        fail = [0] * len(goto)
+        # Outputs per state, longest pattern first, including those
+        # reachable through the failure chain
+        out: List[Tuple[str, ...]] = [() for _ in goto]
+        queue = deque()
+        for child in goto[0].values():
+            out[child] = (terminal[child],) if terminal[child] else ()
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            for ch, child in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                own = (terminal[child],) if terminal[child] else ()
+                out[child] = own + out[fail[child]]
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def dump(self) -> bytes:
+        return marshal.dumps((tuple(self.words), self._goto, self._fail, self._out))
+
+    @classmethod
+    def load(cls, blob: bytes) -> "AhoCorasickMatcher":
+        # Restores the automaton tables directly, skipping construction
+        words, goto, fail, out = marshal.loads(blob)
+        self = cls.__new__(cls)
+        self.words = frozenset(words)
+        self._goto, self._fail, self._out = goto, fail, out
+        return self
+
+    @staticmethod
+    def _suffix_end(text: str, end: int) -> Optional[int]:
+        """End of the match after an optional suffix, or None if the word continues"""
+        size = len(text)
+        for suffix in SUFFIXES:
+            if text.startswith(suffix, end):
+                stop = end + len(suffix)
+                if stop == size or not _is_word_char(text[stop]):
+                    return stop
+        if end == size or not _is_word_char(text[end]):
+            return end
+        return None
+
+    def candidates(self, text: str) -> Iterator[Match]:
+        goto, fail, out = self._goto, self._fail, self._out
+        suffix_end = self._suffix_end
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            for word in out[state]:
+                start = i + 1 - len(word)
+                if start and _is_word_char(text[start - 1]):
+                    continue
+                end = suffix_end(text, i + 1)
+                if end is not None:
+                    yield Match(text[start:end], start, end, word)
+
+
+MATCHER_BACKENDS: Dict[str, Type[Matcher]] = {
+    RegexMatcher.name: RegexMatcher,
+    AhoCorasickMatcher.name: AhoCorasickMatcher,
+}
+DEFAULT_BACKEND = AhoCorasickMatcher.name
+# Bump when a backend's dump() layout changes so stale artifacts are ignored
+ARTIFACT_VERSION = 1
+
+
+def build_matcher(words: Iterable[str], backend: str = DEFAULT_BACKEND) -> Matcher:
+    """Compile words with the named backend"""
+    try:
+        cls = MATCHER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown matcher backend {backend!r}; choose from {sorted(MATCHER_BACKENDS)}")
+    return cls(words)
+
+
+def words_digest(words: Iterable[str], backend: str) -> str:
+    """Content hash identifying the compiled artifact for a word set"""
+    # marshal's format may change between Python versions, so they get separate artifacts
+    h = hashlib.sha256(f"{backend}:{ARTIFACT_VERSION}:{marshal.version}:{sys.version_info[:2]}".encode())
+    for word in sorted({w.lower() for w in words if w}):
+        h.update(b"\0" + word.encode("utf-8"))
+    return h.hexdigest()
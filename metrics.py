@@ -0,0 +1,190 @@
+"""
+In-process metrics rendered in the Prometheus text format.
+
+Histograms keep fixed buckets and are updated in place, so recording a
+sample is a bisect and two additions. Gauges and counters owned by other
+components (queue depths, cache hits) are read through callbacks only
+when /metrics is scraped. With METRICS=0 the timers handed out are
+no-ops and nothing is recorded.
+"""
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+METRICS_ENABLED = os.getenv("METRICS", "1") != "0"
+# Seconds; on_message stages are mostly sub-millisecond, lookups take up to seconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOP_LAG_INTERVAL = 0.5  # seconds between event-loop lag probes
+
+Sample = Union[float, Dict[str, float]]
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class HistogramFamily:
+    """Histograms sharing a name, one per value of a single label"""
+
+    def __init__(self, name: str, help: str, label: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        self.children: Dict[str, Histogram] = {}
+
+    def labels(self, value: str) -> Histogram:
+        child = self.children.get(value)
+        if child is None:
+            child = self.children[value] = Histogram(self.buckets)
+        return child
+
+    def observe(self, value: str, seconds: float):
+        self.labels(value).observe(seconds)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for value, child in sorted(self.children.items()):
+            counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{self.label}="{value}"}} {total}')
+            lines.append(f'{self.name}_count{{{self.label}="{value}"}} {count}')
+        return lines
+
+
+class _Callback:
+    def __init__(self, name: str, help: str, kind: str, fn: Callable[[], Sample], label: Optional[str]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+        self.label = label
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        sample = self.fn()
+        if isinstance(sample, dict):
+            lines += [f'{self.name}{{{self.label}="{k}"}} {v}' for k, v in sorted(sample.items())]
+        else:
+            lines.append(f"{self.name} {sample}")
+        return lines
+
+
+class Registry:
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        # By name; registering a name again replaces it, so a reloaded extension re-registers cleanly
+        self._metrics: Dict[str, Union[HistogramFamily, _Callback]] = {}
+        self._caches: Dict[str, object] = {}
+
+    def histogram(self, name: str, help: str, label: str,
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> HistogramFamily:
+        family = self._metrics[name] = HistogramFamily(name, help, label, buckets)
+        return family
+
+    def gauge(self, name: str, help: str, fn: Callable[[], Sample], label: Optional[str] = None):
+        self._metrics[name] = _Callback(name, help, "gauge", fn, label)
+
+    def counter(self, name: str, help: str, fn: Callable[[], Sample], label: Optional[str] = None):
+        self._metrics[name] = _Callback(name, help, "counter", fn, label)
+
+    def register_caches(self, caches: Dict[str, object]):
+        """Expose hit/miss counters of TTLCache-like objects by name; later calls add to or replace earlier ones"""
+        if not self._caches:
+            self.counter("bot_cache_hits_total", "Cache lookups served from cache.",
+                         lambda: {name: c.hits for name, c in self._caches.items()}, "cache")
+            self.counter("bot_cache_misses_total", "Cache lookups that missed.",
+                         lambda: {name: c.misses for name, c in self._caches.items()}, "cache")
+        self._caches.update(caches)
+
+    def render(self) -> str:
+        if not self.enabled:
+            return ""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+stage_seconds = registry.histogram(
+    "bot_message_stage_seconds", "Time spent in each on_message stage.", "stage")
+command_seconds = registry.histogram(
+    "bot_command_seconds", "Time spent running each command.", "command")
+loop_lag_seconds = registry.histogram(
+    "bot_event_loop_lag_seconds", "How late the event loop woke a sleeping probe.", "loop",
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+
+
+class MessageTimer:
+    """Attributes time to on_message stages: each stage() call closes the previous one"""
+    __slots__ = ("started", "last", "current")
+
+    def __init__(self):
+        self.started = self.last = time.perf_counter()
+        self.current: Optional[str] = None
+
+    def stage(self, name: str):
+        now = time.perf_counter()
+        if self.current is not None:
+            stage_seconds.labels(self.current).observe(now - self.last)
+        self.current = name
+        self.last = now
+
+    def stop(self):
+        now = time.perf_counter()
+        if self.current is not None:
+            stage_seconds.labels(self.current).observe(now - self.last)
+        stage_seconds.labels("total").observe(now - self.started)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def stage(self, name: str):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def message_timer() -> Union[MessageTimer, _NullTimer]:
+    return MessageTimer() if registry.enabled else NULL_TIMER
+
+
+async def monitor_loop_lag(interval: float = LOOP_LAG_INTERVAL):
+    """Sleep in a loop and record how much later than asked each wake-up came"""
+    loop = asyncio.get_running_loop()
+    lag = loop_lag_seconds.labels("main")
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag.observe(max(0.0, loop.time() - start - interval))
+
+
+def executor_queue_depth(executor) -> int:
+    """Work items waiting for a thread in a ThreadPoolExecutor (0 if it has none yet)"""
+    queue = getattr(executor, "_work_queue", None)
+    return queue.qsize() if queue is not None else 0
+
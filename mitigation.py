@@ -0,0 +1,146 @@
+"""
+Spam mitigation: the offending messages are grouped by channel and
+removed with bulk deletes, while the timeout and the notice go out
+alongside them instead of waiting behind one delete call per message.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+
+import discord
+
+from outbound import MODERATION, outbox
+from raid import RaidHit
+
+log = logging.getLogger("bot")
+
+BULK_DELETE_LIMIT = 100      # Discord accepts at most 100 IDs per bulk delete
+MITIGATION_CONCURRENCY = 4   # REST calls in flight per mitigation
+
+
+def group_by_channel(refs: Iterable[Tuple[int, int]]) -> Dict[int, List[int]]:
+    """(channel_id, message_id) pairs to message IDs per channel"""
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for channel_id, message_id in refs:
+        groups[channel_id].append(message_id)
+    return groups
+
+
+async def delete_in_channel(channel, message_ids: List[int]):
+    """Bulk delete where the channel supports it, single deletes otherwise"""
+    if len(message_ids) > 1 and hasattr(channel, "delete_messages"):
+        for i in range(0, len(message_ids), BULK_DELETE_LIMIT):
+            chunk = message_ids[i:i + BULK_DELETE_LIMIT]
+            await channel.delete_messages([discord.Object(id=mid) for mid in chunk])
+    else:
+        for mid in message_ids:
+            await channel.get_partial_message(mid).delete()
+
+
+class BulkDeleter:
+    """
+    Coalesces deletes per channel across concurrent mitigations. While one
+    bulk request for a channel is in flight, IDs from other spammers queue
+    up and go out together in the next one, so a raid costs a handful of
+    bulk calls per channel rather than one per spammer. A message can be
+    reported by both the raid and the spam path; its ID is sent once and
+    every caller waiting on it shares that request's result, since Discord
+    rejects a bulk delete that repeats an ID.
+    """
+
+    def __init__(self):
+        # channel id -> message id -> futures waiting on that message
+        self._pending: Dict[int, Dict[int, List[asyncio.Future]]] = {}
+        self._in_flight: Dict[int, Dict[int, List[asyncio.Future]]] = {}
+
+    async def delete(self, channel, message_ids: List[int]):
+        loop = asyncio.get_running_loop()
+        queue = self._pending.get(channel.id)
+        if queue is None:
+            queue = self._pending[channel.id] = {}
+            loop.create_task(self._drain(channel, queue))
+        in_flight = self._in_flight.get(channel.id, {})
+        futures = []
+        for mid in message_ids:
+            future = loop.create_future()
+            futures.append(future)
+            (in_flight if mid in in_flight else queue).setdefault(mid, []).append(future)
+        await asyncio.gather(*futures)
+
+    async def _drain(self, channel, queue: Dict[int, List[asyncio.Future]]):
+        try:
+            while queue:
+                batch = {mid: queue.pop(mid) for mid in list(islice(queue, BULK_DELETE_LIMIT))}
+                self._in_flight[channel.id] = batch
+                try:
+                    await delete_in_channel(channel, list(batch))
+                except Exception as e:
+                    for futures in batch.values():
+                        for future in futures:
+                            future.set_exception(e)
+                else:
+                    for futures in batch.values():
+                        for future in futures:
+                            future.set_result(None)
+        finally:
+            self._in_flight.pop(channel.id, None)
+            del self._pending[channel.id]
+
+
+bulk_deleter = BulkDeleter()
+
+
+async def mitigate_spam(message: discord.Message, refs: Iterable[Tuple[int, int]], timeout_seconds: int,
+                        resolve_channel: Callable[[int], discord.abc.Messageable],
+                        concurrency: int = MITIGATION_CONCURRENCY):
+    """Time out the author, post the notice and purge their recent messages concurrently"""
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(action: Awaitable):
+        async with semaphore:
+            return await action
+
+    until = discord.utils.utcnow() + timedelta(seconds=timeout_seconds)
+    groups = group_by_channel(refs)
+    # The timeout goes first so the author is muted before anything else lands
+    actions = [
+        message.author.timeout(until, reason="Spam"),
+        outbox.send(message.channel, f"{message.author.mention} stop spamming! Timed-out for {timeout_seconds}s.",
+                    priority=MODERATION, batch="spam"),
+    ]
+    actions += [bulk_deleter.delete(resolve_channel(cid), ids) for cid, ids in groups.items()]
+    timeout_result, notice_result, *delete_results = await asyncio.gather(
+        *(bounded(a) for a in actions), return_exceptions=True
+    )
+
+    if isinstance(timeout_result, discord.Forbidden):
+        await outbox.send(message.channel, "⚠️ I lack permission to timeout users.", priority=MODERATION,
+                          batch="permissions")
+    elif isinstance(timeout_result, Exception):
+        log.error(f"Spam timeout failed for {message.author}: {timeout_result}")
+    if isinstance(notice_result, Exception):
+        log.error(f"Spam notice failed in {message.channel}: {notice_result}")
+    for result in delete_results:
+        if isinstance(result, Exception):
+            log.warning(f"Spam cleanup delete failed: {result}")
+    log.info("Mitigated spam from %s: %d messages in %d channels in %.0f ms",
+             message.author, sum(map(len, groups.values())), len(groups), (time.perf_counter() - start) * 1000)
+
+
+async def reject_raid_message(message: discord.Message, hit: RaidHit,
+                              resolve_channel: Callable[[int], discord.abc.Messageable]):
+    """Fast-reject path for a message matching an active raid; purges the earlier copies when the raid starts"""
+    deletes = [bulk_deleter.delete(message.channel, [message.id])]
+    if hit.started:
+        log.warning(f"Raid detected in {message.guild}: {hit.users} users posting copies of {message.content[:80]!r}")
+        deletes += [bulk_deleter.delete(resolve_channel(cid), ids) for cid, ids in group_by_channel(hit.earlier).items()]
+        deletes.append(outbox.send(message.channel, "🚨 Raid detected, matching messages are being removed.",
+                                   priority=MODERATION, batch="raid"))
+    for result in await asyncio.gather(*deletes, return_exceptions=True):
+        if isinstance(result, Exception):
+            log.warning(f"Raid cleanup failed: {result}")
@@ -0,0 +1,233 @@
+"""
+Mod-mail tickets backed by SQLite.
+
+Every user has at most one open ticket. Each ticket gets one post in the
+mod-mail channel, opening a thread for follow-up DMs. Every relayed
+message ID is indexed, so `!reply` works on any of them, including
+after a restart. Hot lookups are served from LRU caches, and the mod-mail
+channel is resolved once and remembered, so a flood of DMs costs neither
+channel scans nor database reads.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Dict, NamedTuple, Optional
+
+import discord
+
+from cache import TTLCache
+from outbound import MODMAIL, outbox
+from sqlitedb import open_db, write
+
+log = logging.getLogger("bot")
+
+MODMAIL_CHANNEL = "mod-mail"
+MODMAIL_CACHE_SIZE = 2048
+MODMAIL_CACHE_TTL = 3600  # seconds; entries are kept in sync on writes, this only bounds staleness
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    id        INTEGER PRIMARY KEY,
+    user_id   INTEGER NOT NULL,
+    status    TEXT NOT NULL DEFAULT 'open',
+    thread_id INTEGER,
+    opened_at REAL NOT NULL,
+    closed_at REAL
+);
+CREATE INDEX IF NOT EXISTS tickets_by_user ON tickets (user_id, status);
+CREATE INDEX IF NOT EXISTS tickets_by_thread ON tickets (thread_id);
+CREATE TABLE IF NOT EXISTS messages (
+    message_id INTEGER PRIMARY KEY,
+    ticket_id  INTEGER NOT NULL REFERENCES tickets (id),
+    direction  TEXT NOT NULL,
+    author_id  INTEGER NOT NULL,
+    content    TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_by_ticket ON messages (ticket_id);
+"""
+
+
+class Ticket(NamedTuple):
+    id: int
+    user_id: int
+    status: str                 # "open" or "closed"
+    thread_id: Optional[int]
+    opened_at: float
+
+
+class ModmailStore:
+    def __init__(self, path: str, cache_size: int = MODMAIL_CACHE_SIZE, ttl: float = MODMAIL_CACHE_TTL):
+        self.path = path
+        self._conn, self._lock = open_db(path, SCHEMA)
+        self._tickets = TTLCache(cache_size, ttl)      # ticket id -> Ticket
+        self._by_message = TTLCache(cache_size, ttl)   # message or thread id -> ticket id
+        self._open_by_user = TTLCache(cache_size, ttl)  # user id -> open ticket id, 0 for none
+
+    def ticket(self, ticket_id: int) -> Optional[Ticket]:
+        cached = self._tickets.get(ticket_id)
+        if cached is not None:
+            return cached
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, user_id, status, thread_id, opened_at FROM tickets WHERE id = ?", (ticket_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        ticket = Ticket(*row)
+        self._tickets.set(ticket_id, ticket)
+        return ticket
+
+    def open_ticket_for(self, user_id: int) -> Optional[Ticket]:
+        ticket_id = self._open_by_user.get(user_id)
+        if ticket_id is None:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT id FROM tickets WHERE user_id = ? AND status = 'open' ORDER BY id DESC LIMIT 1",
+                    (user_id,)
+                ).fetchone()
+            ticket_id = row[0] if row else 0
+            self._open_by_user.set(user_id, ticket_id)
+        return self.ticket(ticket_id) if ticket_id else None
+
+    def ticket_for_message(self, message_id: int) -> Optional[Ticket]:
+        """Ticket owning a relayed message, a moderator reply or a ticket thread"""
+        ticket_id = self._by_message.get(message_id)
+        if ticket_id is None:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT ticket_id FROM messages WHERE message_id = ? "
+                    "UNION ALL SELECT id FROM tickets WHERE thread_id = ? LIMIT 1",
+                    (message_id, message_id)
+                ).fetchone()
+            if row is None:
+                return None
+            ticket_id = row[0]
+            self._by_message.set(message_id, ticket_id)
+        return self.ticket(ticket_id)
+
+    # Writers are coroutines: the commit runs off the loop, then the caches are updated
+
+    async def open(self, user_id: int) -> Ticket:
+        now = time.time()
+        cursor = await write(self._conn, self._lock, lambda conn: conn.execute(
+            "INSERT INTO tickets (user_id, opened_at) VALUES (?, ?)", (user_id, now)
+        ))
+        ticket = Ticket(cursor.lastrowid, user_id, "open", None, now)
+        self._tickets.set(ticket.id, ticket)
+        self._open_by_user.set(user_id, ticket.id)
+        return ticket
+
+    async def set_thread(self, ticket: Ticket, thread_id: Optional[int]) -> Ticket:
+        await write(self._conn, self._lock, lambda conn: conn.execute(
+            "UPDATE tickets SET thread_id = ? WHERE id = ?", (thread_id, ticket.id)
+        ))
+        ticket = ticket._replace(thread_id=thread_id)
+        self._tickets.set(ticket.id, ticket)
+        if thread_id is not None:
+            self._by_message.set(thread_id, ticket.id)
+        return ticket
+
+    async def close(self, ticket: Ticket) -> Ticket:
+        await write(self._conn, self._lock, lambda conn: conn.execute(
+            "UPDATE tickets SET status = 'closed', closed_at = ? WHERE id = ?", (time.time(), ticket.id)
+        ))
+        ticket = ticket._replace(status="closed")
+        self._tickets.set(ticket.id, ticket)
+        if self._open_by_user.get(ticket.user_id, count=False) == ticket.id:
+            self._open_by_user.set(ticket.user_id, 0)
+        return ticket
+
+    async def record(self, message_id: int, ticket: Ticket, direction: str, author_id: int, content: str):
+        """Index a message relayed in ("in") or a moderator reply sent out ("out")"""
+        await write(self._conn, self._lock, lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO messages (message_id, ticket_id, direction, author_id, content, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (message_id, ticket.id, direction, author_id, content, time.time())
+        ))
+        self._by_message.set(message_id, ticket.id)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM tickets GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close_db(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ModMail:
+    """Relays DMs into per-ticket threads of the guild's mod-mail channel"""
+
+    def __init__(self, store: ModmailStore, guild_id: int, channel_name: str = MODMAIL_CHANNEL):
+        self.store = store
+        self.guild_id = guild_id
+        self.channel_name = channel_name
+        self._channel_id: Optional[int] = None
+        self._user_locks: Dict[int, asyncio.Lock] = {}
+        self._user_waiting: Counter = Counter()
+
+    def channel(self, bot: discord.Client) -> Optional[discord.TextChannel]:
+        """The mod-mail channel, looked up by name only until it has been found"""
+        if self._channel_id is not None:
+            channel = bot.get_channel(self._channel_id)
+            if channel is not None:
+                return channel
+            self._channel_id = None
+        guild = bot.get_guild(self.guild_id)
+        channel = discord.utils.get(guild.text_channels, name=self.channel_name) if guild else None
+        if channel is not None:
+            self._channel_id = channel.id
+        return channel
+
+    def invalidate_channel(self, channel: Optional[discord.abc.GuildChannel] = None):
+        """Forget the cached channel; called when guild channels are deleted or renamed"""
+        if channel is None or channel.id == self._channel_id or channel.name == self.channel_name:
+            self._channel_id = None
+
+    async def relay(self, bot: discord.Client, message: discord.Message) -> Optional[Ticket]:
+        """Post a DM to its ticket, opening one if needed; None if there is no mod-mail channel"""
+        channel = self.channel(bot)
+        if channel is None:
+            return None
+        author = message.author
+        # One user's burst of DMs must not open several tickets at once
+        lock = self._user_locks.get(author.id)
+        if lock is None:
+            lock = self._user_locks[author.id] = asyncio.Lock()
+        self._user_waiting[author.id] += 1
+        try:
+            async with lock:
+                return await self._relay(bot, channel, message)
+        finally:
+            self._user_waiting[author.id] -= 1
+            if not self._user_waiting[author.id]:
+                del self._user_waiting[author.id]
+                del self._user_locks[author.id]
+
+    async def _relay(self, bot: discord.Client, channel: discord.TextChannel, message: discord.Message) -> Ticket:
+        author = message.author
+        ticket = self.store.open_ticket_for(author.id) or await self.store.open(author.id)
+        embed = discord.Embed(title=f"📬 Mod-mail #{ticket.id}", description=message.content, color=discord.Color.blue())
+        embed.set_author(name=f"{author} ({author.id})", icon_url=author.display_avatar.url)
+
+        if ticket.thread_id is not None:
+            thread = channel.guild.get_thread(ticket.thread_id) or bot.get_partial_messageable(ticket.thread_id)
+            try:
+                sent = await outbox.send(thread, embed=embed, priority=MODMAIL)
+                await self.store.record(sent.id, ticket, "in", author.id, message.content)
+                return ticket
+            except discord.HTTPException as e:
+                log.warning(f"Mod-mail thread for ticket #{ticket.id} unusable ({e}); opening a new one")
+
+        sent = await outbox.send(channel, embed=embed, priority=MODMAIL)
+        await self.store.record(sent.id, ticket, "in", author.id, message.content)
+        try:
+            thread = await sent.create_thread(name=f"Ticket #{ticket.id} – {author.name}"[:100])
+            ticket = await self.store.set_thread(ticket, thread.id)
+        except discord.HTTPException as e:
+            log.warning(f"Could not open a thread for mod-mail ticket #{ticket.id}: {e}")
+            ticket = await self.store.set_thread(ticket, None)
+        return ticket
@@ -0,0 +1,110 @@
+"""
+Optional process pool for banned-word scans of long messages.
+
+Short messages are scanned inline, where a scan costs less than shipping
+the text to another process. Long pastes go to worker processes that
+hold a preloaded copy of the matcher, so matching them neither blocks
+the event loop nor contends for its GIL. The workers load a snapshot of
+the index. When the word lists change, the pool is replaced by one
+built from a fresh snapshot, and scans already in flight finish on the
+old pool.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional
+
+from matcher import Match
+from wordfilter import BannedWords, IndexSnapshot
+
+log = logging.getLogger("bot")
+
+MODERATION_WORKERS = int(os.getenv("MODERATION_WORKERS", "0"))   # 0 keeps every scan inline
+POOL_MIN_LENGTH = int(os.getenv("MODERATION_POOL_MIN_LENGTH", "1500"))  # characters
+
+_scan: Optional[Callable[[str], List[Match]]] = None
+
+
+def _init_worker(snapshot: IndexSnapshot):
+    global _scan
+    _scan = snapshot.scanner()
+
+
+def _scan_in_worker(text: str) -> List[Match]:
+    return _scan(text)
+
+
+class ModerationPool:
+    def __init__(self, banned: BannedWords, workers: int = MODERATION_WORKERS,
+                 min_length: int = POOL_MIN_LENGTH):
+        self.banned = banned
+        self.workers = workers
+        self.min_length = min_length
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._version = -1
+        # Metrics
+        self.inline = 0
+        self.pooled = 0
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None or self._version != self.banned.version:
+            old = self._executor
+            snapshot = self.banned.snapshot()
+            # fork, because spawn and forkserver re-run main.py in every worker.
+            # Workers only ever touch the matcher, so the logging and SQLite
+            # threads the bot process runs are never entered from a child.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker, initargs=(snapshot,)
+            )
+            self._version = snapshot.version
+            if old is not None:
+                old.shutdown(wait=False)
+        return self._executor
+
+    def pooled_for(self, text: str) -> bool:
+        """Whether scan() would send text to a worker"""
+        return self.enabled and len(text) >= self.min_length
+
+    async def scan(self, text: str) -> List[Match]:
+        """Same result as BannedWords.scan, computed in a worker for long text"""
+        if not self.pooled_for(text):
+            self.inline += 1
+            return self.banned.scan(text)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._pool(), _scan_in_worker, text)
+        except BrokenProcessPool as e:
+            self.failures += 1
+            log.error(f"Moderation worker pool broke ({e}); scanning inline and restarting it")
+            self._executor = None
+            self.inline += 1
+            return self.banned.scan(text)
+        self.pooled += 1
+        # Workers report normalized patterns; the listed words live here
+        return self.banned.listed(result)
+
+    def scan_normalized(self, normalized: str) -> List[Match]:
+        """Inline scan of text the caller has already normalized, counted with the other inline scans"""
+        self.inline += 1
+        return self.banned.scan_normalized(normalized)
+
+    def warm_up(self):
+        """Start the workers now rather than on the first long message"""
+        if self.enabled:
+            pool = self._pool()
+            for _ in range(self.workers):
+                pool.submit(_scan_in_worker, "")
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
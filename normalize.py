@@ -0,0 +1,80 @@
+"""
+Text normalization applied to messages (and to the banned words
+themselves) before matching, so common obfuscations collapse onto the
+listed spelling: compatibility forms, accents, zero-width characters,
+homoglyphs, leetspeak, stretched letters and spaced-out words.
+
+Each stage is one C-level pass: ``unicodedata.normalize``, a precomputed
+``str.translate`` table and compiled ``re.sub`` calls. Stretched letters
+are only handled in the rare messages that have a run of three.
+"""
+import re
+import unicodedata
+
+# Characters removed outright: zero-width/invisible joiners, soft hyphen,
+# Latin combining accents (exposed by NFKD) and the Devanagari nukta, so
+# nukta letters fold onto their plain forms.
+_DELETE = (
+    "\u00ad\u180e\u200b\u200c\u200d\u200e\u200f\u2060\u2061\u2062\u2063\u2064\ufeff"
+    + "".join(chr(c) for c in range(0x0300, 0x0370))
+    + "\u093c"
+)
+
+# Lookalikes from other scripts and leetspeak, folded onto Latin letters.
+# Sentence punctuation ("!", "|") is left alone so trailing "!" does not
+# glue itself to the previous word.
+_CONFUSABLES = {
+    # Cyrillic
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o",
+    "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ї": "i", "ј": "j",
+    "ѕ": "s", "ԁ": "d", "ɡ": "g", "ԛ": "q", "ԝ": "w", "ӏ": "l",
+    # Greek
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v", "ο": "o",
+    "ρ": "p", "τ": "t", "υ": "u", "χ": "x", "ς": "s",
+    # Devanagari digits that pass for Latin letters
+    "०": "o",
+    # Leetspeak
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b",
+    "@": "a", "$": "s",
+}
+
+TRANSLATION_TABLE = str.maketrans({**{ch: None for ch in _DELETE}, **_CONFUSABLES})
+
+# Doubled letters are ordinary spelling ("looser", "bcc", "salla"), so only
+# runs of three or more count as stretching
+_STRETCHED = re.compile(r"(\w)\1{2,}")
+_DOUBLED = re.compile(r"(\w)\1+")
+_WORD = re.compile(r"\w+")
+# Three or more single characters split by separators: "f u c k", "f.u.c.k"
+_SEPARATORS = r"[\s.\-_*~·•,/\\]+"
+_SPACED_OUT = re.compile(r"(?<!\w)\w(?:" + _SEPARATORS + r"\w(?!\w)){2,}")
+_SEPARATOR_RUN = re.compile(_SEPARATORS)
+
+
+def _join_spaced(m: "re.Match") -> str:
+    joined = _SEPARATOR_RUN.sub("", m.group())
+    if len(joined) < 4:
+        return joined
+    # A real one-letter word next to the run ("a f u c k", "f u c k u") is
+    # swallowed by it, so also offer the run without its first or last letter
+    return f"{joined} {joined[1:]} {joined[:-1]}"
+
+
+def _unstretch(m: "re.Match") -> str:
+    word = m.group()
+    if not _STRETCHED.search(word):
+        return word
+    # "fuuuuck" and "asssshole" are the listed word with its runs cut to one
+    # or two letters, so offer both
+    return _STRETCHED.sub(r"\1\1", word) + " " + _DOUBLED.sub(r"\1", word)
+
+
+def normalize_text(text: str) -> str:
+    """Fold text to the canonical form the banned-word matcher sees"""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+    text = text.lower().translate(TRANSLATION_TABLE)
+    text = _SPACED_OUT.sub(_join_spaced, text)
+    if _STRETCHED.search(text):
+        text = _WORD.sub(_unstretch, text)
+    return text
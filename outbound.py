@@ -0,0 +1,209 @@
+"""
+Outbound message scheduler.
+
+Discord rate-limits message creation per channel, so during a flood the
+sends for a busy channel pile up, and discord.py serves them first come,
+first served. Here every channel gets its own queue, ordered by priority
+and drained one send at a time, so a moderation notice overtakes the
+chatter queued ahead of it instead of waiting out the bucket behind it.
+A priority-ordered gate also caps how many sends are in flight across
+all channels.
+
+When a channel's queue backs up, new chatter is turned away and queued
+chatter that has gone stale is dropped. Queued messages that share a
+batch key, such as banned-word warnings, go out as one combined message.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import Counter
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import discord
+
+from responses import MESSAGE_LIMIT
+
+log = logging.getLogger("bot")
+
+# Priorities, most urgent first
+MODERATION = 0
+MODMAIL = 1
+REPLY = 2
+CHATTER = 3
+PRIORITY_NAMES = {MODERATION: "moderation", MODMAIL: "modmail", REPLY: "reply", CHATTER: "chatter"}
+
+OUTBOUND_CONCURRENCY = 10   # sends in flight across all channels
+PRESSURE_DEPTH = 3          # queued sends in a channel before chatter is turned away
+CHATTER_MAX_AGE = 5.0       # seconds queued chatter stays worth sending
+
+
+class _Send:
+    __slots__ = ("priority", "seq", "lines", "footer", "batch", "kwargs", "queued", "futures")
+
+    def __init__(self, priority: int, seq: int, content: Optional[str], footer: str,
+                 batch: Optional[Hashable], kwargs: dict, queued: float, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.lines = [content] if content else []
+        self.footer = footer
+        self.batch = batch
+        self.kwargs = kwargs
+        self.queued = queued
+        self.futures = [future]
+
+    def __lt__(self, other: "_Send") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def text(self) -> Optional[str]:
+        text = "\n".join(self.lines + [self.footer] if self.footer else self.lines)
+        return text or None
+
+    def size(self) -> int:
+        return len(self.text() or "")
+
+
+def _resolve(futures: List[asyncio.Future], result=None, error: Optional[BaseException] = None):
+    for future in futures:
+        if future.done():  # the caller gave up waiting
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+class _PriorityGate:
+    """Semaphore that lets the most urgent waiter through first"""
+
+    def __init__(self, slots: int):
+        self._free = slots
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+
+    async def acquire(self, priority: int, seq: int):
+        if self._free and not self._waiters:
+            self._free -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, seq, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Woken and cancelled in the same step: pass the slot on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._free += 1
+
+
+class OutboundScheduler:
+    def __init__(self, concurrency: int = OUTBOUND_CONCURRENCY, pressure_depth: int = PRESSURE_DEPTH,
+                 chatter_max_age: float = CHATTER_MAX_AGE, clock: Callable[[], float] = time.monotonic):
+        self.pressure_depth = pressure_depth
+        self.chatter_max_age = chatter_max_age
+        self.clock = clock
+        self._gate = _PriorityGate(concurrency)
+        self._queues: Dict[int, List[_Send]] = {}
+        self._seq = itertools.count()
+        # Metrics, by priority
+        self.sent: Counter = Counter()
+        self.dropped: Counter = Counter()
+        self.merged: Counter = Counter()
+
+    def depth(self) -> int:
+        """Sends queued across all channels, not counting those in flight"""
+        return sum(map(len, self._queues.values()))
+
+    def submit(self, channel: discord.abc.Messageable, content: Optional[str] = None, *,
+               priority: int = REPLY, batch: Optional[Hashable] = None, footer: str = "",
+               **kwargs) -> asyncio.Future:
+        """
+        Queue a send; the future resolves to the sent message, or None if
+        it was dropped. Queued sends with the same batch key and send
+        arguments are combined into one message, with footer written once.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._queues.get(channel.id)
+        if priority >= CHATTER and queue is not None and len(queue) >= self.pressure_depth:
+            self.dropped[priority] += 1
+            future.set_result(None)
+            return future
+        item = _Send(priority, next(self._seq), content, footer, batch, kwargs, self.clock(), future)
+        if queue is None:
+            queue = self._queues[channel.id] = []
+            loop.create_task(self._drain(channel, queue))
+        heapq.heappush(queue, item)
+        return future
+
+    async def send(self, channel: discord.abc.Messageable, content: Optional[str] = None,
+                   **kwargs) -> Optional[discord.Message]:
+        return await self.submit(channel, content, **kwargs)
+
+    async def reply(self, message: discord.Message, content: Optional[str] = None,
+                    **kwargs) -> Optional[discord.Message]:
+        return await self.submit(message.channel, content, reference=message, **kwargs)
+
+    def post(self, channel: discord.abc.Messageable, content: Optional[str] = None, **kwargs):
+        """Fire-and-forget send; failures are logged"""
+        self.submit(channel, content, **kwargs).add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            log.warning(f"Outbound message failed: {future.exception()}")
+
+    def _merge(self, head: _Send, queue: List[_Send]):
+        """Fold queued sends with the head's batch key into the head, as far as the message limit allows"""
+        size = head.size()
+        rest = []
+        for item in sorted(queue):
+            if item.batch != head.batch or item.kwargs != head.kwargs:
+                rest.append(item)
+                continue
+            new_lines = [line for line in item.lines if line not in head.lines]
+            added = sum(len(line) + 1 for line in new_lines)
+            if size + added > MESSAGE_LIMIT:
+                rest.append(item)
+                continue
+            head.lines += new_lines
+            head.futures += item.futures
+            size += added
+            self.merged[item.priority] += 1
+        if len(rest) < len(queue):
+            queue[:] = rest
+            heapq.heapify(queue)
+
+    async def _drain(self, channel: discord.abc.Messageable, queue: List[_Send]):
+        try:
+            while queue:
+                item = heapq.heappop(queue)
+                if item.priority >= CHATTER and self.clock() - item.queued > self.chatter_max_age:
+                    self.dropped[item.priority] += 1
+                    _resolve(item.futures, None)
+                    continue
+                if item.batch is not None:
+                    self._merge(item, queue)
+                await self._gate.acquire(item.priority, item.seq)
+                try:
+                    sent = await channel.send(item.text(), **item.kwargs)
+                except Exception as e:
+                    _resolve(item.futures, error=e)
+                else:
+                    self.sent[item.priority] += 1
+                    _resolve(item.futures, sent)
+                finally:
+                    self._gate.release()
+        finally:
+            del self._queues[channel.id]
+
+
+outbox = OutboundScheduler()
@@ -0,0 +1,136 @@
+"""
+Per-guild moderation profiles.
+
+A profile chooses which of the shared language lists a guild enforces,
+adds words that only apply in that guild, and sets the guild's spam
+thresholds. Guilds without a stored profile get the defaults. Profiles
+are read on every message, so they are served from an LRU in front of
+SQLite and refreshed by the setters, which are the only writers. The
+setters are coroutines that commit on the default executor, so an admin
+command never stalls message handling.
+"""
+from typing import FrozenSet, Iterable, NamedTuple, Optional
+
+from cache import TTLCache
+from sqlitedb import open_db, write
+
+SPAM_TIME_FRAME = 5  # seconds
+SPAM_MESSAGE_LIMIT = 5
+TIMEOUT_DURATION = 60  # seconds
+PROFILE_CACHE_SIZE = 4096
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_profiles (
+    guild_id           INTEGER PRIMARY KEY,
+    languages          TEXT,             -- comma separated; NULL enforces every list
+    spam_time_frame    REAL NOT NULL,
+    spam_message_limit INTEGER NOT NULL,
+    timeout_seconds    INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS guild_words (
+    guild_id INTEGER NOT NULL,
+    word     TEXT NOT NULL,
+    PRIMARY KEY (guild_id, word)
+) WITHOUT ROWID;
+"""
+
+
+class GuildProfile(NamedTuple):
+    languages: Optional[FrozenSet[str]] = None   # None enforces every list
+    words: FrozenSet[str] = frozenset()          # extra words for this guild only
+    spam_time_frame: float = SPAM_TIME_FRAME
+    spam_message_limit: int = SPAM_MESSAGE_LIMIT
+    timeout_seconds: int = TIMEOUT_DURATION
+
+    @property
+    def default_words(self) -> bool:
+        """True when the guild enforces exactly the shared lists"""
+        return self.languages is None and not self.words
+
+
+DEFAULT_PROFILE = GuildProfile()
+
+
+class ProfileStore:
+    def __init__(self, path: str, cache_size: int = PROFILE_CACHE_SIZE):
+        self.path = path
+        self._conn, self._lock = open_db(path, SCHEMA)
+        # Profiles only change through this store, so entries never go stale
+        self._profiles = TTLCache(cache_size, ttl=float("inf"))
+
+    def profile(self, guild_id: int) -> GuildProfile:
+        cached = self._profiles.get(guild_id)
+        if cached is not None:
+            return cached
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT languages, spam_time_frame, spam_message_limit, timeout_seconds "
+                "FROM guild_profiles WHERE guild_id = ?", (guild_id,)
+            ).fetchone()
+            words = frozenset(w for (w,) in self._conn.execute(
+                "SELECT word FROM guild_words WHERE guild_id = ?", (guild_id,)
+            ))
+        if row is None:
+            profile = DEFAULT_PROFILE._replace(words=words) if words else DEFAULT_PROFILE
+        else:
+            languages = frozenset(filter(None, row[0].split(","))) if row[0] is not None else None
+            profile = GuildProfile(languages, words, row[1], row[2], row[3])
+        self._profiles.set(guild_id, profile)
+        return profile
+
+    async def _save(self, guild_id: int, profile: GuildProfile) -> GuildProfile:
+        languages = ",".join(sorted(profile.languages)) if profile.languages is not None else None
+        await write(self._conn, self._lock, lambda conn: conn.execute(
+            "INSERT INTO guild_profiles (guild_id, languages, spam_time_frame, spam_message_limit, timeout_seconds) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (guild_id) DO UPDATE SET languages = excluded.languages, "
+            "spam_time_frame = excluded.spam_time_frame, spam_message_limit = excluded.spam_message_limit, "
+            "timeout_seconds = excluded.timeout_seconds",
+            (guild_id, languages, profile.spam_time_frame, profile.spam_message_limit, profile.timeout_seconds)
+        ))
+        self._profiles.set(guild_id, profile)
+        return profile
+
+    async def set_languages(self, guild_id: int, languages: Optional[Iterable[str]]) -> GuildProfile:
+        """Enforce only these shared lists, or every list when languages is None"""
+        languages = frozenset(languages) if languages is not None else None
+        return await self._save(guild_id, self.profile(guild_id)._replace(languages=languages))
+
+    async def set_spam_limits(self, guild_id: int, message_limit: int, time_frame: float,
+                              timeout_seconds: int) -> GuildProfile:
+        return await self._save(guild_id, self.profile(guild_id)._replace(
+            spam_message_limit=message_limit, spam_time_frame=time_frame, timeout_seconds=timeout_seconds
+        ))
+
+    async def add_words(self, guild_id: int, words: Iterable[str]) -> int:
+        """Add guild-only words; returns how many were new"""
+        profile = self.profile(guild_id)
+        new = set(words) - profile.words
+        if new:
+            await write(self._conn, self._lock, lambda conn: conn.executemany(
+                "INSERT OR IGNORE INTO guild_words (guild_id, word) VALUES (?, ?)", [(guild_id, w) for w in new]
+            ))
+            self._profiles.set(guild_id, profile._replace(words=profile.words | new))
+        return len(new)
+
+    async def remove_words(self, guild_id: int, words: Iterable[str]) -> int:
+        """Remove guild-only words; returns how many were there"""
+        profile = self.profile(guild_id)
+        gone = set(words) & profile.words
+        if gone:
+            await write(self._conn, self._lock, lambda conn: conn.executemany(
+                "DELETE FROM guild_words WHERE guild_id = ? AND word = ?", [(guild_id, w) for w in gone]
+            ))
+            self._profiles.set(guild_id, profile._replace(words=profile.words - gone))
+        return len(gone)
+
+    async def reset(self, guild_id: int):
+        """Back to the defaults, dropping the guild's own words"""
+        def delete(conn):
+            conn.execute("DELETE FROM guild_profiles WHERE guild_id = ?", (guild_id,))
+            conn.execute("DELETE FROM guild_words WHERE guild_id = ?", (guild_id,))
+        await write(self._conn, self._lock, delete)
+        self._profiles.set(guild_id, DEFAULT_PROFILE)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
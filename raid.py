@@ -0,0 +1,197 @@
+"""
+Guild-wide raid detection.
+
+Messages are folded (case, digits, punctuation, whitespace) and grouped
+into clusters of identical or near-identical text over a sliding window
+across all users. Near-duplicates are found with MinHash signatures over
+word shingles, indexed by LSH bands: similar messages very likely share
+a band, so candidate clusters come from eight dict lookups instead of a
+scan, and are confirmed by comparing signatures. Once enough distinct users post into one cluster it enters
+raid mode, and further matching messages are rejected straight away,
+usually on the exact-text lookup alone.
+
+Only new members count. Raids come from freshly created or freshly
+joined accounts, while established members routinely post the same
+greeting at once ("happy new year everyone!"). Messages from everyone
+else are never clustered, purged or rejected.
+"""
+import random
+import string
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+_FOLD = str.maketrans("", "", string.digits + string.punctuation)
+_MASK64 = (1 << 64) - 1
+_PERMUTATIONS = 16
+_ROWS = 2                # signature rows per LSH band
+_BANDS = _PERMUTATIONS // _ROWS
+_rng = random.Random(0x5EED)
+# XOR with a random mask permutes the hash space, which is all MinHash needs
+# and far cheaper in Python than arithmetic hash families
+_MASKS = [_rng.getrandbits(64) for _ in range(_PERMUTATIONS)]
+_BUCKET_PROBES = 16  # newest clusters compared per band bucket, bounding worst-case cost
+SIMILARITY = 0.6  # estimated Jaccard similarity for two messages to count as copies
+
+
+def fold(text: str) -> str:
+    """Drop the noise raiders vary between copies: case, digits, punctuation, spacing"""
+    return " ".join(text.lower().translate(_FOLD).split())
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    """MinHash signature over word unigrams and bigrams of folded text"""
+    words = text.split()
+    features = set(words)
+    features.update(a + " " + b for a, b in zip(words, words[1:]))
+    hashes = [hash(f) & _MASK64 for f in features] or [0]
+    return tuple(min(h ^ mask for h in hashes) for mask in _MASKS)
+
+
+def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+    return [signature[i:i + _ROWS] for i in range(0, _PERMUTATIONS, _ROWS)]
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / _PERMUTATIONS
+
+
+class RaidHit(NamedTuple):
+    users: int                           # distinct users in the cluster within the window
+    started: bool                        # this message switched the cluster into raid mode
+    earlier: List[Tuple[int, int]]       # (channel_id, message_id) already posted, when started
+
+
+class _Cluster:
+    __slots__ = ("signature", "keys", "users", "size", "refs", "raid_until", "dropped")
+
+    def __init__(self, signature: Tuple[int, ...]):
+        self.signature = signature
+        self.keys: List[str] = []
+        self.users: Counter = Counter()
+        self.size = 0
+        self.refs: deque = deque(maxlen=200)
+        self.raid_until = 0.0
+        self.dropped = False
+
+
+class _GuildState:
+    __slots__ = ("window", "exact", "bands", "raiding")
+
+    def __init__(self):
+        self.window: deque = deque()  # (timestamp, cluster, user_id)
+        self.raiding: List[_Cluster] = []
+        self.exact: Dict[str, _Cluster] = {}
+        self.bands: List[Dict[Tuple[int, ...], List[_Cluster]]] = [{} for _ in range(_BANDS)]
+
+
+class RaidDetector:
+    def __init__(self, window: float = 30.0, user_threshold: int = 5, duration: float = 120.0,
+                 min_length: int = 12, min_similarity: float = SIMILARITY,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.user_threshold = user_threshold
+        self.duration = duration
+        self.min_length = min_length
+        self.min_similarity = min_similarity
+        self.clock = clock
+        self._guilds: Dict[int, _GuildState] = {}
+
+    def observe(self, guild_id: int, user_id: int, text: str, channel_id: int, message_id: int,
+                new_member: bool, now: Optional[float] = None) -> Optional[RaidHit]:
+        """Record a message from a new member; returns a RaidHit if it belongs to a cluster in raid mode"""
+        if not new_member or len(text) < self.min_length:
+            return None
+        key = fold(text)
+        if len(key) < self.min_length:
+            return None
+        now = self.clock() if now is None else now
+        state = self._guilds.get(guild_id)
+        if state is None:
+            state = self._guilds[guild_id] = _GuildState()
+        self._expire(state, now)
+
+        cluster = state.exact.get(key)
+        if cluster is not None and cluster.raid_until > now:
+            # Fast reject: exact copy of an active raid message
+            cluster.raid_until = now + self.duration
+            return RaidHit(len(cluster.users), False, [])
+        if cluster is None:
+            cluster = self._near_cluster(state, key)
+
+        state.window.append((now, cluster, user_id))
+        cluster.users[user_id] += 1
+        cluster.size += 1
+        cluster.refs.append((channel_id, message_id))
+
+        if cluster.raid_until > now:
+            cluster.raid_until = now + self.duration
+            return RaidHit(len(cluster.users), False, [])
+        if len(cluster.users) >= self.user_threshold:
+            cluster.raid_until = now + self.duration
+            state.raiding.append(cluster)
+            earlier = list(cluster.refs)[:-1]
+            cluster.refs.clear()
+            return RaidHit(len(cluster.users), True, earlier)
+        return None
+
+    def active_raids(self, guild_id: int, now: Optional[float] = None) -> int:
+        now = self.clock() if now is None else now
+        state = self._guilds.get(guild_id)
+        if state is None:
+            return 0
+        return sum(1 for c in state.raiding if c.raid_until > now)
+
+    def _near_cluster(self, state: _GuildState, key: str) -> _Cluster:
+        signature = minhash(key)
+        bands = _bands(signature)
+        for band, table in zip(bands, state.bands):
+            for candidate in table.get(band, ())[-_BUCKET_PROBES:]:
+                if similarity(candidate.signature, signature) >= self.min_similarity:
+                    candidate.keys.append(key)
+                    state.exact[key] = candidate
+                    return candidate
+        cluster = _Cluster(signature)
+        cluster.keys.append(key)
+        state.exact[key] = cluster
+        for band, table in zip(bands, state.bands):
+            table.setdefault(band, []).append(cluster)
+        return cluster
+
+    def _expire(self, state: _GuildState, now: float):
+        cutoff = now - self.window
+        window = state.window
+        while window and window[0][0] < cutoff:
+            _, cluster, user_id = window.popleft()
+            cluster.size -= 1
+            cluster.users[user_id] -= 1
+            if not cluster.users[user_id]:
+                del cluster.users[user_id]
+            if not cluster.size and cluster.raid_until <= now:
+                self._drop(state, cluster)
+        if state.raiding:
+            # Raids end in any order, so rebuild from the clusters still raiding
+            still = []
+            for cluster in state.raiding:
+                if cluster.raid_until > now:
+                    still.append(cluster)
+                elif not cluster.size:
+                    self._drop(state, cluster)
+            state.raiding = still
+
+    @staticmethod
+    def _drop(state: _GuildState, cluster: _Cluster):
+        # A cluster can empty and leave raid mode in the same _expire call
+        if cluster.dropped:
+            return
+        cluster.dropped = True
+        for key in cluster.keys:
+            if state.exact.get(key) is cluster:
+                del state.exact[key]
+        for band, table in zip(_bands(cluster.signature), state.bands):
+            members = table.get(band)
+            if members is not None:
+                members.remove(cluster)
+                if not members:
+                    del table[band]
@@ -0,0 +1,91 @@
+"""
+Sliding-window spam tracker.
+
+Each user gets a small deque of (timestamp, channel_id, message_id)
+entries; old entries fall off the left as new ones arrive, so a check is
+O(1) amortized and only IDs are kept, never whole Message objects. Idle
+users are evicted lazily from the front of an activity-ordered dict on
+later calls instead of by a periodic sweep over everyone.
+
+Guilds with the same thresholds share one tracker, with windows keyed by
+(guild_id, user_id), so the number of trackers grows with the number of
+distinct settings rather than with the number of guilds.
+"""
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class _Window:
+    __slots__ = ("entries", "last_seen")
+
+    def __init__(self, maxlen: int):
+        self.entries: deque = deque(maxlen=maxlen)
+        self.last_seen = 0.0
+
+
+class SpamTracker:
+    def __init__(self, time_frame: float, message_limit: int,
+                 clock: Callable[[], float] = time.monotonic):
+        self.time_frame = time_frame
+        self.message_limit = message_limit
+        self.clock = clock
+        self._users: "OrderedDict[int, _Window]" = OrderedDict()
+        # Exempt users (admins) keep posting without tripping; cap what we hold for them
+        self._maxlen = max(message_limit * 4, 16)
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def hit(self, user_id: Hashable, channel_id: int, message_id: int, now: Optional[float] = None) -> bool:
+        """Record a message; True when the user reached the limit within the time frame"""
+        now = self.clock() if now is None else now
+        cutoff = now - self.time_frame
+        self._evict_idle(cutoff)
+
+        window = self._users.get(user_id)
+        if window is None:
+            window = self._users[user_id] = _Window(self._maxlen)
+        else:
+            self._users.move_to_end(user_id)
+        window.last_seen = now
+        entries = window.entries
+        entries.append((now, channel_id, message_id))
+        while entries[0][0] < cutoff:
+            entries.popleft()
+        return len(entries) >= self.message_limit
+
+    def pop(self, user_id: Hashable) -> List[Tuple[int, int]]:
+        """Forget a user's window, returning its (channel_id, message_id) pairs"""
+        window = self._users.pop(user_id, None)
+        if window is None:
+            return []
+        return [(channel_id, message_id) for _, channel_id, message_id in window.entries]
+
+    def _evict_idle(self, cutoff: float, budget: int = 8):
+        """Drop a few users whose newest message is already outside the window"""
+        users = self._users
+        while users and budget:
+            user_id, window = next(iter(users.items()))
+            if window.last_seen >= cutoff:
+                return
+            del users[user_id]
+            budget -= 1
+
+
+class GuildSpamTrackers:
+    """SpamTrackers by (time_frame, message_limit), created on first use"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._trackers: Dict[Tuple[float, int], SpamTracker] = {}
+
+    def __len__(self) -> int:
+        return sum(map(len, self._trackers.values()))
+
+    def tracker(self, time_frame: float, message_limit: int) -> SpamTracker:
+        key = (time_frame, message_limit)
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            tracker = self._trackers[key] = SpamTracker(time_frame, message_limit, clock=lambda: self.clock())
+        return tracker
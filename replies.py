@@ -0,0 +1,59 @@
+"""
+Canned reply tables for mention/DM conversation.
+"""
+
+general_knowledge_qa = {
+    "what is the capital of france": "Paris 🇫🇷",
+    "who wrote harry potter": "J.K. Rowling ✍️",
+    "what is the largest planet": "Jupiter is the largest planet in our solar system! 🪐",
+    "who is the president of usa": "As of now, it's Joe Biden.",
+    "what is pi": "Pi (π) is approximately 3.14159.",
+    "what is the speed of light": "The speed of light is about 299,792 kilometers per second.",
+    "who invented the telephone": "Alexander Graham Bell invented the telephone.",
+    "how many continents are there": "There are 7 continents on Earth.",
+    "what's the tallest mountain": "Mount Everest is the tallest mountain above sea level.",
+    "when is independence day (india)": "India celebrates Independence Day on 15th August."
+}
+
+# Friendly Triggers (add more everyday chat)
+friendly_triggers = {
+    ("hello", "hi", "hey", "yo", "oye", "sup", "wassup", "namaste", "salaam", "good morning", "good afternoon", "good evening"): [
+        "Hey {mention}, kaise ho? 😊", "Namaste {mention}!", "Hello hello {mention}!", "Oye, kya haal hai {mention}? 👋", "Yo {mention}, what's up?"
+    ],
+    ("or", "or kya", "or batao", "or bhai", "aur bata", "aur kya", "kya scene hai"): [
+        "Sab badiya {mention}, tum batao!", "Aur kya ho raha hai {mention}?", "Bhai, life set hai. Tumhara kya haal hai?", "Chalo, batao koi nayi baat {mention}."
+    ],
+    ("how are you", "kaisa hai", "kya haal hai", "kaisi ho", "how's it going", "kaisi chal rahi hai life"): [
+        "Mast hoon! Tum sunao {mention}?", "Main theek hoon, tum kaise ho {mention}?", "Bas, zinda hoon! 😎"
+    ],
+    ("what's up", "whats up", "kya chal raha hai", "kya ho raha hai"): [
+        "Sab theek! Tumhara kya scene hai {mention}?", "Aaj kuch naya nahi {mention}, tum batao!", "Life ekdum chill hai!"
+    ],
+    ("tell me a joke", "joke", "koi joke sunao", "make me laugh"): [
+        "Why don't scientists trust atoms? Because they make up everything! 😂",
+        "Teacher: Why are you late? Student: Because of the sign. Teacher: What sign? Student: School Ahead, Go Slow! 🤣",
+        "What do you call fake spaghetti? An impasta! 🍝"
+    ],
+    ("who made you", "creator", "banaya kisne", "who is your developer"): [
+        "Mujhe banaya Neon ne! 😎", "Neon is my boss! 💻", "I'm powered by Neon! 🔥"
+    ],
+    ("bye", "good night", "gn", "see you", "goodbye", "tc", "take care"): [
+        "Bye {mention}, milte hain phir! 👋", "Good night {mention}, sweet dreams! 🌙", "Take care {mention}!"
+    ],
+    ("thanks", "thank you", "ty", "shukriya", "dhanyawad"): [
+        "Koi baat nahi {mention}, anytime! 🙏", "Yahi to kaam hai mera 😄", "You're welcome {mention}!"
+    ],
+    ("love you", "i love you bot", "ily bot", "luv u bot"): [
+        "Love you too {mention} ❤️", "Aww 🥺, tum bhi best ho {mention}!", "Dil jeet liya tumne {mention} 😍"
+    ]
+}
+
+# Add more relatable fallback replies
+fallback_replies = [
+    "Hmmm... interesting! Tumhe pata hai, honey never spoils. 😲",
+    "Accha yeh batao, tum sabse zyada kis cheez mein expert ho?",
+    "Waise, tumhe memes pasand hai? Main bhi meme lover hoon!",
+    "Pata hai, octopus ke teen dil hote hain! 🐙",
+    "Main samajh nahi paaya, but tumhare saath baat kar ke maza aata hai!",
+    "Yeh question tough tha! Tum batao, kuch aur poochna hai?"
+]
@@ -0,0 +1,118 @@
+"""
+Precomputed command output and per-channel response deduplication.
+
+Static listings are rendered once and kept until the tables behind them
+change (tracked through IntentRouter.version). Embeds for lookup results
+are built once per distinct result. When the same command is repeated in
+a channel within a short window, the previous response is reused rather
+than posted again.
+"""
+import time
+from typing import Awaitable, Callable, Hashable, List, Optional
+
+import discord
+
+from cache import TTLCache
+from router import IntentRouter
+
+MESSAGE_LIMIT = 2000          # characters Discord accepts per message
+DEDUP_WINDOW = 30.0           # seconds an identical command reuses the previous response
+EMBED_CACHE_SIZE = 512
+
+
+def paginate(lines: List[str], limit: int = MESSAGE_LIMIT) -> List[str]:
+    """Join lines into as few messages as fit under limit"""
+    pages: List[str] = []
+    current = ""
+    for line in lines:
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit and current:
+            pages.append(current)
+            candidate = line[:limit]
+        current = candidate
+    if current:
+        pages.append(current)
+    return pages
+
+
+class TriggerListing:
+    """!triggers output, re-rendered only after the router's tables change"""
+
+    def __init__(self, router: IntentRouter):
+        self.router = router
+        self._version = -1
+        self._pages: List[str] = []
+
+    def pages(self) -> List[str]:
+        if self._version != self.router.version:
+            lines = ["**I respond to these phrases (when tagged or DMed):**"]
+            lines += [" • " + ", ".join(f"`{t}`" for t in group) for group in self.router.friendly_triggers]
+            self._pages = paginate(lines)
+            self._version = self.router.version
+        return self._pages
+
+
+class EmbedCache:
+    """Embeds keyed by the content they were built from; callers must not mutate them"""
+
+    def __init__(self, maxsize: int = EMBED_CACHE_SIZE):
+        self._embeds = TTLCache(maxsize, ttl=float("inf"))
+
+    @property
+    def hits(self) -> int:
+        return self._embeds.hits
+
+    @property
+    def misses(self) -> int:
+        return self._embeds.misses
+
+    def get(self, key: Hashable, build: Callable[[], discord.Embed]) -> discord.Embed:
+        embed = self._embeds.get(key)
+        if embed is None:
+            embed = build()
+            self._embeds.set(key, embed)
+        return embed
+
+
+_PENDING = (0, 0)
+
+
+class ChannelDedup:
+    """Remembers the response to each (channel, command) for a short window"""
+
+    def __init__(self, window: float = DEDUP_WINDOW, maxsize: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self._recent = TTLCache(maxsize, window, clock)
+        self.reused = 0
+
+    def claim(self, channel_id: int, key: Hashable) -> bool:
+        """True if the caller should respond; False if a response is already posted or on its way"""
+        if self._recent.get((channel_id, key), count=False) is not None:
+            self.reused += 1
+            return False
+        self._recent.set((channel_id, key), _PENDING)
+        return True
+
+    def remember(self, channel_id: int, key: Hashable, message: Optional[discord.Message]):
+        """Record the response to a claim, or release the claim if nothing was posted"""
+        if message is None:
+            self._recent.discard((channel_id, key))
+        else:
+            self._recent.set((channel_id, key), (message.channel.id, message.id))
+
+    async def respond_once(self, message: discord.Message, key: Hashable,
+                           respond: Callable[[], Awaitable[Optional[discord.Message]]]):
+        """Run respond unless the same request was answered in this channel moments ago"""
+        channel_id = message.channel.id
+        if not self.claim(channel_id, key):
+            # Point at the answer already on screen instead of posting it again
+            try:
+                await message.add_reaction("🔁")
+            except discord.HTTPException:
+                pass
+            return
+        sent = None
+        try:
+            sent = await respond()
+        finally:
+            self.remember(channel_id, key, sent)
@@ -0,0 +1,103 @@
+"""
+Intent router for mention/DM replies.
+
+General-knowledge questions and friendly trigger phrases are compiled
+into one token trie. A message is tokenized once and every trie walk
+starts on a word boundary, so "or" no longer fires inside "world" and
+lookup cost depends on the message length and the longest phrase, not
+on how many triggers exist. General-knowledge answers must match the
+whole message and win over triggers; among triggers the earliest group
+wins, as before.
+"""
+import random
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+_TOKEN = re.compile(r"[\w']+")
+_DISCORD_MARKUP = re.compile(r"<(?:@[!&]?|#)\d+>")
+_END = ""  # trie key holding the phrase entry; tokens are never empty
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens, ignoring mentions and channel links"""
+    text = text.lower()
+    if "<" in text:
+        text = _DISCORD_MARKUP.sub(" ", text)
+    return _TOKEN.findall(text)
+
+
+class Route(NamedTuple):
+    kind: str                    # "answer" or "friendly"
+    priority: int                # lower wins
+    responses: Tuple[Tuple[str, ...], ...]  # templates pre-split around {mention}
+
+    def reply(self, mention: str) -> str:
+        return mention.join(random.choice(self.responses))
+
+
+def _split_template(template: str) -> Tuple[str, ...]:
+    return tuple(template.split("{mention}"))
+
+
+class IntentRouter:
+    def __init__(self, general_knowledge: Dict[str, str],
+                 friendly_triggers: Dict[Tuple[str, ...], Sequence[str]]):
+        self.general_knowledge = general_knowledge
+        self.friendly_triggers = friendly_triggers
+        self.version = 0
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompile the trie after the tables change"""
+        trie: dict = {}
+        for question, answer in self.general_knowledge.items():
+            self._insert(trie, tokenize(question), Route("answer", -1, ((answer,),)), anchored=True)
+        for priority, (triggers, responses) in enumerate(self.friendly_triggers.items()):
+            route = Route("friendly", priority, tuple(_split_template(r) for r in responses))
+            for trigger in triggers:
+                self._insert(trie, tokenize(trigger), route, anchored=False)
+        self._trie = trie
+        self.version += 1
+
+    def add_trigger_group(self, triggers: Iterable[str], responses: Sequence[str]):
+        self.friendly_triggers[tuple(triggers)] = list(responses)
+        self.rebuild()
+
+    @staticmethod
+    def _insert(trie: dict, tokens: List[str], route: Route, anchored: bool):
+        if not tokens:
+            return
+        node = trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        current = node.get(_END)
+        # Keep the highest-priority route if two tables share a phrase
+        if current is None or route.priority < current[0].priority:
+            node[_END] = (route, anchored)
+
+    def route(self, content: str) -> Optional[Route]:
+        """Best route for the message, or None to fall back"""
+        tokens = tokenize(content)
+        size = len(tokens)
+        trie = self._trie
+        best: Optional[Route] = None
+        for start in range(size):
+            node = trie
+            for pos in range(start, size):
+                node = node.get(tokens[pos])
+                if node is None:
+                    break
+                entry = node.get(_END)
+                if entry is None:
+                    continue
+                route, anchored = entry
+                if anchored and (start or pos != size - 1):
+                    continue
+                if best is None or route.priority < best.priority:
+                    best = route
+                    if route.kind == "answer":
+                        return best
+            # Answers only match from the first token, so nothing can beat the top group after it
+            if best is not None and best.priority == 0:
+                return best
+        return best
@@ -0,0 +1,140 @@
+"""
+DuckDuckGo search service.
+
+Searches run on a dedicated, size-limited thread pool so a burst of
+queries cannot starve the loop's default executor, and each worker thread
+reuses one DDGS session. duckduckgo_search is imported on the first
+search rather than at startup, since most restarts never search.
+Formatted results are cached, identical queries in flight are
+coalesced, and both per-user and global limits turn excess requests
+away early instead of queueing them indefinitely.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Optional
+
+from cache import SingleFlight, TTLCache, normalize_query
+
+if TYPE_CHECKING:
+    from duckduckgo_search import DDGS
+
+log = logging.getLogger("bot")
+
+SEARCH_WORKERS = 2
+SEARCH_MAX_PENDING = 8     # searches waiting or running before new ones are turned away
+SEARCH_PER_USER = 1        # concurrent searches per user
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 1800    # seconds
+SEARCH_RESULTS = 3
+
+
+class SearchBusy(Exception):
+    """Raised when a search is refused because of the concurrency limits"""
+
+
+class SearchService:
+    def __init__(self, workers: int = SEARCH_WORKERS, max_pending: int = SEARCH_MAX_PENDING,
+                 per_user: int = SEARCH_PER_USER, cache_size: int = SEARCH_CACHE_SIZE,
+                 ttl: float = SEARCH_CACHE_TTL):
+        self.max_pending = max_pending
+        self.per_user = per_user
+        self.cache = TTLCache(cache_size, ttl)
+        self.flight = SingleFlight()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ddg-search")
+        self._local = threading.local()
+        self._pending = 0
+        self._user_pending: Counter = Counter()
+        # Metrics
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        self.latencies: deque = deque(maxlen=512)  # seconds, upstream searches only
+
+    def _client(self) -> "DDGS":
+        client = getattr(self._local, "ddgs", None)
+        if client is None:
+            from duckduckgo_search import DDGS
+            client = self._local.ddgs = DDGS()
+        return client
+
+    def _search_sync(self, query: str) -> str:
+        try:
+            results = [
+                f"• [{r['title']}]({r['href']})\n{r['body']}"
+                for r in self._client().text(query, max_results=SEARCH_RESULTS)
+            ]
+        except Exception:
+            # Start this worker over with a fresh session next time
+            self._local.ddgs = None
+            raise
+        return "\n\n".join(results) if results else "No results found."
+
+    async def _run(self, query: str) -> str:
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, self._search_sync, query)
+        self.latencies.append(time.perf_counter() - start)
+        self.cache.set(query, result)
+        return result
+
+    async def search(self, query: str, user_id: Optional[int] = None) -> str:
+        """Formatted results for query; raises SearchBusy when over the limits"""
+        self.requests += 1
+        key = normalize_query(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        # Riding along on an identical search in flight costs nothing extra
+        if key in self.flight:
+            return await self._join(key)
+        if user_id is not None and self._user_pending[user_id] >= self.per_user:
+            self.rejected += 1
+            raise SearchBusy("You already have a search running, please wait for it to finish.")
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise SearchBusy("Search is busy right now, please try again in a moment.")
+
+        self._pending += 1
+        if user_id is not None:
+            self._user_pending[user_id] += 1
+        try:
+            return await self._join(key)
+        finally:
+            self._pending -= 1
+            if user_id is not None:
+                self._user_pending[user_id] -= 1
+                if not self._user_pending[user_id]:
+                    del self._user_pending[user_id]
+
+    async def _join(self, key: str) -> str:
+        try:
+            return await self.flight.do(key, lambda: self._run(key))
+        except Exception as e:
+            self.errors += 1
+            log.error(f"DuckDuckGo search error: {e}")
+            return "Search failed. Please try again later."
+
+    def stats(self) -> Dict[str, float]:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 if ordered else 0.0
+
+        return {
+            "requests": self.requests,
+            "cache_hit_rate": self.cache.hit_rate,
+            "coalesced": self.flight.coalesced,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "pending": self._pending,
+            "queue_depth": self.executor._work_queue.qsize(),
+            "latency_p50_ms": pct(0.5),
+            "latency_p95_ms": pct(0.95),
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,37 @@
+"""
+SQLite setup shared by the bot's stores.
+
+Each store keeps one connection that is used from the event loop and
+from executor or listener threads, so it is opened with thread checks
+off and every use is serialized by a lock. WAL mode lets readers run
+alongside the writer, and synchronous=NORMAL skips the fsync per commit,
+which WAL keeps safe against application crashes. Writes made from the
+event loop go through write(), which runs the transaction on the default
+executor so a commit never stalls the loop.
+"""
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Callable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def open_db(path: str, schema: str) -> Tuple[sqlite3.Connection, threading.Lock]:
+    """A shared connection to path with schema applied, and the lock guarding it"""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    lock = threading.Lock()
+    with lock, conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(schema)
+    return conn, lock
+
+
+async def write(conn: sqlite3.Connection, lock: threading.Lock,
+                fn: Callable[..., T], *args: Any) -> T:
+    """fn(conn, *args) in one transaction, run on the default executor"""
+    def run() -> T:
+        with lock, conn:
+            return fn(conn, *args)
+    return await asyncio.get_running_loop().run_in_executor(None, run)
@@ -0,0 +1,63 @@
+import sqlite3
+import time
+
+import pytest
+
+from audit import AuditStore
+
+DAY = 86400
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AuditStore(str(tmp_path / "audit.db"), retention_days=30)
+    yield store
+    store.close()
+
+
+def event(ts, kind="spam", action="timeout", user_id=1, latency_ms=None):
+    return {"ts": ts, "kind": kind, "action": action, "user_id": user_id, "latency_ms": latency_ms}
+
+
+def test_stats_come_from_the_daily_rollup(store):
+    now = time.time()
+    store.insert([event(now, latency_ms=10), event(now, latency_ms=30), event(now, user_id=2),
+                  event(now, "banned_words", "delete", latency_ms=5)])
+    store.insert([event(now - 2 * DAY, latency_ms=100)])
+
+    stats = store.stats(days=1)
+    assert stats["counts"] == [("spam", "timeout", 3), ("banned_words", "delete", 1)]
+    assert stats["users"] == [(1, 3), (2, 1)]
+    assert stats["latency_avg_ms"] == pytest.approx(15)
+    assert stats["latency_max_ms"] == 30
+
+    stats = store.stats(days=7)
+    assert stats["latency_avg_ms"] == pytest.approx(145 / 4)
+    assert stats["latency_max_ms"] == 100
+
+
+def test_stats_without_latency(store):
+    store.insert([event(time.time())])
+    stats = store.stats()
+    assert stats["latency_avg_ms"] is None and stats["latency_max_ms"] is None
+
+
+def test_old_events_are_pruned_but_rollups_stay(store):
+    now = time.time()
+    store.insert([event(now - 40 * DAY, latency_ms=50), event(now - 10 * DAY)])
+    assert store._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 1
+    stats = store.stats(days=60)
+    assert sum(count for _, _, count in stats["counts"]) == 2
+    assert stats["latency_max_ms"] == 50
+
+
+def test_daily_table_from_before_the_latency_rollup_is_upgraded(tmp_path):
+    path = str(tmp_path / "audit.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE daily (day TEXT NOT NULL, kind TEXT NOT NULL, action TEXT NOT NULL, "
+                 "count INTEGER NOT NULL, PRIMARY KEY (day, kind, action)) WITHOUT ROWID")
+    conn.close()
+    store = AuditStore(path)
+    store.insert([event(time.time(), latency_ms=20)])
+    assert store.stats()["latency_avg_ms"] == 20
+    store.close()
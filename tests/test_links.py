@@ -0,0 +1,66 @@
+import asyncio
+
+from links import DomainBlocklist, find_links
+from textfields import MessageScanner
+from wordfilter import BannedWords
+from wordstore import WordStore
+
+
+class Guild:
+    id = 1
+
+
+class Author:
+    id = 2
+    display_name = "player"
+
+
+class Message:
+    guild = Guild()
+    author = Author()
+    embeds = []
+    attachments = []
+
+    def __init__(self, content: str):
+        self.content = content
+
+
+def slugs(text):
+    return [slug for _, slug in find_links(text)]
+
+
+def test_opaque_ids_are_not_tokenized():
+    assert slugs("https://youtu.be/MC-xf4m8g_9") == [""]
+    assert slugs("https://www.youtube.com/watch?v=dQw4w9WgXcQ") == ["watch v"]
+    assert slugs("https://github.com/org/repo/commit/3f9a2c1be07d4e11a0c2") == ["org repo commit"]
+    assert slugs("https://x.com/user/status/1790000000000000000") == ["user status"]
+
+
+def test_readable_segments_are_tokenized():
+    assert slugs("https://example.com/blog/how-to_get%20banned/") == ["blog how to get banned"]
+    assert slugs("https://en.wikipedia.org/wiki/Some_Title") == ["wiki Some Title"]
+
+
+def test_banned_word_in_id_is_not_a_violation():
+    banned = BannedWords()
+    asyncio.run(banned.add_custom_words(["mc", "scammer"]))
+    scanner = MessageScanner(DomainBlocklist())
+
+    async def scan(text):
+        return banned.scan(text)
+
+    async def first(content):
+        return await scanner.first_violation(Message(content), scan)
+
+    assert asyncio.run(first("watch https://youtu.be/MC-xf4m8g_9")) is None
+    violation = asyncio.run(first("lol https://example.com/known-scammer-list"))
+    assert violation is not None and violation.field == "link" and violation.words == ("scammer",)
+
+
+def test_blocklist_changes_survive_a_restart(tmp_path):
+    path = str(tmp_path / "words.db")
+    blocklist = DomainBlocklist({"grabify.link"}, store=WordStore(path))
+    assert asyncio.run(blocklist.add(["Evil.example", " "])) == 1
+    assert blocklist.blocked("cdn.evil.example") == "evil.example"
+    assert asyncio.run(blocklist.remove(["grabify.link"])) == 1
+    assert DomainBlocklist({"grabify.link"}, store=WordStore(path)).domains == {"evil.example"}
@@ -0,0 +1,95 @@
+import asyncio
+
+from mitigation import BulkDeleter
+
+
+class PartialMessage:
+    def __init__(self, channel, message_id: int):
+        self.channel = channel
+        self.id = message_id
+
+    async def delete(self):
+        await self.channel.request([self.id])
+
+
+class Channel:
+    """Records each delete request; bulk deletes with repeated IDs fail like Discord's 400"""
+
+    id = 10
+
+    def __init__(self, delay: float = 0.01, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.requests = []
+
+    async def request(self, ids):
+        self.requests.append(ids)
+        await asyncio.sleep(self.delay)
+        if self.fail or len(set(ids)) != len(ids):
+            raise RuntimeError("bad request")
+
+    async def delete_messages(self, messages):
+        await self.request([m.id for m in messages])
+
+    def get_partial_message(self, message_id: int) -> PartialMessage:
+        return PartialMessage(self, message_id)
+
+
+def test_deletes_queued_behind_a_request_share_the_next_one():
+    async def run():
+        deleter, channel = BulkDeleter(), Channel()
+        first = asyncio.ensure_future(deleter.delete(channel, [1, 2]))
+        await asyncio.sleep(0)
+        await asyncio.gather(first, deleter.delete(channel, [3, 4]), deleter.delete(channel, [5]))
+        return channel.requests
+
+    assert asyncio.run(run()) == [[1, 2], [3, 4, 5]]
+
+
+def test_repeated_ids_are_sent_once():
+    async def run():
+        deleter, channel = BulkDeleter(), Channel()
+        await asyncio.gather(deleter.delete(channel, [3, 4, 5]), deleter.delete(channel, [4, 5, 6]))
+        return channel.requests
+
+    assert asyncio.run(run()) == [[3, 4, 5, 6]]
+
+
+def test_id_already_in_flight_waits_for_that_request():
+    async def run():
+        deleter, channel = BulkDeleter(), Channel()
+        first = asyncio.ensure_future(deleter.delete(channel, [1, 2]))
+        await asyncio.sleep(0)
+        await asyncio.gather(first, deleter.delete(channel, [2, 3]))
+        return channel.requests
+
+    assert asyncio.run(run()) == [[1, 2], [3]]
+
+
+def test_failed_request_fails_every_caller_in_it():
+    async def run():
+        deleter, channel = BulkDeleter(), Channel(fail=True)
+        results = await asyncio.gather(deleter.delete(channel, [1, 2]), deleter.delete(channel, [2, 3]),
+                                       return_exceptions=True)
+        assert deleter._pending == {} and deleter._in_flight == {}
+        return results
+
+    assert [type(r) for r in asyncio.run(run())] == [RuntimeError, RuntimeError]
+
+
+def test_empty_delete_returns():
+    async def run():
+        deleter, channel = BulkDeleter(), Channel()
+        await deleter.delete(channel, [])
+        return channel.requests
+
+    assert asyncio.run(run()) == []
+
+
+def test_large_deletes_are_split_at_the_bulk_limit():
+    async def run():
+        deleter, channel = BulkDeleter(), Channel()
+        await deleter.delete(channel, list(range(150)))
+        return [len(ids) for ids in channel.requests]
+
+    assert asyncio.run(run()) == [100, 50]
@@ -0,0 +1,24 @@
+import asyncio
+
+from modmail import ModmailStore
+
+
+def test_ticket_lifecycle_is_persisted(tmp_path):
+    path = str(tmp_path / "modmail.db")
+
+    async def run():
+        store = ModmailStore(path)
+        ticket = await store.open(7)
+        ticket = await store.set_thread(ticket, 500)
+        await store.record(900, ticket, "in", 7, "hello")
+        assert store.open_ticket_for(7) == ticket
+        await store.close(ticket)
+        assert store.open_ticket_for(7) is None
+        store.close_db()
+        return ticket
+
+    ticket = asyncio.run(run())
+    reopened = ModmailStore(path)
+    assert reopened.ticket_for_message(900).id == ticket.id
+    assert reopened.ticket_for_message(500).status == "closed"
+    assert reopened.counts() == {"closed": 1}
@@ -0,0 +1,31 @@
+import pytest
+
+from normalize import normalize_text
+from wordfilter import BannedWords
+
+
+@pytest.fixture(scope="module")
+def banned():
+    return BannedWords()
+
+
+@pytest.mark.parametrize("text", [
+    "you are a looser", "bcc me on that mail", "salla", "sanni", "dhool bajao", "good call", "see the wall",
+])
+def test_doubled_letters_are_left_alone(banned, text):
+    assert banned.get_banned_words(text) == []
+
+
+@pytest.mark.parametrize("text, word", [
+    ("fuuuuck you", "fuck"),
+    ("what an assssshole", "asshole"),
+    ("shiiiit", "shit"),
+    ("f u u u c k", "fuck"),
+    ("sallla", "sala"),
+])
+def test_stretched_letters_still_match(banned, text, word):
+    assert word in banned.get_banned_words(text)
+
+
+def test_text_without_runs_of_three_is_unchanged():
+    assert normalize_text("you are a looser") == "you are a looser"
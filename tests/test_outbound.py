@@ -0,0 +1,127 @@
+import asyncio
+
+from outbound import CHATTER, MODERATION, REPLY, OutboundScheduler, _PriorityGate
+
+
+class Channel:
+    def __init__(self, channel_id: int, log: list, delay: float = 0.01):
+        self.id = channel_id
+        self.log = log
+        self.delay = delay
+
+    async def send(self, content=None, **kwargs):
+        self.log.append((self.id, content))
+        await asyncio.sleep(self.delay)
+        return content
+
+
+def test_urgent_sends_overtake_queued_chatter():
+    async def run():
+        log = []
+        outbox, channel = OutboundScheduler(), Channel(1, log)
+        sends = [outbox.submit(channel, f"chat {i}", priority=CHATTER) for i in range(3)]
+        await asyncio.sleep(0)  # "chat 0" is now in flight
+        sends.append(outbox.submit(channel, "reply", priority=REPLY))
+        sends.append(outbox.submit(channel, "warning", priority=MODERATION))
+        await asyncio.gather(*sends)
+        return [content for _, content in log]
+
+    assert asyncio.run(run()) == ["chat 0", "warning", "reply", "chat 1", "chat 2"]
+
+
+def test_gate_admits_the_most_urgent_channel_first():
+    async def run():
+        log = []
+        outbox = OutboundScheduler(concurrency=1)
+        busy, chatty, moderated = Channel(1, log), Channel(2, log), Channel(3, log)
+        first = outbox.submit(busy, "first", priority=CHATTER)
+        await asyncio.sleep(0)
+        later = [outbox.submit(chatty, "chat", priority=CHATTER),
+                 outbox.submit(moderated, "warning", priority=MODERATION)]
+        await asyncio.gather(first, *later)
+        return [content for _, content in log]
+
+    assert asyncio.run(run()) == ["first", "warning", "chat"]
+
+
+def test_chatter_is_not_starved_but_stale_chatter_is_dropped():
+    async def run():
+        now = [0.0]
+        log = []
+        outbox, channel = OutboundScheduler(chatter_max_age=5, clock=lambda: now[0]), Channel(1, log)
+        fresh = outbox.submit(channel, "fresh chat", priority=CHATTER)
+        urgent = [outbox.submit(channel, f"warning {i}", priority=MODERATION) for i in range(3)]
+        assert await fresh == "fresh chat"  # sent once the urgent sends ahead of it are out
+        await asyncio.gather(*urgent)
+
+        blocker = outbox.submit(channel, "warning", priority=MODERATION)
+        await asyncio.sleep(0)
+        stale = outbox.submit(channel, "stale chat", priority=CHATTER)
+        now[0] = 10.0
+        await blocker
+        return await stale, outbox.dropped[CHATTER], [content for _, content in log]
+
+    stale, dropped, sent = asyncio.run(run())
+    assert stale is None and dropped == 1
+    assert sent == ["warning 0", "warning 1", "warning 2", "fresh chat", "warning"]
+
+
+def test_chatter_turned_away_under_pressure():
+    async def run():
+        outbox, channel = OutboundScheduler(pressure_depth=2), Channel(1, [])
+        first = outbox.submit(channel, "a", priority=CHATTER)
+        await asyncio.sleep(0)
+        queued = [outbox.submit(channel, m, priority=CHATTER) for m in "bcd"]
+        return await asyncio.gather(first, *queued)
+
+    assert asyncio.run(run()) == ["a", "b", "c", None]
+
+
+def test_cancelled_caller_does_not_stall_the_channel():
+    async def run():
+        log = []
+        outbox, channel = OutboundScheduler(), Channel(1, log)
+        first = outbox.submit(channel, "first", priority=REPLY)
+        gone = outbox.submit(channel, "gone", priority=REPLY)
+        last = outbox.submit(channel, "last", priority=REPLY)
+        await asyncio.sleep(0)
+        gone.cancel()
+        assert await last == "last"
+        await first
+        return [content for _, content in log]
+
+    # The queued send still goes out; only its caller stopped waiting
+    assert asyncio.run(run()) == ["first", "gone", "last"]
+
+
+def test_cancelled_gate_waiter_passes_its_slot_on():
+    async def run():
+        gate = _PriorityGate(1)
+        await gate.acquire(CHATTER, 0)
+        cancelled = asyncio.ensure_future(gate.acquire(MODERATION, 1))
+        waiting = asyncio.ensure_future(gate.acquire(CHATTER, 2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        gate.release()
+        await asyncio.wait_for(waiting, 1)
+        gate.release()
+        return gate._free
+
+    assert asyncio.run(run()) == 1
+
+
+def test_batched_warnings_go_out_as_one_message():
+    async def run():
+        log = []
+        outbox, channel = OutboundScheduler(), Channel(1, log)
+        first = outbox.submit(channel, "hello", priority=REPLY)
+        await asyncio.sleep(0)
+        warnings = [outbox.submit(channel, f"<@{uid}> watch your language", priority=MODERATION,
+                                  batch="warn", footer="Repeat offences earn a timeout") for uid in (1, 2, 1)]
+        results = await asyncio.gather(first, *warnings)
+        return results, log, outbox.merged[MODERATION]
+
+    results, log, merged = asyncio.run(run())
+    assert len(log) == 2 and merged == 2
+    assert log[1][1] == "<@1> watch your language\n<@2> watch your language\nRepeat offences earn a timeout"
+    assert results[1] == results[2] == results[3]
@@ -0,0 +1,21 @@
+import asyncio
+
+from profiles import DEFAULT_PROFILE, ProfileStore
+
+
+def test_setters_persist_and_refresh_the_cache(tmp_path):
+    path = str(tmp_path / "profiles.db")
+
+    async def run():
+        store = ProfileStore(path)
+        await store.set_languages(1, ["english"])
+        assert await store.add_words(1, ["foo", "bar"]) == 2
+        assert await store.remove_words(1, ["bar", "baz"]) == 1
+        await store.set_spam_limits(1, 3, 10, 120)
+        await store.reset(2)
+        return store.profile(1)
+
+    profile = asyncio.run(run())
+    assert profile.languages == {"english"} and profile.words == {"foo"}
+    assert ProfileStore(path).profile(1) == profile
+    assert ProfileStore(path).profile(2) == DEFAULT_PROFILE
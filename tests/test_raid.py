@@ -0,0 +1,65 @@
+import random
+
+from raid import RaidDetector, _bands, fold, minhash, similarity
+
+WORDS = "join free nitro server now best discord giveaway claim today".split()
+
+
+def shared_band_variants():
+    """Two raid texts that land in one LSH bucket but form separate clusters"""
+    rng = random.Random(1)
+    for _ in range(20000):
+        a = " ".join(rng.sample(WORDS, 6))
+        b = " ".join(rng.sample(WORDS, 6))
+        sa, sb = minhash(fold(a)), minhash(fold(b))
+        if set(_bands(sa)) & set(_bands(sb)) and similarity(sa, sb) < 0.6:
+            return a, b
+    raise AssertionError("no variant pair found")
+
+
+def raid(detector, text, start, users):
+    for i, uid in enumerate(users):
+        detector.observe(1, uid, text, 10, start * 100 + i, True, now=start + i)
+
+
+def test_raid_ending_as_window_empties_with_bucket_shared():
+    a, b = shared_band_variants()
+    detector = RaidDetector(window=30, user_threshold=5, duration=120)
+    raid(detector, a, 0, range(100, 105))    # raid mode until 124
+    raid(detector, b, 10, range(200, 205))   # raid mode until 134
+    assert detector.active_raids(1, now=20) == 2
+
+    # Both windows are empty; a's raid ends while b's bucket entry remains
+    assert detector.observe(1, 300, "anyone up for a match tonight", 10, 1, True, now=125) is None
+    assert detector.active_raids(1, now=125) == 1
+    assert detector.observe(1, 301, "anyone up for a match later on", 10, 2, True, now=126) is None
+    assert detector.observe(1, 302, "still here after the raid", 10, 3, True, now=200) is None
+    assert detector.active_raids(1, now=200) == 0
+
+
+def test_raid_list_rebuilt_when_later_raid_ends_first():
+    detector = RaidDetector(window=30, user_threshold=5, duration=120)
+    raid(detector, "join my server for free nitro", 0, range(100, 105))
+    detector.observe(1, 999, "join my server for free nitro", 10, 99, True, now=100)  # extends the first raid
+    raid(detector, "totally different raid message here", 10, range(200, 205))
+    assert detector.active_raids(1, now=140) == 1
+    assert detector.observe(1, 500, "totally different raid message here", 10, 5, True, now=150) is None
+
+
+def test_established_members_posting_the_same_greeting_is_not_a_raid():
+    detector = RaidDetector(window=30, user_threshold=5, duration=120)
+    for i, uid in enumerate(range(100, 110)):
+        assert detector.observe(1, uid, "happy new year everyone!", 10, i, False, now=i) is None
+    assert detector.active_raids(1, now=10) == 0
+
+
+def test_only_new_members_count_towards_a_raid():
+    detector = RaidDetector(window=30, user_threshold=5, duration=120)
+    text = "join my server for free nitro"
+    for i, uid in enumerate(range(100, 104)):
+        assert detector.observe(1, uid, text, 10, i, True, now=i) is None
+    for i, uid in enumerate(range(200, 205)):
+        assert detector.observe(1, uid, text, 10, 10 + i, False, now=5 + i) is None
+    hit = detector.observe(1, 104, text, 10, 20, True, now=11)
+    assert hit is not None and hit.started and hit.users == 5
+    assert len(hit.earlier) == 4  # only the new members' messages are purged
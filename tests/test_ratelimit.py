@@ -0,0 +1,56 @@
+from ratelimit import GuildSpamTrackers, SpamTracker
+
+
+def test_limit_reached_only_within_the_time_frame():
+    tracker = SpamTracker(time_frame=5, message_limit=3)
+    assert not tracker.hit(1, 10, 100, now=0)
+    assert not tracker.hit(1, 10, 101, now=1)
+    assert tracker.hit(1, 11, 102, now=2)
+    assert tracker.pop(1) == [(10, 100), (10, 101), (11, 102)]
+    assert tracker.pop(1) == []
+
+
+def test_old_messages_fall_out_of_the_window():
+    tracker = SpamTracker(time_frame=5, message_limit=3)
+    tracker.hit(1, 10, 100, now=0)
+    tracker.hit(1, 10, 101, now=1)
+    assert not tracker.hit(1, 10, 102, now=6)  # the first message is over 5s old
+    assert tracker.pop(1) == [(10, 101), (10, 102)]
+
+
+def test_users_are_counted_separately():
+    tracker = SpamTracker(time_frame=5, message_limit=2)
+    assert not tracker.hit(1, 10, 100, now=0)
+    assert not tracker.hit(2, 10, 101, now=0)
+    assert tracker.hit(1, 10, 102, now=1)
+
+
+def test_idle_users_are_evicted_lazily():
+    tracker = SpamTracker(time_frame=5, message_limit=3)
+    for uid in range(4):
+        tracker.hit(uid, 10, uid, now=0)
+    tracker.hit(99, 10, 99, now=1)
+    assert len(tracker) == 5
+    tracker.hit(99, 10, 100, now=10)
+    assert len(tracker) == 1
+
+
+def test_window_is_capped_for_exempt_users():
+    tracker = SpamTracker(time_frame=60, message_limit=2)
+    for mid in range(100):
+        tracker.hit(1, 10, mid, now=mid * 0.1)
+    assert len(tracker.pop(1)) == 16
+
+
+def test_guilds_with_the_same_thresholds_share_a_tracker():
+    now = [0.0]
+    trackers = GuildSpamTrackers(clock=lambda: now[0])
+    shared = trackers.tracker(5, 3)
+    assert trackers.tracker(5, 3) is shared
+    assert trackers.tracker(5, 4) is not shared
+    shared.hit((1, 7), 10, 100)
+    trackers.tracker(5, 4).hit((2, 7), 10, 101)
+    assert len(trackers) == 2
+    now[0] = 3.0
+    assert not shared.hit((1, 7), 10, 102)
+    assert shared.hit((1, 7), 10, 103)
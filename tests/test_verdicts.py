@@ -0,0 +1,43 @@
+import asyncio
+
+from modpool import ModerationPool
+from profiles import DEFAULT_PROFILE
+from verdicts import VerdictCache
+from wordfilter import BannedWords, ProfileMatchers
+
+
+def make_cache():
+    banned = BannedWords()
+    pool = ModerationPool(banned, workers=0)
+    return VerdictCache(banned, pool, ProfileMatchers(banned)), banned, pool
+
+
+def scan(verdicts, text, profile=DEFAULT_PROFILE):
+    return [m.pattern for m in asyncio.run(verdicts.scan(text, profile))]
+
+
+def test_repeats_hit_the_raw_key_and_variants_the_normalized_key():
+    verdicts, _, pool = make_cache()
+    assert scan(verdicts, "you moron") == ["moron"]
+    assert scan(verdicts, "you moron") == ["moron"]
+    assert scan(verdicts, "YOU M0RON") == ["moron"]
+    assert (verdicts.raw_hits, verdicts.normalized_hits, verdicts.misses) == (1, 1, 1)
+    assert (pool.inline, pool.pooled) == (1, 0)
+
+
+def test_word_list_change_drops_cached_verdicts():
+    verdicts, banned, _ = make_cache()
+    assert scan(verdicts, "what a blorp") == []
+    asyncio.run(banned.add_custom_words(["blorp"]))
+    assert scan(verdicts, "what a blorp") == ["blorp"]
+    assert verdicts.misses == 2
+
+
+def test_verdicts_are_scoped_to_the_guild_selection():
+    verdicts, _, _ = make_cache()
+    custom = DEFAULT_PROFILE._replace(words=frozenset({"blorp"}))
+    hindi_only = DEFAULT_PROFILE._replace(languages=frozenset({"hindi"}))
+    assert scan(verdicts, "blorp moron") == ["moron"]
+    assert sorted(scan(verdicts, "blorp moron", custom)) == ["blorp", "moron"]
+    assert scan(verdicts, "blorp moron", hindi_only) == []
+    assert verdicts.hits == 0
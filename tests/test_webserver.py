@@ -0,0 +1,34 @@
+from webserver import WebServer
+
+
+class StubBot:
+    latency = 0.05
+    guilds = []
+
+    def __init__(self, shard_ids):
+        self.shards = dict.fromkeys(shard_ids)
+
+    def is_ready(self):
+        return True
+
+    def is_closed(self):
+        return False
+
+
+def test_ready_only_while_every_shard_is_connected():
+    server = WebServer(StubBot([0, 1, 2]), port=0)
+    assert not server.is_ready()
+    for shard_id in (0, 1, 2):
+        server.shard_connected(shard_id)
+    assert server.is_ready()
+
+    server.shard_disconnected(1)
+    assert not server.is_ready()
+    server.shard_connected(2)  # another shard resuming does not cover the dropped one
+    assert not server.is_ready()
+    server.shard_connected(1)
+    assert server.is_ready()
+
+
+def test_not_ready_before_any_shard_is_launched():
+    assert not WebServer(StubBot([]), port=0).is_ready()
@@ -0,0 +1,108 @@
+import asyncio
+
+from aiohttp import web
+
+from wiki import WikiClient
+
+PAGES = {
+    "Python (programming language)": {
+        "title": "Python (programming language)",
+        "extract": "Python is a high-level programming language.",
+        "fullurl": "https://en.wikipedia.org/wiki/Python_(programming_language)",
+    },
+    "Mercury": {"title": "Mercury", "pageprops": {"disambiguation": ""}},
+}
+SEARCH = {
+    "python": ["Python (programming language)", "Python (genus)"],
+    "mercury": ["Mercury", "Mercury (planet)", "Mercury (element)", "Freddie Mercury"],
+    "lost page": ["Lost page"],
+}
+
+
+class StubWikipedia:
+    """A local stand-in for the MediaWiki API that counts upstream requests"""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.requests = 0
+
+    async def api(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        params = request.query
+        if params["action"] == "opensearch":
+            query = params["search"]
+            return web.json_response([query, SEARCH.get(query, []), [], []])
+        title = params["titles"]
+        page = PAGES.get(title, {"title": title, "missing": True})
+        return web.json_response({"query": {"pages": [page]}})
+
+
+async def with_client(stub: StubWikipedia, test):
+    app = web.Application()
+    app.router.add_get("/w/api.php", stub.api)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    client = WikiClient(api_url=f"http://127.0.0.1:{port}/w/api.php")
+    try:
+        return await test(client)
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+def run(test, delay: float = 0) -> StubWikipedia:
+    stub = StubWikipedia(delay)
+    asyncio.run(with_client(stub, test))
+    return stub
+
+
+def test_page_summary():
+    async def test(client):
+        result = await client.summary("  Python ")
+        assert result.kind == "page"
+        assert result.title == "Python (programming language)"
+        assert result.summary.startswith("Python is")
+        assert result.url.endswith("/Python_(programming_language)")
+
+    run(test)
+
+
+def test_disambiguation_lists_other_titles():
+    async def test(client):
+        result = await client.summary("mercury")
+        assert result.kind == "disambiguation"
+        assert result.options == ["Mercury (planet)", "Mercury (element)", "Freddie Mercury"]
+
+    run(test)
+
+
+def test_missing_page():
+    async def test(client):
+        assert (await client.summary("no such thing")).kind == "missing"
+        assert (await client.summary("lost page")).kind == "missing"
+
+    stub = run(test)
+    assert stub.requests == 3  # no suggestion, then suggestion plus page lookup
+
+
+def test_cache_hits_skip_upstream():
+    async def test(client):
+        first = await client.summary("Python")
+        assert await client.summary("python") == first
+        assert await client.summary("PYTHON  ") == first
+
+    stub = run(test)
+    assert stub.requests == 2
+
+
+def test_concurrent_queries_share_one_request():
+    async def test(client):
+        results = await asyncio.gather(*(client.summary(q) for q in ["python", "Python", " python"] * 4))
+        assert all(r == results[0] for r in results)
+
+    stub = run(test, delay=0.05)
+    assert stub.requests == 2
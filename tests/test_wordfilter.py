@@ -0,0 +1,64 @@
+import asyncio
+
+from matcher import words_digest
+from wordfilter import BannedWords, ProfileMatchers
+from wordstore import WordStore
+
+
+def test_matches_report_the_listed_word():
+    banned = BannedWords()
+    asyncio.run(banned.add_custom_words(["k1ll3r"]))
+    assert banned.get_banned_words("what a KILLER move") == ["k1ll3r"]
+
+
+def test_listed_word_moves_to_a_remaining_word_with_the_same_form():
+    banned = BannedWords()
+    asyncio.run(banned.add_custom_words(["h4ck3r", "hack3r"]))
+    assert banned.get_banned_words("hacker") == ["h4ck3r"]
+    asyncio.run(banned.remove_custom_words(["h4ck3r"]))
+    assert banned.get_banned_words("hacker") == ["hack3r"]
+    asyncio.run(banned.remove_custom_words(["hack3r"]))
+    assert banned.get_banned_words("hacker") == []
+
+
+def profile_scan(matchers, text, languages=None, extra=frozenset()):
+    return [m.pattern for m in asyncio.run(matchers.scan(text, languages, extra))]
+
+
+def test_profile_scan_keeps_only_the_chosen_languages():
+    banned = BannedWords()
+    matchers = ProfileMatchers(banned)
+    assert profile_scan(matchers, "you moron", frozenset({"english"})) == ["moron"]
+    assert profile_scan(matchers, "you moron", frozenset({"hindi"})) == []
+
+
+def test_profile_scan_adds_guild_words_without_copying_the_shared_lists():
+    banned = BannedWords()
+    matchers = ProfileMatchers(banned)
+    extra = frozenset({"pineapple pizza"})
+    assert profile_scan(matchers, "moron likes pineapple pizza", None, extra) == ["moron", "pineapple pizza"]
+    matcher, _ = asyncio.run(matchers.extra_matcher(extra))
+    assert matcher.words == {"pineapple pizza"}
+
+
+def test_profile_scan_follows_shared_list_changes():
+    banned = BannedWords()
+    matchers = ProfileMatchers(banned)
+    extra = frozenset({"spoiler"})
+    assert profile_scan(matchers, "spoiler: noob", frozenset({"gaming"}), extra) == ["spoiler", "noob"]
+    asyncio.run(banned.remove_custom_words(["noob"]))
+    asyncio.run(banned.add_custom_words(["zerg rush"], "gaming"))
+    assert profile_scan(matchers, "spoiler: noob zerg rush", frozenset({"gaming"}), extra) == ["spoiler", "zerg rush"]
+    assert len(matchers.cache) == 1  # the guild-word matcher survived both edits
+
+
+def test_corrupt_matcher_artifact_is_recompiled_and_replaced(tmp_path):
+    path = str(tmp_path / "words.db")
+    first = BannedWords(store=WordStore(path))
+    digest = words_digest(first._forms, first.backend)
+    first.store.save_matcher(first.backend, digest, b"\xffnot marshal")
+
+    banned = BannedWords(store=WordStore(path))
+    assert banned.load_source == "compiled"
+    assert banned.get_banned_words("you moron") == ["moron"]
+    assert BannedWords(store=WordStore(path)).load_source == "cache"
@@ -0,0 +1,104 @@
+"""
+Every text-bearing part of a message, scanned one at a time.
+
+Banned words can hide outside message.content: in embed titles and
+descriptions, attachment filenames, link slugs and the author's display
+name. Links are cut out of the content and scanned as host plus the
+readable parts of their path, so video and invite IDs that happen to
+spell a banned word are not flagged. message_fields() yields those texts lazily, most likely offender
+first. MessageScanner.violations() checks link domains against the
+blocklist, then scans the texts as they come and yields each violation
+as it is found. A caller that needs only a yes/no answer takes the
+first one, and the remaining fields are never built or scanned. Display
+names are remembered once found clean, so a member's name is only
+scanned again when it changes.
+"""
+import os
+import re
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from cache import TTLCache
+from links import DomainBlocklist, find_links, strip_links
+from matcher import Match
+
+CLEAN_NAMES = 16384
+CLEAN_NAMES_TTL = 3600  # seconds
+
+_FILENAME_SEPARATORS = re.compile(r"[\W_]+")
+
+Scan = Callable[[str], Awaitable[List[Match]]]
+
+
+class Violation(NamedTuple):
+    field: str               # content, domain, link, embed, attachment or display_name
+    words: Tuple[str, ...]   # banned words found, as listed, or the blocked domain
+
+
+def embed_texts(embed) -> Iterator[str]:
+    yield embed.title or ""
+    yield embed.description or ""
+    for field in embed.fields:
+        yield field.name or ""
+        yield field.value or ""
+    yield embed.footer.text or ""
+    yield embed.author.name or ""
+
+
+def message_links(message) -> Iterator[Tuple[str, str]]:
+    """(host, slug words) for links in the content and embed URLs"""
+    yield from find_links(message.content)
+    for embed in message.embeds:
+        if embed.url:
+            yield from find_links(embed.url)
+
+
+def message_fields(message, links: Optional[List[Tuple[str, str]]] = None) -> Iterator[Tuple[str, str]]:
+    """(field, text) for the scannable text of a message; links are scanned by host and readable slug"""
+    yield "content", strip_links(message.content)
+    for host, slug in message_links(message) if links is None else links:
+        yield "link", f"{host} {slug}"
+    for embed in message.embeds:
+        for text in embed_texts(embed):
+            yield "embed", text
+    for attachment in message.attachments:
+        stem = os.path.splitext(attachment.filename)[0]
+        yield "attachment", _FILENAME_SEPARATORS.sub(" ", stem)
+    if message.guild is not None:
+        yield "display_name", message.author.display_name
+
+
+class MessageScanner:
+    def __init__(self, blocklist: DomainBlocklist, names_size: int = CLEAN_NAMES, names_ttl: float = CLEAN_NAMES_TTL):
+        self.blocklist = blocklist
+        # (guild id, user id) -> display name last found clean; a name is only
+        # scanned again after it changes or its entry expires
+        self.clean_names = TTLCache(names_size, names_ttl)
+
+    async def violations(self, message, scan: Scan) -> AsyncIterator[Violation]:
+        """Violations in message, in field order, found lazily"""
+        links = list(message_links(message))
+        # Domain checks are set lookups, so they run before any text is scanned
+        for host, _ in links:
+            domain = self.blocklist.blocked(host)
+            if domain:
+                yield Violation("domain", (domain,))
+        for field, text in message_fields(message, links):
+            if not text:
+                continue
+            if field == "display_name":
+                key = (message.guild.id, message.author.id)
+                if self.clean_names.get(key, count=False) == text:
+                    continue
+            hits = await scan(text)
+            if hits:
+                yield Violation(field, tuple(h.pattern for h in hits))
+            elif field == "display_name":
+                self.clean_names.set(key, text)
+
+    async def first_violation(self, message, scan: Scan) -> Optional[Violation]:
+        """The first violation in message, without scanning the fields after it"""
+        found = self.violations(message, scan)
+        async for violation in found:
+            await found.aclose()
+            return violation
+        return None
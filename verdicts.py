@@ -0,0 +1,88 @@
+"""
+Cached banned-word verdicts.
+
+Copy-pasted text is common in spam, so scan results are cached by a hash
+of the content. There are two keys. The raw text's hash lets exact
+repeats skip normalization as well as matching. The normalized text's
+hash also catches copies that differ only in case, spacing or
+look-alike characters. Long pastes bound for the worker pool are only
+keyed raw, so normalizing them stays off the event loop. Entries are
+scoped to the guild's word selection, and the whole cache is dropped
+when the shared word lists change.
+"""
+import hashlib
+from typing import List
+
+from cache import TTLCache
+from matcher import Match
+from modpool import ModerationPool
+from profiles import GuildProfile
+from wordfilter import BannedWords, ProfileMatchers
+
+VERDICT_CACHE_SIZE = 8192
+VERDICT_CACHE_TTL = 3600  # seconds
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class VerdictCache:
+    def __init__(self, banned: BannedWords, pool: ModerationPool, matchers: ProfileMatchers,
+                 maxsize: int = VERDICT_CACHE_SIZE, ttl: float = VERDICT_CACHE_TTL):
+        self.banned = banned
+        self.pool = pool
+        self.matchers = matchers
+        self.cache = TTLCache(maxsize, ttl)
+        self._version = banned.version
+        # Metrics
+        self.raw_hits = 0
+        self.normalized_hits = 0
+        self.misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.raw_hits + self.normalized_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def scan(self, text: str, profile: GuildProfile) -> List[Match]:
+        """Banned words in text under the guild's profile; callers must not modify the result"""
+        version = self.banned.version
+        if self._version != version:
+            self.cache.clear()
+            self._version = version
+        selection = None if profile.default_words else (profile.languages, profile.words)
+
+        raw_key = ("raw", selection, _digest(text))
+        matches = self.cache.get(raw_key, count=False)
+        if matches is not None:
+            self.raw_hits += 1
+            return matches
+
+        if selection is None and self.pool.pooled_for(text):
+            matches = await self.pool.scan(text)
+        else:
+            normalized = self.banned.normalize(text)
+            key = ("normalized", selection, _digest(normalized))
+            matches = self.cache.get(key, count=False)
+            if matches is not None:
+                self.normalized_hits += 1
+                self._store(version, raw_key, matches)
+                return matches
+            if selection is None:
+                matches = self.pool.scan_normalized(normalized)
+            else:
+                matches = await self.matchers.scan_normalized(normalized, profile.languages, profile.words)
+            self._store(version, key, matches)
+        self.misses += 1
+        self._store(version, raw_key, matches)
+        return matches
+
+    def _store(self, version: int, key: tuple, matches: List[Match]):
+        # A scan that straddled a word-list change may reflect the old lists
+        if version == self.banned.version:
+            self.cache.set(key, matches)
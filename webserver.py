@@ -1,17 +1,96 @@
-from flask import Flask
-from threading import Thread
+"""
+Health, readiness and metrics endpoints served on the bot's own event loop.
+
+    /          liveness text for uptime pingers
+    /healthz   the process and its event loop are responsive
+    /readyz    200 only while every shard's gateway connection is up, 503 otherwise
+    /metrics   Prometheus text format (404 when METRICS=0)
+"""
+import logging
+import math
 import os
+import time
+from typing import Optional, Set
+
+from aiohttp import web
+from discord.ext import commands
+
+from metrics import registry
+
+log = logging.getLogger("bot")
+
+
+class WebServer:
+    def __init__(self, bot: commands.Bot, host: str = "0.0.0.0", port: Optional[int] = None):
+        self.bot = bot
+        self.host = host
+        self.port = int(os.environ.get("PORT", 5000)) if port is None else port
+        self.started_at = time.monotonic()
+        # Shards with a live gateway connection, kept up to date by the bot's
+        # per-shard connect/disconnect events
+        self.connected_shards: Set[int] = set()
+        self._runner: Optional[web.AppRunner] = None
+        app = web.Application()
+        app.add_routes([
+            web.get("/", self.home),
+            web.get("/healthz", self.health),
+            web.get("/readyz", self.ready),
+            web.get("/metrics", self.metrics),
+        ])
+        self.app = app
+
+    async def start(self):
+        """Start serving; calling it again while running does nothing"""
+        if self._runner is not None:
+            return
+        runner = web.AppRunner(self.app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+        self._runner = runner
+        log.info("Web server listening on %s:%d", self.host, self.port)
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def shard_connected(self, shard_id: int):
+        self.connected_shards.add(shard_id)
+
+    def shard_disconnected(self, shard_id: int):
+        self.connected_shards.discard(shard_id)
+
+    @property
+    def gateway_connected(self) -> bool:
+        """Every shard the bot runs is connected; one dropped shard makes the bot unready"""
+        shards = self.bot.shards
+        return bool(shards) and self.connected_shards.issuperset(shards)
+
+    def is_ready(self) -> bool:
+        return self.gateway_connected and self.bot.is_ready() and not self.bot.is_closed()
 
-app = Flask('')
+    async def home(self, request: web.Request) -> web.Response:
+        return web.Response(text="I'm alive!")
 
-@app.route('/')
-def home():
-    return "I'm alive!"
+    async def health(self, request: web.Request) -> web.Response:
+        # Answering at all means the loop is turning
+        return web.json_response({"status": "ok", "uptime": round(time.monotonic() - self.started_at, 1)})
 
-def run():
-    port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port)
+    async def ready(self, request: web.Request) -> web.Response:
+        ready = self.is_ready()
+        latency = self.bot.latency
+        body = {
+            "ready": ready,
+            "gateway_connected": self.gateway_connected,
+            "shards_connected": len(self.connected_shards & set(self.bot.shards)),
+            "shards": len(self.bot.shards),
+            "latency_ms": round(latency * 1000, 1) if math.isfinite(latency) else None,
+            "guilds": len(self.bot.guilds),
+        }
+        return web.json_response(body, status=200 if ready else 503)
 
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
+    async def metrics(self, request: web.Request) -> web.Response:
+        if not registry.enabled:
+            return web.Response(text="metrics disabled\n", status=404)
+        return web.Response(text=registry.render(),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
@@ -0,0 +1,97 @@
+"""
+Async Wikipedia lookups over a pooled aiohttp session.
+
+Answers (including disambiguation and missing pages) are cached by
+normalized query, and concurrent identical queries share one upstream
+request. The API URL is configurable so a local stub server can stand in
+for Wikipedia.
+"""
+import asyncio
+import logging
+import os
+from typing import List, NamedTuple, Optional
+
+import aiohttp
+
+from cache import SingleFlight, TTLCache, normalize_query
+
+log = logging.getLogger("bot")
+
+WIKI_API_URL = os.getenv("WIKI_API_URL", "https://en.wikipedia.org/w/api.php")
+WIKI_CACHE_SIZE = 512
+WIKI_CACHE_TTL = 6 * 3600     # seconds for pages and disambiguations
+WIKI_MISSING_TTL = 600        # seconds for "no such page", which may appear later
+WIKI_MAX_CONNECTIONS = 8
+WIKI_SENTENCES = 3
+
+
+class WikiResult(NamedTuple):
+    kind: str                 # "page", "disambiguation" or "missing"
+    title: str
+    summary: str = ""
+    url: str = ""
+    options: List[str] = []
+
+
+class WikiError(Exception):
+    pass
+
+
+class WikiClient:
+    def __init__(self, api_url: str = WIKI_API_URL, cache_size: int = WIKI_CACHE_SIZE,
+                 ttl: float = WIKI_CACHE_TTL):
+        self.api_url = api_url
+        self.cache = TTLCache(cache_size, ttl)
+        self.flight = SingleFlight()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=WIKI_MAX_CONNECTIONS),
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers={"User-Agent": "discord-bot (wiki lookup)"}
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def summary(self, query: str) -> WikiResult:
+        """Summary of the best-matching page, served from cache when possible"""
+        key = normalize_query(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        result = await self.flight.do(key, lambda: self._fetch(key))
+        self.cache.set(key, result, WIKI_MISSING_TTL if result.kind == "missing" else None)
+        return result
+
+    async def _api(self, **params) -> dict:
+        params.update(format="json", formatversion="2")
+        try:
+            async with self._get_session().get(self.api_url, params=params) as resp:
+                resp.raise_for_status()
+                return await resp.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise WikiError(str(e)) from e
+
+    async def _fetch(self, query: str) -> WikiResult:
+        # Suggestion step, like wikipedia.summary(auto_suggest=True)
+        found = await self._api(action="opensearch", search=query, limit=6, namespace=0, redirects="resolve")
+        titles = found[1] if isinstance(found, list) and len(found) > 1 else []
+        if not titles:
+            return WikiResult("missing", query)
+        title = titles[0]
+        data = await self._api(
+            action="query", prop="extracts|pageprops|info", inprop="url", exintro=1, explaintext=1,
+            exsentences=WIKI_SENTENCES, redirects=1, titles=title
+        )
+        pages = data.get("query", {}).get("pages", [])
+        page = pages[0] if pages else {"missing": True}
+        if page.get("missing"):
+            return WikiResult("missing", title)
+        if "disambiguation" in page.get("pageprops", {}):
+            return WikiResult("disambiguation", page["title"], options=[t for t in titles if t != title][:5])
+        return WikiResult("page", page["title"], page.get("extract", ""), page.get("fullurl", ""))
@@ -0,0 +1,510 @@
+"""
+Banned-words filter: per-language word lists behind a pluggable matcher.
+
+Inserts and removals are applied incrementally: new words go into a small
+delta matcher and removed ones become tombstones filtered out of the base
+matcher's hits. Once enough changes pile up the base is recompiled in an
+executor and swapped in atomically, so message checks never wait on it.
+
+Guilds that enforce only some of the lists, or add their own words, scan
+with ProfileMatchers: the shared index filtered by language, plus a small
+matcher for the guild's own words.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import AbstractSet, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+
+from cache import SingleFlight, TTLCache
+from matcher import (
+    DEFAULT_BACKEND, MATCHER_BACKENDS, Match, Matcher, build_matcher, select_longest, words_digest
+)
+from normalize import normalize_text
+from wordstore import WordStore
+
+log = logging.getLogger("bot")
+
+# Pending inserts/removals served by the side matcher before a full rebuild
+DELTA_REBUILD_THRESHOLD = 256
+PROFILE_MATCHERS = 1024      # distinct sets of guild-only words kept compiled
+
+
+class _Index(NamedTuple):
+    base: Matcher                # full compile of the word set at some point
+    delta: Optional[Matcher]     # words added since that compile
+    removed: FrozenSet[str]      # words removed since that compile
+
+
+def _iter_index(idx: _Index, text: str):
+    found = idx.base.iter_matches(text, idx.removed)
+    if idx.delta is not None:
+        found = chain(found, idx.delta.candidates(text))
+    return found
+
+
+class IndexSnapshot(NamedTuple):
+    """Picklable copy of the current index, for rebuilding it in another process"""
+    version: int
+    backend: str
+    normalize: Callable[[str], str]
+    base: bytes                  # Matcher.dump() of the base matcher
+    delta: FrozenSet[str]
+    removed: FrozenSet[str]
+
+    def scanner(self) -> Callable[[str], List[Match]]:
+        """Rebuild the index and return a function equivalent to BannedWords.scan"""
+        base = MATCHER_BACKENDS[self.backend].load(self.base)
+        delta = build_matcher(self.delta, self.backend) if self.delta else None
+        idx = _Index(base, delta, self.removed)
+        normalize = self.normalize
+        return lambda text: select_longest(_iter_index(idx, normalize(text)))
+
+
+class BannedWords:
+    def __init__(self, backend: str = DEFAULT_BACKEND, store: Optional[WordStore] = None,
+                 normalize: bool = True):
+        self.word_lists: Dict[str, Set[str]] = defaultdict(set)
+        self.all_words: Set[str] = set()
+        self.backend = backend
+        self.store = store
+        # Messages and words both go through this before matching
+        self.normalize: Callable[[str], str] = normalize_text if normalize else str.lower
+        # Normalized forms the matcher is built from, with how many listed words fold onto each
+        self._forms: Counter = Counter()
+        # Normalized form -> the listed words folding onto it, for reporting what
+        # was matched and filtering matches by language
+        self._form_words: Dict[str, Set[str]] = defaultdict(set)
+        self.version = 0
+        self.load_source = ""      # "cache" or "compiled", for startup reporting
+        self.load_ms = 0.0
+        self._index: Optional[_Index] = None
+        self._dumped_base: Optional[tuple] = None  # (base, base.dump()) for snapshot()
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._rebuild_lock = asyncio.Lock()
+        self._load_words()
+        if store is not None:
+            self.word_lists = store.load(self.word_lists)
+        
+        # Add all words to master list
+        for words in self.word_lists.values():
+            self.all_words.update(words)
+        for word in self.all_words:
+            form = self.normalize(word)
+            self._forms[form] += 1
+            self._form_words[form].add(word)
+            
+        self._compile_pattern()
+        
+    def _load_words(self):
+        """Load the built-in abusive words for all languages (the store's seed)"""
+        # English
+        self.word_lists['english'].update([
+            "fuck", "bitch", "bastard", "asshole", "cunt", "slut", "dick", "cock", "prick",
+            "motherfucker", "pussy", "jerk", "shit", "moron", "crap", "damn", "retard",
+            "whore", "fag", "faggot", "douchebag", "twat", "wanker", "nigga", "nigger",
+            "son of a bitch", "kys", "kill yourself", "uninstall", "trash", "scrub",
+            "dogwater", "suck", "ez", "loser", "fatherless", "adopted", "touch grass"
+        ])
+        
+        # Hindi
+        self.word_lists['hindi'].update([
+            "chutiya", "madarchod", "bhosdiwala", "gaand", "loda", "behenchod", "randi",
+            "kutta", "chut", "launda", "maa ki chut", "teri maa", "mc", "bc", "kutte", "randwa",
+            "lund", "choot", "bhen ke laude", "teri maa ka bhosda", "gaandu", "chutiyapa",
+            "bhosad", "bhosadi", "chutmarike", "gandmara", "lavde", "maa ka bhosda",
+            "randi ka bacha", "teri maa randi", "teri behen randi", "chootiya", "jhaat", "jhaant",
+            "bhonsdiwale", "maa chuda", "behen ke laude", "lund choos", "gaand mara", "choot chatora",
+            "gel chodi gand andhi rand", "tere baap ki chut", "maa ke laude", "behen ke lund",
+            "teri maa ki chut", "teri behen ki chut", "maa ka lund", "behen ka lund"
+        ])
+        
+        # Marathi
+        self.word_lists['marathi'].update([
+            "gand", "chod", "zhaavla", "lavda", "bhosdi", "randi", "bhadwa", "kutta",
+            "baapacha", "aichya gavat", "bawlat", "phodri", "gadhav", "akramhshi", "andya",
+            "aighala", "zhatu", "zhavat", "bhund", "bocha", "bulli", "chut", "gandu",
+            "haramkhor", "jhant", "kutra", "lavdya", "maaicha", "madarchod", "rand",
+            "saala", "tharki", "bhosda", "chinar", "chutad", "fokatya", "ghandu", "zhavat",
+            "aai zav", "aai zavli", "aai zavlya", "aai zavla", "aai zavlya cha", "aai zavlya chi",
+            "aai zavlya che", "aai zavlya la", "aai zavlya ne", "aai zavlya ni", "aai zavlya cha"
+        ])
+        
+        # Bengali
+        self.word_lists['bengali'].update([
+            "chod", "choda", "chudir baccha", "chudbo", "chudi", "loda", "lode", "lodachoda",
+            "maa ke chudi", "bon chuda", "bokachoda", "shuar", "kukur", "chot", "chotmarani",
+            "chudbaaz", "maachuda", "bonchuda", "tor maa ke chudi", "tor bon ke chudi", "lund",
+            "gaandu", "randi", "haraami", "chinal", "boka", "pagol", "fatu", "dhorbo",
+            "tor maa r choda", "tor bou r choda", "tor bon r choda", "tor maa r chod",
+            "tor bou r chod", "tor bon r chod", "tor maa r chudi", "tor bou r chudi",
+            "tor bon r chudi", "tor maa r chud", "tor bou r chud", "tor bon r chud"
+        ])
+        
+        # Punjabi
+        self.word_lists['punjabi'].update([
+            "chutiya", "madarchod", "behenchod", "randi", "tera baap", "maa da bhosda",
+            "chod", "lund", "ghandu", "kutta", "suar da puttar", "behn di", "sala",
+            "teri maa di", "teri behen di", "teri maa da", "teri behen da", "teri maa di chut",
+            "teri behen di chut", "teri maa da lund", "teri behen da lund", "teri maa da bhosda",
+            "teri behen da bhosda", "teri maa di gand", "teri behen di gand"
+        ])
+        
+        # South Indian Languages (Tamil/Telugu/Kannada/Malayalam)
+        self.word_lists['south_indian'].update([
+            "thevudiya", "pochi", "punda", "naaye", "kundi", "dengudu", "lavda", "kodaka",
+            "sule", "soole", "bosi", "pund", "thendi", "thalla", "kazhutha", "nayinte",
+            "dongamunda", "thikka", "sani", "kirik", "holeya", "gandu", "chamkili", "kuthra",
+            "pakal", "kothi", "pucchi", "gotya", "chhinaal", "zhavli", "madarchod",
+            "ninna amma", "ninna thayi", "ninna maga", "ninna thangi", "ninna appa",
+            "amma na", "bejaar", "chut naku", "lund tinod", "sulu chuchu", "gand mara"
+        ])
+        
+        # Gaming Slang
+        self.word_lists['gaming'].update([
+             "kill yourself","end yourself","fuck", "bitch", "asshole", "dick", "slut", "nigga",
+             "madarchod", "bhosdike", "chutiya", "lund", "beti chod", "gaand", "randi",
+             "bhenchod", "bhench*d", "mc", "bc", "chootiya", "kutte", "gandu",
+             "lode", "lauda", "maa ka bhosda", "teri maa", "teri behen", "chodu", "randwa",
+             "bol teri gand kaise maru", "gandmara", "chdmarike", "choot chatora",
+             "gel chodi gand andhi rand", "lavde", "madar chod", "gand maar lunga",
+             "tere baap ki chut hai", "tere maa market me nanga nach kr rahi hai",
+             "kutta kamine bsdk chutiya", "teri maa randwi hai", "lund ke tope",
+             "chut ke kitde", "chinal ki aulad", "chutmari ka choda", "teri chut", "bhg bsdk",
+             "bhen ka lavda", "chut chatora", "jhaat bara bar", "me toh chut ka shikari hu", "bhosda", "chutad","jhat","अकराम्हशी","अकराम्हशीचा","अकराम्हशीच्या","आंद्या","आंद्याचा","आंद्याच्या","आंद्यात","आईघाला","आईघाल्","आईघाल्या","आईघाल्याचा","आईजवाडा","आईजवाडाचा","आईझव","आईझवली","आईझवलीचा","आईझवाडा","आईझवाडाचा","कँडल","कँडलचा","कँडलच्या","कृतघ्न","गांड","गांडचा","गांडच्या","गांडीचा","गांडीत","गांडू","गांडूचा","गांडूच्या","गांडूत","गाढव","गाढवागांडुळ","गोट्या","गोट्याचा","गोट्याच्या","गोट्यात","चावट","चीनाल","चीनालचा","चीनालच्या","चुत","चुतचा","चुतच्या","चुतत","चुतमारीचा","चुतमारीच्या","चुतमारीच्यात","छिनाल","छिनालचा","छिनालच्या","झवली","झवलीचा","झवलीत","झवाड्या","झवाड्याचा","झवाड्याच्या","झाटू","झाटूचा","झाटूच्या","झाटूत","नालायकच्यायला","पागलगुदा","पुच्ची","पुच्चीचा","पुच्चीच्या","पुच्चीत","फोकणीच्या","फोकणीच्याचा","फोकणीच्यात","फोद्री","फोद्रीचा","फोद्रीच्या","फोद्रीच्यात","फोद्रीत","बावळट","बावळटच्या","बावळटत","बुडाला","बुल्ली","बुल्लीचा","बुल्लीत","बेअक्कल","बेशरम","बोचा","बोचाच्या","बोचात","बोच्याबुल्लीच्या","भडवा","भडविच्याभिकारचोट","भडव्या","भडव्यात","भुंड्","भुंड्त","भुंड्यात","भुंड्यातत","भोक","भोकचा","भोकत","भोकाच्या","भोसडा","भोसडाचा","भोसडात","भोसडीच्या","भोसडीच्यात","मंद","माईचा","माईचात","माईच्या","मादरचोद","मारीच्या","मारीच्यात","मुठ्ठया","मुठ्ठयाचा","मुठ्ठयात","मूर्ख","रंडी","रंडीचा","रंडीच्या","रंडीच्यात","रंडीत","रांड",
+"रांडचा","रांडच्या","रांडीच्या","रांडीच्यात","लवड्या","लवड्याचा","लवड्याच्या","लवड्यात"
+"साला","हरामखोर","हलकट" "हरामखोरचा","हरामखोरच्या","हरामखोरात","akramhshi", "akramhshicha", "akramhshichya","andya", "andyacha", "andyachya", "andyat",
+"aighala", "aighalya", "aighalyacha",
+"aijawada", "aijawadacha",
+"aizhav", "aizhavli", "aizhavlicha", "aizhawada", "aizhawadacha",
+"candle", "candlecha", "candlechya",
+"krutaghn",
+"gand", "gandcha", "gandchya", "gandicha", "gandit",
+"gandu", "ganducha", "ganduchya", "gandut",
+"gadhav", "gadhavagandul",
+"gotya", "gotyacha", "gotyachya", "gotyat",
+"chawat", "chinal", "chinalcha", "chinalchya",
+"chut", "chutcha", "chutchya", "chuttat",
+"chutmari", "chutmarcha", "chutmarchyat",
+"chhinaal", "chhinaalcha", "chhinaalchya","zhavli", "zhavlicha", "zhavlit",
+"zhawadya", "zhawadyacha", "zhawadyachya",
+"zhatu", "zhatucha", "zhatuchya", "zhatut",
+"nalayakchyayla","pagalguda",
+    # Family-Based
+    "ninna amma chudrappa", "ninna thayi bosi", "ninna thayi chuchu", "ninna amma maga", "ninna thangi naakthini",
+    "ninna magalu daari dalli", "thayi chut tinod maga", "ninna appa chut kaayi", "amma na naakthini", "bejaar thayi chut",
+
+    # Mental/Character/Caste
+    "gandu", "lusu", "loose huduga", "mental case", "buddhi illa", "tharle", "kirik", "mentalt",
+    "chamkili", "chamaar maga", "holeya", "holeyaru", "basse kasta",
+
+    # Animal
+    "nayi", "handi", "saalige", "hasu", "kudure", "koli maga", "mooru nayi", "hakki maga", "hejjegalu", "enu gothilla nayi",
+
+    # Gaming Slang
+    "noob nayi", "camper sulen", "scope nodoke baralla", "ninna team full gandu", "clutch beda maga",
+    "teri lobby gayi tel lagaake", "mic haaki mare", "stream sniping soole", "hacker nayi", "peek madoke baralla",
+    "sulen jasti swalpa skill ko",
+
+    # Combo Insults
+    "ninna amma chut alli chalu aagidale", "chut thora maga", "lund ella alli ide",
+    "ninna thayi soole dalli kelsa madtha idale", "pundeya gandu", "chut borege saku", "sulekke nayi kooda baralla",# Genital/Sexual
+    "bhalu", "mukhrot dhula", "patar", "chutmarani", "chutkhaowa", "lund kha", "gaand phati gol",
+    "chut dhula", "suri kha", "chut diya", "chut khai ase",
+
+    # Family-Based
+    "tor maari", "tor bou", "tor ma randi", "tor bhonti randi", "tor ma chut", "tor bou lund",
+    "tor bhonti chut", "tor ma lund", "tor maa gaand diya", "tor bou randi", "tor maa chut khai ase",
+
+    # Mental/Character
+    "bokachoda", "bura bokachoda", "pagol", "uthoni", "bekar", "bhagwan r nai", "dhemeli",
+    "ulta jukti diya", "bokami kori thaka", "matha dhula", "akkal nai", "moron",
+
+    # Animal
+    "suwor", "suworer baccha", "xial", "kutta", "kukura", "goru", "gadha", "bandor",
+    "dhuli", "dhol", "kukurni", "suali kutta",
+
+    # Gaming/Online
+    "noob", "hack use kori khel", "lundor aim", "camper kutta", "tor aim chutot", "tor gaand te crosshair",
+    "tor mouse gaandot", "tor ping chut", "camper randi", "aim assist randi",
+
+    # Hybrid/Roasting
+    "tor maari chut", "tor bou chut khai ase", "lund diya randi", "chut dhula bhonti",
+    "tor aim maa te", "gaand khuli gol", "mobile te maa chut dise", "stream snipe kori chut kha",# Genital
+    "chod", "choda", "chudir baccha", "chudbo", "chudi", "chudchhi", "chudachhi",
+    "choda dibi", "chudi dibi", "chudiye debo", "chot", "chotmarani", "chotkhani",
+    "chot khaowa", "chot chush", "loda", "lode", "lodachoda", "loda chusbi", "loda dhukabo",
+    "biran", "biraler chot", "chudbaaz", "chuda player",
+
+    # Family/Parental
+    "tor maa ke chudi", "tor bon ke chudi", "maa chuda", "bon chuda", "maa ke loda",
+    "maa r chot", "maa ke chodchi", "maa choder player", "tor bon choda",
+    "maa ke chudbo", "maa ke chudiye debo", "maa r loda chushe felbi",
+    "tor bou r chot", "bou ke chudchi", "bou ke lodai", "tor bou chudi",
+
+    # Mental
+    "bokachoda", "boka", "pagol", "pagla", "fatu", "boka choda", "byatha",
+    "bhootni", "dhorbo", "brain nai", "buddhiheen",
+
+    # Animal
+    "shuar", "shuarer baccha", "kukur", "kukur choda", "bandor", "beral",
+    "goru", "gadha", "ghoda", "suorer chhana", "bandorer chot",
+
+    # Online Gaming
+    "noob choda", "stream sniping randir baccha", "aim nai loder moto",
+    "camperer maa choda", "gaand mara player", "neter chot", "crosshair maa r chot",
+    "spray maa te", "hackerer chot", "loda aim assist", "jhari galo lobby",
+
+    # Hybrid / Dank Combos
+    "tor maa ke loda dhukiye debo", "tor bon er chot bhenge debo", "loda dhuke chudbo",
+    "bou ke maa banabo", "stream kore maa chod", "chot e loda", "tor family ek shathe chudbo",
+    "tor chot porjonto toxic", "loder moto speech", "maa bon ekta pod er upor"
+
+        ])
+    
+    def _compile_pattern(self):
+        """Compile all words with the configured matcher backend (blocking), reusing a cached artifact"""
+        start = time.perf_counter()
+        base = None
+        if self.store is not None:
+            blob = self.store.load_matcher(self.backend, words_digest(self._forms, self.backend))
+            if blob is not None:
+                try:
+                    base = MATCHER_BACKENDS[self.backend].load(blob)
+                except (ValueError, EOFError, TypeError) as e:
+                    # Corrupt or unreadable; compiling below overwrites it
+                    log.warning("Discarding cached %s matcher: %s", self.backend, e)
+        self.load_source = "cache" if base is not None else "compiled"
+        if base is None:
+            base = self._build(frozenset(self._forms))
+        self._swap(base)
+        self.load_ms = (time.perf_counter() - start) * 1000
+    
+    def _build(self, words: FrozenSet[str]) -> Matcher:
+        """Compile words and persist the artifact; safe to run in an executor"""
+        base = build_matcher(words, self.backend)
+        if self.store is not None:
+            self.store.save_matcher(self.backend, words_digest(words, self.backend), base.dump())
+        return base
+    
+    def _swap(self, base: Matcher):
+        """Install a freshly built base matcher, re-deriving the delta from current words"""
+        added = self._forms.keys() - base.words
+        removed = frozenset(base.words - self._forms.keys())
+        delta = build_matcher(added, self.backend) if added else None
+        # Single attribute assignment, so concurrent scans see old or new, never a mix
+        self._index = _Index(base, delta, removed)
+    
+    def _pending(self) -> int:
+        idx = self._index
+        return len(idx.removed) + (len(idx.delta.words) if idx.delta else 0)
+    
+    def _apply_change(self):
+        """Refresh the small delta matcher after an insert/removal; rebuild in full if it grew too big"""
+        self.version += 1
+        self._swap(self._index.base)
+        if self._pending() > DELTA_REBUILD_THRESHOLD:
+            self._schedule_rebuild()
+    
+    def _schedule_rebuild(self):
+        """Rebuild off-loop when called from the bot, inline otherwise"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._compile_pattern()
+            return
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = loop.create_task(self.rebuild())
+    
+    async def _build_and_swap(self, extra: FrozenSet[str] = frozenset()) -> Matcher:
+        async with self._rebuild_lock:
+            words = frozenset(self._forms) | extra
+            loop = asyncio.get_running_loop()
+            base = await loop.run_in_executor(None, self._build, words)
+            self.version += 1
+            self._swap(base)
+            return base
+    
+    async def rebuild(self):
+        """Full recompile in an executor, then atomically swap it in"""
+        while True:
+            base = await self._build_and_swap()
+            log.info("Rebuilt banned-word matcher with %d words", len(base.words))
+            # Go again only if a flood of changes arrived meanwhile
+            if self._pending() <= DELTA_REBUILD_THRESHOLD:
+                return
+    
+    def _iter_matches(self, text: str):
+        return _iter_index(self._index, text)
+
+    def snapshot(self) -> IndexSnapshot:
+        """The current index in a form worker processes can load"""
+        idx = self._index
+        dumped = self._dumped_base
+        if dumped is None or dumped[0] is not idx.base:
+            dumped = self._dumped_base = (idx.base, idx.base.dump())
+        return IndexSnapshot(self.version, self.backend, self.normalize, dumped[1],
+                             idx.delta.words if idx.delta is not None else frozenset(), idx.removed)
+    
+    def scan(self, text: str) -> List[Match]:
+        """Single pass returning every banned word found in text with its span"""
+        return self.scan_normalized(self.normalize(text))
+
+    def scan_normalized(self, normalized: str) -> List[Match]:
+        """scan() for text already passed through self.normalize"""
+        return self.listed(select_longest(self._iter_matches(normalized)))
+
+    def listed(self, matches: List[Match], extra: Optional[Dict[str, str]] = None) -> List[Match]:
+        """matches with each pattern mapped from its normalized form back to a listed word"""
+        if not matches:
+            return matches
+        out = []
+        for m in matches:
+            words = self._form_words.get(m.pattern)
+            if words:
+                out.append(m._replace(pattern=min(words)))
+            elif extra and m.pattern in extra:
+                out.append(m._replace(pattern=extra[m.pattern]))
+            else:
+                out.append(m)
+        return out
+
+    def in_languages(self, form: str, languages: AbstractSet[str]) -> bool:
+        """Whether a listed word folding onto form is in one of the languages"""
+        lists = self.word_lists
+        return any(word in lists[language] for word in self._form_words.get(form, ())
+                   for language in languages if language in lists)
+    
+    def contains_banned_word(self, text: str) -> bool:
+        """Check if text contains any banned words"""
+        return next(self._iter_matches(self.normalize(text)), None) is not None
+    
+    def get_banned_words(self, text: str) -> List[str]:
+        """Get all banned words found in text, as listed"""
+        return [m.pattern for m in self.scan(text)]
+    
+    async def add_custom_words(self, words: Iterable[str], language: str = 'english') -> int:
+        """Add custom banned words; returns how many were new"""
+        words = _clean(words)
+        new = words - self.all_words
+        self.word_lists[language].update(words)
+        self.all_words.update(words)
+        for word in new:
+            form = self.normalize(word)
+            self._forms[form] += 1
+            self._form_words[form].add(word)
+        if new:
+            self._apply_change()
+        if self.store is not None:
+            # Matching uses the new words already; only the write waits on SQLite
+            await asyncio.get_running_loop().run_in_executor(None, self.store.add, language, words)
+        return len(new)
+    
+    async def remove_custom_words(self, words: Iterable[str], language: Optional[str] = None) -> int:
+        """Remove banned words from one language, or from all when language is None; returns how many are gone"""
+        words = _clean(words)
+        lists = [self.word_lists.get(language, set())] if language else list(self.word_lists.values())
+        for word_list in lists:
+            word_list.difference_update(words)
+        gone = {w for w in words & self.all_words if not any(w in wl for wl in self.word_lists.values())}
+        if gone:
+            self.all_words.difference_update(gone)
+            for word in gone:
+                form = self.normalize(word)
+                self._forms[form] -= 1
+                self._form_words[form].discard(word)
+                if not self._form_words[form]:
+                    del self._form_words[form]
+            self._forms = +self._forms  # drop forms no word folds onto any more
+            self._apply_change()
+        if self.store is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.store.remove, words, language)
+        return len(gone)
+    
+    async def bulk_add(self, words: Iterable[str], language: str = 'english') -> int:
+        """Add many words at once: compiled off-loop together with the current set, then swapped in"""
+        words = _clean(words)
+        pending = words - self.all_words
+        loop = asyncio.get_running_loop()
+        forms = await loop.run_in_executor(None, lambda: {w: self.normalize(w) for w in pending})
+        if forms:
+            # Registered only once a matcher containing them is ready, so
+            # concurrent single-word changes never compile them on the loop
+            await self._build_and_swap(extra=frozenset(forms.values()))
+        new = forms.keys() - self.all_words
+        self.word_lists[language].update(words)
+        self.all_words.update(words)
+        for word in new:
+            self._forms[forms[word]] += 1
+            self._form_words[forms[word]].add(word)
+        self._swap(self._index.base)
+        if self.store is not None:
+            await loop.run_in_executor(None, self.store.add, language, words)
+        return len(new)
+
+
+class ProfileMatchers:
+    """
+    Scans for guilds whose word selection differs from the full set.
+
+    Every guild scans the shared index, so tombstoned words are dropped
+    the same way for all of them. A guild that enforces only some languages
+    keeps the matches whose pattern is listed in one of them. Guild-only
+    words get a small matcher of their own, compiled once per distinct set
+    of extra words and shared by every guild with that set. Memory grows
+    with those extra words, not with the number of customized guilds, and
+    changes to the shared lists invalidate nothing.
+    """
+
+    def __init__(self, banned: BannedWords, maxsize: int = PROFILE_MATCHERS):
+        self.banned = banned
+        self.cache = TTLCache(maxsize, ttl=float("inf"))  # extra words -> (matcher, form -> word)
+        self._flight = SingleFlight()
+
+    async def extra_matcher(self, extra: FrozenSet[str]) -> tuple:
+        """Matcher for a guild's own words and the map from their normalized forms back, compiled off-loop"""
+        entry = self.cache.get(extra)
+        if entry is None:
+            entry = await self._flight.do(extra, lambda: self._compile(extra))
+        return entry
+
+    async def _compile(self, extra: FrozenSet[str]) -> tuple:
+        normalize, backend = self.banned.normalize, self.banned.backend
+
+        def build():
+            forms = {normalize(w): w for w in extra}
+            return build_matcher(forms, backend), forms
+        entry = await asyncio.get_running_loop().run_in_executor(None, build)
+        self.cache.set(extra, entry)
+        return entry
+
+    async def scan(self, text: str, languages: Optional[AbstractSet[str]], extra: FrozenSet[str]) -> List[Match]:
+        """BannedWords.scan against a profile's selection of words"""
+        return await self.scan_normalized(self.banned.normalize(text), languages, extra)
+
+    async def scan_normalized(self, normalized: str, languages: Optional[AbstractSet[str]],
+                              extra: FrozenSet[str]) -> List[Match]:
+        forms = None
+        if extra:
+            matcher, forms = await self.extra_matcher(extra)
+        banned = self.banned
+        found = banned._iter_matches(normalized)
+        if languages is not None:
+            found = (m for m in found if banned.in_languages(m.pattern, languages))
+        if forms is not None:
+            found = chain(found, matcher.candidates(normalized))
+        return banned.listed(select_longest(found), forms)
+
+
+def _clean(words: Iterable[str]) -> Set[str]:
+    return {w.strip().lower() for w in words if w and w.strip()}
+
+
+def parse_word_file(text: str) -> List[str]:
+    """Words from an import file: one per line and/or comma separated, '#' starts a comment"""
+    words = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0]
+        words.extend(w for w in (part.strip() for part in line.split(",")) if w)
+    return words
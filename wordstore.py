@@ -0,0 +1,133 @@
+"""
+SQLite store for the banned-word lists, their compiled matcher and the
+blocked link domains.
+
+Lists are seeded from the built-in defaults and then owned by the store,
+so words added or removed through commands survive restarts. The
+compiled matcher is cached as a binary artifact keyed by a content hash
+of the word set, letting a restart skip compilation entirely.
+"""
+import hashlib
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+from sqlitedb import open_db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS words (
+    language TEXT NOT NULL,
+    word     TEXT NOT NULL,
+    PRIMARY KEY (language, word)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS words_by_word ON words (word);
+CREATE TABLE IF NOT EXISTS suppressed (
+    language TEXT NOT NULL,
+    word     TEXT NOT NULL,
+    PRIMARY KEY (language, word)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS matcher_cache (
+    backend  TEXT PRIMARY KEY,
+    digest   TEXT NOT NULL,
+    artifact BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocked_domains (
+    domain TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _seed_digest(seed: Dict[str, Set[str]]) -> str:
+    h = hashlib.sha256()
+    for language in sorted(seed):
+        for word in sorted(seed[language]):
+            h.update(f"{language}\0{word}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class WordStore:
+    def __init__(self, path: str):
+        self.path = path
+        # Rebuilds save artifacts from executor threads, so share one
+        # connection behind a lock
+        self._conn, self._lock = open_db(path, SCHEMA)
+
+    def load(self, seed: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+        """Per-language word lists, merging in the seed whenever it changes"""
+        digest = _seed_digest(seed)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'seed_digest'").fetchone()
+            if row is None or row[0] != digest:
+                # Words removed by moderators stay removed across seed updates
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO words (language, word) "
+                    "SELECT ?1, ?2 WHERE NOT EXISTS "
+                    "(SELECT 1 FROM suppressed WHERE language = ?1 AND word = ?2)",
+                    ((lang, word) for lang, words in seed.items() for word in words)
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('seed_digest', ?)", (digest,)
+                )
+            lists: Dict[str, Set[str]] = defaultdict(set)
+            for language, word in self._conn.execute("SELECT language, word FROM words"):
+                lists[language].add(word)
+        return lists
+
+    def add(self, language: str, words: Iterable[str]):
+        rows = [(language, w) for w in words]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM suppressed WHERE language = ? AND word = ?", rows)
+            self._conn.executemany("INSERT OR IGNORE INTO words (language, word) VALUES (?, ?)", rows)
+
+    def remove(self, words: Iterable[str], language: Optional[str] = None):
+        words = list(words)
+        with self._lock, self._conn:
+            if language is None:
+                rows = [
+                    row for w in words
+                    for row in self._conn.execute("SELECT language, word FROM words WHERE word = ?", (w,))
+                ]
+            else:
+                rows = [(language, w) for w in words]
+            self._conn.executemany("DELETE FROM words WHERE language = ? AND word = ?", rows)
+            self._conn.executemany("INSERT OR IGNORE INTO suppressed (language, word) VALUES (?, ?)", rows)
+
+    def load_domains(self, seed: Set[str]) -> Set[str]:
+        """Blocked link domains, seeded the first time the store is opened"""
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'domains_seeded'").fetchone() is None:
+                self._conn.executemany("INSERT OR IGNORE INTO blocked_domains (domain) VALUES (?)",
+                                       ((d,) for d in seed))
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('domains_seeded', '1')")
+            return {d for (d,) in self._conn.execute("SELECT domain FROM blocked_domains")}
+
+    def add_domains(self, domains: Iterable[str]):
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO blocked_domains (domain) VALUES (?)",
+                                   ((d,) for d in domains))
+
+    def remove_domains(self, domains: Iterable[str]):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM blocked_domains WHERE domain = ?", ((d,) for d in domains))
+
+    def load_matcher(self, backend: str, digest: str) -> Optional[bytes]:
+        """Cached artifact for backend if it was built from the same word set"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT artifact FROM matcher_cache WHERE backend = ? AND digest = ?", (backend, digest)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_matcher(self, backend: str, digest: str, artifact: bytes):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO matcher_cache (backend, digest, artifact) VALUES (?, ?, ?)",
+                (backend, digest, artifact)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()